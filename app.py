@@ -1,244 +1,175 @@
 import streamlit as st
 import pandas as pd
 
+from matching import (
+    calculate_frame_scores,
+    explain_row_score,
+)
+from matching.assignment import ASSIGNMENT_METHODS, EXACT_MAX_CELLS, exact_fits
+from matching.cache import (
+    ResultCache,
+    cached_assignment,
+    cached_tagged_scores,
+    fingerprint,
+    synced_matching_state,
+)
+from matching.explorer import LANGUAGE_FEATURE, MaidIndex
+from matching.ingest import UPLOAD_TYPES, read_upload
+from matching.jobs import Cancelled, SearchJobs
+from matching.lazy import LazyResults
+from matching.profiling import Profiler
+from matching.summary import (
+    BUCKET_ORDER,
+    cube_buckets,
+    cube_features,
+    cube_histogram,
+    cube_mean,
+    cube_slice,
+    driver_counts,
+    driver_shares,
+    score_cube,
+)
+
+# Largest shortlist the Best Maid tab offers; the matching state keeps this many per client.
+MAX_SHORTLIST = 50
+# Largest capacity (clients per maid) Tab 4's assignment plan offers.
+MAX_CAPACITY = 50
+
 # -------------------------------
-# Matching Score Function
+# Deferred per-dataset results
 # -------------------------------
-def calculate_row_score(row):
-    score = 0.0
-    weight_strong = 0.6
-    weight_moderate = 0.3
-    weight_bonus = 0.1
-    max_score = 0.0
-
-    # Household Type
-    c_house = row["clientmts_household_type"]
-    m_house = row["maidmts_household_type"]
-    if c_house != "unspecified":
-        max_score += weight_strong
-        if (
-            (c_house == "baby" and m_house != "refuses_baby") or
-            (c_house == "many_kids" and m_house != "refuses_many_kids") or
-            (c_house == "baby_and_kids" and m_house != "refuses_baby_and_kids")
-        ):
-            score += weight_strong
-
-    # Pets
-    c_pets = row["clientmts_pet_type"]
-    m_pets = row["maidmts_pet_type"]
-    if c_pets != "no_pets":
-        max_score += weight_strong
-        if (
-            (c_pets == "cat" and m_pets != "refuses_cat") or
-            (c_pets == "dog" and m_pets != "refuses_dog") or
-            (c_pets == "both" and m_pets != "refuses_both_pets")
-        ):
-            score += weight_strong
-
-    # Day-off Policy
-    c_dayoff = row["clientmts_dayoff_policy"]
-    m_dayoff = row["maidmts_dayoff_policy"]
-    if c_dayoff != "unspecified":
-        max_score += weight_strong
-        if c_dayoff not in ["", "unspecified"] and m_dayoff != "refuses_fixed_sunday":
-            score += weight_strong
-
-    # Living Arrangement
-    c_living = row["clientmts_living_arrangement"]
-    m_living = row["maidmts_living_arrangement"]
-    if c_living != "unspecified":
-        max_score += weight_strong
-        if (
-            ("private_room" in c_living and "requires_no_private_room" not in m_living)
-            and ("abu_dhabi" in c_living and "refuses_abu_dhabi" not in m_living)
-        ):
-            score += weight_strong
-
-    # Nationality
-    if "maid_nationality" in row and row["clientmts_nationality_preference"] != "any":
-        max_score += weight_moderate
-        if row["clientmts_nationality_preference"] in str(row["maid_nationality"]):
-            score += weight_moderate
-
-    # Cuisine
-    c_cuisine = row["clientmts_cuisine_preference"]
-    m_cooking = str(row.get("cooking_group", "not_specified"))
-    if c_cuisine != "unspecified" and m_cooking != "not_specified":
-        max_score += weight_moderate
-        c_set = set(c_cuisine.split("+"))
-        m_set = set(m_cooking.split("+"))
-        if c_set & m_set:
-            score += weight_moderate
-
-    # Special cases
-    c_special = row["clientmts_special_cases"]
-    m_care = row["maidpref_caregiving_profile"]
-    if c_special != "unspecified":
-        max_score += weight_bonus
-        if (
-            (c_special == "elderly" and m_care in ["elderly_experienced", "elderly_and_special"]) or
-            (c_special == "special_needs" and m_care in ["special_needs", "elderly_and_special"]) or
-            (c_special == "elderly_and_special" and m_care == "elderly_and_special")
-        ):
-            score += weight_bonus
-
-    # Kids experience
-    if c_house in ["baby", "many_kids", "baby_and_kids"]:
-        max_score += weight_bonus
-        if (
-            (c_house == "baby" and row["maidpref_kids_experience"] in ["lessthan2", "both"]) or
-            (c_house == "many_kids" and row["maidpref_kids_experience"] in ["above2", "both"]) or
-            (c_house == "baby_and_kids" and row["maidpref_kids_experience"] == "both")
-        ):
-            score += weight_bonus
-
-    # Pets handling
-    if c_pets != "no_pets":
-        max_score += weight_bonus
-        if (
-            (c_pets == "cat" and row["maidpref_pet_handling"] in ["cats", "both"]) or
-            (c_pets == "dog" and row["maidpref_pet_handling"] in ["dogs", "both"]) or
-            (c_pets == "both" and row["maidpref_pet_handling"] == "both")
-        ):
-            score += weight_bonus
-
-    # Vegetarian / lifestyle
-    if "veg" in c_cuisine:
-        max_score += weight_bonus
-        if "veg_friendly" in str(row["maidpref_personality"]):
-            score += weight_bonus
-
-    # Smoking
-    max_score += weight_bonus
-    if row["maidpref_smoking"] == "non_smoker":
-        score += weight_bonus
-
-    if max_score > 0:
-        return score / max_score
-    return 0.0
+def assignment_name(capacity, solver):
+    return f"assignment {capacity} {solver}"
+
+
+def deferred_assignment(df, cache, key, capacity, solver):
+    """{name: compute} of Tab 4's capacity-constrained plan, cached with the dataset's other results."""
+    return {assignment_name(capacity, solver): lambda: cached_assignment(df, cache, key, capacity, solver)}
+
+
+@st.cache_resource
+def search_jobs():
+    """Global searches running in this process, shared by every session."""
+    return SearchJobs()
+
+
+def deferred_results(df, cache, key, lazy, previous_state, jobs):
+    """{name: compute} of the results the tabs read through lazy (LazyResults of df)."""
+    return {
+        # A changed upload only rescores the client rows / maid columns whose
+        # profiles changed in previous_state, unless its results are cached;
+        # a full search runs as the dataset's background job, until lazy closes
+        "global search": lambda: synced_matching_state(
+            df, cache, key, MAX_SHORTLIST, previous_state,
+            search=lambda: jobs.search(df, cache, key, MAX_SHORTLIST, stop=lazy.closed),
+        ),
+        "best matches": lambda: lazy.get("global search")[0].best_matches(),
+        # Counts and score sums by client feature value and score bin; every
+        # Summary Metrics figure reads from it
+        "score cube": lambda: score_cube(df, lazy.get("best matches")),
+        # Paging index of the maids for Tab 3 (a few ms; no snapshot needed)
+        "maid index": lambda: MaidIndex(df),
+        # Theme counts are cached with the dataset's other results
+        "driver counts": lambda: cache.get_or_compute(key, "drivers", lambda: driver_counts(df)),
+        # Tab 4's default plan; other (capacity, solver) choices are defined when picked
+        **deferred_assignment(df, cache, key, 1, "auto"),
+    }
+
+
+@st.fragment(run_every=1)
+def search_progress(lazy):
+    """Progress bar, ETA and partial results of lazy's global search, refreshed every second.
+
+    Reruns the whole app once the search is done.
+    """
+    status = lazy.status("global search")
+    if status == "done":
+        st.rerun()
+    if status == "failed":
+        try:
+            lazy.get("global search")
+        except Cancelled:
+            st.warning("The global search was cancelled.")
+        except Exception as e:
+            st.error(f"The global search failed: {e!r}")
+        if st.button("Restart the global search"):
+            lazy.forget("global search", "best matches", "score cube")
+            st.rerun()
+        return
+
+    job = search_jobs().get(lazy.key)
+    if job is None or job.done.is_set():
+        # Queued, loading cached results or syncing the profiles changed since the last upload
+        st.progress(0.0, text="Preparing the global search…")
+        return
+    eta = job.eta()
+    st.progress(job.fraction, text=f"Global search: {job.fraction:.0%} of clients matched" + (
+        f", about {eta:.0f}s left" if eta is not None else ""))
+    if st.button("Cancel search"):
+        job.cancel()
+    if job.state is not None:
+        partial = job.state.best_matches()
+        st.caption(f"Best maids of the {len(partial):,} clients matched so far")
+        st.dataframe(partial[["client_name", "best_maid_id", "match_score_pct"]])
 
 
-# -------------------------------
-# Expanded Explanation Function
-# -------------------------------
-def explain_row_score(row):
-    explanations = {"positive": [], "negative": [], "neutral": []}
-
-    # Household
-    c_house = row.get("clientmts_household_type", "unspecified")
-    m_house = row.get("maidmts_household_type", "unspecified")
-    if c_house != "unspecified":
-        if c_house == "baby" and m_house != "refuses_baby":
-            explanations["positive"].append("Client wants baby care, maid accepts it.")
-        elif c_house == "baby":
-            explanations["negative"].append("Client wants baby care, maid refuses it.")
-        elif c_house == "many_kids" and m_house != "refuses_many_kids":
-            explanations["positive"].append("Client has many kids, maid accepts it.")
-        elif c_house == "many_kids":
-            explanations["negative"].append("Client has many kids, maid refuses it.")
-    else:
-        explanations["neutral"].append("Client did not specify household type.")
-
-    # Pets
-    c_pets = row.get("clientmts_pet_type", "no_pets")
-    m_pets = row.get("maidmts_pet_type", "unspecified")
-    if c_pets != "no_pets":
-        if c_pets == "cat" and m_pets != "refuses_cat":
-            explanations["positive"].append("Client has cats, maid accepts cats.")
-        elif c_pets == "cat":
-            explanations["negative"].append("Client has cats, maid refuses cats.")
-        elif c_pets == "dog" and m_pets != "refuses_dog":
-            explanations["positive"].append("Client has dogs, maid accepts dogs.")
-        elif c_pets == "dog":
-            explanations["negative"].append("Client has dogs, maid refuses dogs.")
-    else:
-        explanations["neutral"].append("Client did not specify pets.")
-
-    # Day-off
-    c_dayoff = row.get("clientmts_dayoff_policy", "unspecified")
-    m_dayoff = row.get("maidmts_dayoff_policy", "unspecified")
-    if c_dayoff != "unspecified":
-        if m_dayoff != "refuses_fixed_sunday":
-            explanations["positive"].append("Client specified day-off, maid accepts flexible policy.")
-        else:
-            explanations["negative"].append("Client specified day-off, maid refuses fixed Sunday.")
-    else:
-        explanations["neutral"].append("Client did not specify day-off policy.")
-
-    # Living arrangement
-    c_living = row.get("clientmts_living_arrangement", "unspecified")
-    m_living = row.get("maidmts_living_arrangement", "unspecified")
-    if c_living != "unspecified":
-        if ("private_room" in str(c_living) and "requires_no_private_room" not in str(m_living)):
-            explanations["positive"].append("Client requires private room, maid accepts it.")
-        else:
-            explanations["negative"].append("Client requires private room, maid refuses it.")
-    else:
-        explanations["neutral"].append("Client did not specify living arrangement.")
-
-    # Nationality
-    c_nat = row.get("clientmts_nationality_preference", "any")
-    m_nat = str(row.get("maid_nationality", "unspecified"))
-    if c_nat != "any":
-        if c_nat in m_nat:
-            explanations["positive"].append(f"Client prefers {c_nat}, maid matches it.")
-        else:
-            explanations["negative"].append(f"Client prefers {c_nat}, maid does not match.")
-    else:
-        explanations["neutral"].append("Client did not specify nationality preference.")
-
-    # Cuisine
-    c_cuisine = row.get("clientmts_cuisine_preference", "unspecified")
-    m_cooking = str(row.get("cooking_group", "not_specified"))
-    if c_cuisine != "unspecified" and m_cooking != "not_specified":
-        c_set = set(str(c_cuisine).split("+"))
-        m_set = set(m_cooking.split("+"))
-        if c_set & m_set:
-            explanations["positive"].append("Client cuisine preference matches maid cooking skills.")
-        else:
-            explanations["negative"].append("Client cuisine preference does not match maid cooking skills.")
-    else:
-        explanations["neutral"].append("Client did not specify cuisine preference.")
-
-    # Special cases
-    c_special = row.get("clientmts_special_cases", "unspecified")
-    m_care = row.get("maidpref_caregiving_profile", "unspecified")
-    if c_special != "unspecified":
-        if (
-            (c_special == "elderly" and m_care in ["elderly_experienced", "elderly_and_special"]) or
-            (c_special == "special_needs" and m_care in ["special_needs", "elderly_and_special"]) or
-            (c_special == "elderly_and_special" and m_care == "elderly_and_special")
-        ):
-            explanations["positive"].append("Client requires caregiving, maid has relevant experience.")
-        else:
-            explanations["negative"].append("Client requires caregiving, maid lacks the required experience.")
-    else:
-        explanations["neutral"].append("Client did not specify caregiving needs.")
-
-    # Smoking
-    m_smoke = row.get("maidpref_smoking", "unspecified")
-    if m_smoke == "non_smoker":
-        explanations["positive"].append("Maid is a non-smoker.")
-    else:
-        explanations["neutral"].append("Maid profile indicates smoking tolerance or unspecified.")
-
-    return explanations
 # -------------------------------
 # Streamlit UI
 # -------------------------------
 st.title("Maids.cc Matching Score App")
 
-uploaded_file = st.file_uploader("Upload dataset (Excel/CSV)", type=["xlsx", "csv"])
+uploaded_file = st.file_uploader("Upload dataset (Excel/CSV/Parquet/Arrow)", type=UPLOAD_TYPES)
 
 if uploaded_file:
-    if uploaded_file.name.endswith(".csv"):
-        df = pd.read_csv(uploaded_file)
-    else:
-        df = pd.read_excel(uploaded_file)
+    # Stage timings of this run; filled in below, shown in the Performance panel
+    perf = Profiler(
+        trace_memory=st.session_state.get("perf_trace_memory", False),
+        cprofile=st.session_state.pop("profile_next_run", False),
+    ).start()
+    perf_panel = st.expander("Performance")
+
+    with perf.stage("parse upload") as info:
+        df = read_upload(uploaded_file)
+        info["rows"] = len(df)
+
+    # Results of a dataset seen before (any session, any restart) come from the
+    # on-disk cache, keyed by the content of its scoring columns.
+    result_cache = ResultCache()
+    with perf.stage("fingerprint", rows=len(df)):
+        data_key = fingerprint(df)
 
     # Compute scores for tagged pairs
-    df["match_score"] = df.apply(calculate_row_score, axis=1)
-    df["match_score_pct"] = df["match_score"] * 100
+    with perf.stage("tagged scores", rows=len(df), cached=result_cache.has(data_key, "tagged")):
+        df["match_score"] = cached_tagged_scores(df, result_cache, data_key, calculate_frame_scores)
+        df["match_score_pct"] = df["match_score"] * 100
+
+    # Everything past the tagged scores is computed per dataset when a tab first
+    # needs it (only the open tab runs); the rest is built in the background
+    # once this run's content is out (see the end of the script).
+    lazy = st.session_state.get("lazy_results")
+    if lazy is None or lazy.key != data_key:
+        if lazy is not None:
+            # Closing lets go of the stale upload's background search (see SearchJobs)
+            lazy.close()
+            # The new upload's global search syncs the last finished state in place
+            status = lazy.status("global search")
+            if status == "done":
+                st.session_state["matching_state"] = lazy.get("global search")[0]
+            elif status != "missing":  # still running or failed: may be half-synced
+                st.session_state.pop("matching_state", None)
+        lazy = st.session_state["lazy_results"] = LazyResults(data_key)
+    lazy.define(deferred_results(df, result_cache, data_key, lazy, st.session_state.get("matching_state"),
+                                 search_jobs()))
+
+    def deferred_stage(name, **info):
+        """lazy.get(name) timed as a Performance stage (seconds = this run's wait)."""
+        with perf.stage(name, **info) as record:
+            value = lazy.get(name)
+            record.update(lazy.timing(name))
+        return value
+
+    # Tabs reading the global search show its progress until it is done
+    search_done = lazy.status("global search") == "done"
 
     # Tabs
     tab1, tab2, tab3, tab4 = st.tabs([
@@ -246,556 +177,480 @@ if uploaded_file:
         "Best Maid per Client (Global Search)", 
         "Maid Profiles",
         "Summary Metrics"
-    ])
+    ], key="active_tab", on_change="rerun")
 
     # -------------------------------
     # Tab 1: Tagged pairs
     # -------------------------------
-    with tab1:
-        st.subheader("All Match Scores (tagged pairs)")
-        st.dataframe(df[["client_name", "maid_id", "match_score_pct"]])
+    if tab1.open:
+        with tab1:
+            st.subheader("All Match Scores (tagged pairs)")
+            st.dataframe(df[["client_name", "maid_id", "match_score_pct"]])
 
-        # --- Explanation block for tagged pairs ---
-        st.subheader("Explain a Tagged Pair Match")
-        sel_idx = st.selectbox("Choose a row", df.index, format_func=lambda i: f"{df.loc[i,'client_name']} ↔ {df.loc[i,'maid_id']}")
-        sel_row = df.loc[sel_idx].to_dict()
+            # --- Explanation block for tagged pairs ---
+            st.subheader("Explain a Tagged Pair Match")
+            # Labels built in one pass; a df.loc lookup per option dominated large uploads
+            pair_labels = dict(zip(df.index, (df["client_name"].astype(str) + " ↔ " + df["maid_id"].astype(str)).tolist()))
+            sel_idx = st.selectbox("Choose a row", df.index, format_func=pair_labels.__getitem__)
+            sel_row = df.loc[sel_idx].to_dict()
 
-        st.write(f"**Client:** {sel_row['client_name']}  \n**Maid:** {sel_row['maid_id']}  \n**Score:** {sel_row['match_score_pct']:.1f}%")
+            st.write(f"**Client:** {sel_row['client_name']}  \n**Maid:** {sel_row['maid_id']}  \n**Score:** {sel_row['match_score_pct']:.1f}%")
 
-        explanations = explain_row_score(sel_row)
+            explanations = explain_row_score(sel_row)
 
-        with st.expander("Positive Matches"):
-            for r in explanations["positive"]:
-                st.write(f"- {r}")
+            with st.expander("Positive Matches"):
+                for r in explanations["positive"]:
+                    st.write(f"- {r}")
 
-        with st.expander("Negative Mismatches"):
-            for r in explanations["negative"]:
-                st.write(f"- {r}")
+            with st.expander("Negative Mismatches"):
+                for r in explanations["negative"]:
+                    st.write(f"- {r}")
 
-        with st.expander("Neutral Notes"):
-            for r in explanations["neutral"]:
-                st.write(f"- {r}")
+            with st.expander("Neutral Notes"):
+                for r in explanations["neutral"]:
+                    st.write(f"- {r}")
 
 
     # -------------------------------
     # Tab 2: Best Maid per Client (Global Search)
     # -------------------------------
-    with tab2:
-        st.subheader("Best Maid per Client (Global Search Across All Maids)")
-
-        @st.cache_data
-        def compute_best_matches(df):
-            clients_df = df.drop_duplicates(subset=["client_name"]).copy()
-            maids_df = df.drop_duplicates(subset=["maid_id"]).copy()
-        
-            best_matches = []
-        
-            for _, client_row in clients_df.iterrows():
-                best_score = -1
-                best_maid = None
-                best_combined = None
-        
-                for _, maid_row in maids_df.iterrows():
-                    # Build a combined row: clientmts_* from client, maidmts_/maidpref_ from maid
-                    combined = {}
-                    for col in df.columns:
-                        if col.startswith("clientmts_"):
-                            combined[col] = client_row[col]
-                        elif col.startswith("maidmts_") or col.startswith("maidpref_") or col.startswith("maid_"):
-                            combined[col] = maid_row[col]
-        
-                    score = calculate_row_score(combined)
-                    if score > best_score:
-                        best_score = score
-                        best_maid = maid_row["maid_id"]
-                        best_combined = combined
-        
-                best_matches.append({
-                    "client_name": client_row["client_name"],
-                    "best_maid_id": best_maid,
-                    "match_score_pct": best_score * 100,
-                    "combined": best_combined
-                })
-        
-            return pd.DataFrame(best_matches)
-
-
-        best_client_df = compute_best_matches(df)
-        st.dataframe(best_client_df[["client_name", "best_maid_id", "match_score_pct"]])
+    if tab2.open and search_done:
+        with tab2:
+            st.subheader("Best Maid per Client (Global Search Across All Maids)")
+
+            with perf.stage("global search", rows=len(df)) as info:
+                matching_state, info["mode"] = lazy.get("global search")
+                info.update(lazy.timing("global search"))
+                compression = matching_state.compression()
+                info["pairs"] = compression["clients"] * compression["maids"]
+            best_client_df = deferred_stage("best matches")
+            st.dataframe(best_client_df[["client_name", "best_maid_id", "match_score_pct"]])
+            st.caption(
+                f"{compression['clients']:,} clients × {compression['maids']:,} maids scored as "
+                f"{compression['client_profiles']:,} × {compression['maid_profiles']:,} distinct preference profiles "
+                f"({compression['ratio']:.1f}× fewer pairs)."
+            )
 
-        # Explanation
-        st.subheader("Explain a Best Match (Global Search)")
-        client_sel = st.selectbox("Choose Client", best_client_df["client_name"].unique())
-        best_row = best_client_df[best_client_df["client_name"] == client_sel].iloc[0]
+            # Explanation
+            st.subheader("Explain a Best Match (Global Search)")
+            client_sel = st.selectbox("Choose Client", best_client_df["client_name"].unique())
+            best_row = best_client_df[best_client_df["client_name"] == client_sel].iloc[0]
 
-        st.write(f"**Best Maid:** {best_row['best_maid_id']}  \n**Match Score:** {best_row['match_score_pct']:.1f}%")
+            st.write(f"**Best Maid:** {best_row['best_maid_id']}  \n**Match Score:** {best_row['match_score_pct']:.1f}%")
 
-        explanations = explain_row_score(best_row["combined"])
-        with st.expander("Positive Matches"):
-            for r in explanations["positive"]:
-                st.write(f"- {r}")
-        with st.expander("Negative Mismatches"):
-            for r in explanations["negative"]:
-                st.write(f"- {r}")
-        with st.expander("Neutral Notes"):
-            for r in explanations["neutral"]:
-                st.write(f"- {r}")
+            best_pair = matching_state.combined(best_row["client_slot"], best_row["maid_slot"])
+            explanations = explain_row_score(best_pair)
+            with st.expander("Positive Matches"):
+                for r in explanations["positive"]:
+                    st.write(f"- {r}")
+            with st.expander("Negative Mismatches"):
+                for r in explanations["negative"]:
+                    st.write(f"- {r}")
+            with st.expander("Neutral Notes"):
+                for r in explanations["neutral"]:
+                    st.write(f"- {r}")
 
+            # Top-K shortlist
+            st.subheader("Top-K Shortlist per Client")
+            top_k = st.slider("Candidates per client (K)", min_value=1, max_value=MAX_SHORTLIST, value=10)
+            shortlist_df = matching_state.top_k_matches(top_k)
+            shortlist_client = st.selectbox("Choose Client for shortlist", best_client_df["client_name"].unique())
+            st.dataframe(shortlist_df[shortlist_df["client_name"] == shortlist_client], hide_index=True)
+            st.download_button(
+                "Download full shortlist (CSV)",
+                shortlist_df.to_csv(index=False),
+                file_name=f"top_{top_k}_shortlist.csv",
+                mime="text/csv"
+            )
+    elif tab2.open:
+        with tab2:
+            st.subheader("Best Maid per Client (Global Search Across All Maids)")
+            search_progress(lazy)
 
     # -------------------------------
     # Tab 3: Maid Profile Explorer
     # -------------------------------
-    with tab3:
-        st.subheader("Maid Profile Explorer")
-    
-        # Deduplicate by maid_id
-        maids_df = df.drop_duplicates(subset=["maid_id"]).copy()
-        maids_df = maids_df.loc[:, ~maids_df.columns.duplicated()]
-    
-        # Detect maid-related columns (exclude 'maidmts_at_hiring')
-        maid_cols = [
-            c for c in maids_df.columns
-            if (c.startswith("maidmts_") or c.startswith("maidpref_") or c.startswith("maid_"))
-            and c != "maidmts_at_hiring"
-        ]
-    
-        # Detect engineered language columns
-        lang_cols = [c for c in maids_df.columns if c.startswith("maidspeaks_")]
-    
-        # Group Explorer
-        st.markdown("### Group Maids by Feature")
-    
-        feature_choice = st.selectbox(
-            "Choose a feature to group by",
-            maid_cols + ["maid_speaks_language"]  # add a synthetic option for languages
-        )
-    
-        if feature_choice == "maid_speaks_language":
-            # Handle languages separately from other features
-            for lang_col in lang_cols:
-                lang_name = lang_col.replace("maidspeaks_", "").capitalize()
-                maid_ids = maids_df.loc[maids_df[lang_col] == 1, "maid_id"].tolist()
-    
-                with st.expander(f"maid_speaks_language: {lang_name}"):
-                    for mid in sorted(maid_ids):
-                        if st.button(f"Maid {mid}", key=f"maid_lang_{lang_name}_{mid}"):
-                            maid_row = maids_df[maids_df["maid_id"] == mid].iloc[0]
-                            st.markdown(f"### Maid {maid_row['maid_id']}")
-                            for col in maid_cols + lang_cols:
-                                st.write(f"- **{col}**: {maid_row[col]}")
-        else:
-            # Normal grouping for all other features
-            grouped = maids_df.groupby(feature_choice)["maid_id"].apply(list).reset_index()
-    
-            for _, row in grouped.iterrows():
-                with st.expander(f"{feature_choice}: {row[feature_choice]}"):
-                    for mid in sorted(row["maid_id"]):
-                        if st.button(f"Maid {mid}", key=f"maid_{feature_choice}_{mid}"):
-                            maid_row = maids_df[maids_df["maid_id"] == mid].iloc[0]
-                            st.markdown(f"### Maid {maid_row['maid_id']}")
-                            for col in maid_cols + lang_cols:
-                                st.write(f"- **{col}**: {maid_row[col]}")
+    if tab3.open:
+        with tab3:
+            st.subheader("Maid Profile Explorer")
+
+            maid_index = deferred_stage("maid index", rows=len(df))
+
+            # Group Explorer
+            st.markdown("### Group Maids by Feature")
+
+            feature_choice = st.selectbox(
+                "Choose a feature to group by",
+                maid_index.features  # maid columns plus a synthetic option for languages
+            )
+
+            if feature_choice == LANGUAGE_FEATURE:
+                languages = st.multiselect("Speaks", maid_index.languages)
+                group_label = "maid_speaks_language: " + (", ".join(languages) or "any")
+                positions = maid_index.speakers(languages)
+            else:
+                groups = maid_index.groups(feature_choice)
+                group_value = st.selectbox(
+                    f"{feature_choice} value",
+                    list(groups),
+                    format_func=lambda v: f"{v} ({len(groups[v])} maids)",
+                )
+                group_label = f"{feature_choice}: {group_value}"
+                positions = maid_index.members(feature_choice, group_value)
+
+            query = st.text_input("Search maid ID", key="maid_search")
+            positions = maid_index.search(positions, query)
+
+            n_pages = maid_index.n_pages(positions)
+            # Keyed on the filter, so a new group or search starts again at page 1
+            page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, step=1,
+                                   key=f"maid_page_{group_label}_{query}")
+            st.caption(f"{group_label} — {len(positions):,} maids")
+
+            # Only the visible page gets widgets; a profile loads when its button is clicked
+            for mid in maid_index.page(positions, page - 1):
+                if st.button(f"Maid {mid}", key=f"maid_{mid}"):
+                    st.session_state["maid_profile_id"] = mid
+
+            mid = st.session_state.get("maid_profile_id")
+            if mid is not None and mid in maid_index.page(positions, page - 1):
+                st.markdown(f"### Maid {mid}")
+                for col, value in maid_index.profile(mid).items():
+                    st.write(f"- **{col}**: {value}")
 
     # -------------------------------
     # Tab 4: Summary Metrics
     # -------------------------------
-    with tab4:
-        st.subheader(" Summary Metrics")
-    
-        # Compute averages
-        avg_tagged = df["match_score_pct"].mean()
-        avg_best = best_client_df["match_score_pct"].mean()
-        delta = avg_best - avg_tagged
+    if tab4.open and search_done:
+        with tab4:
+            st.subheader(" Summary Metrics")
+
+            import plotly.express as px
+
+            matching_state, _ = deferred_stage("global search", rows=len(df))
+            best_client_df = deferred_stage("best matches")
+            cube = deferred_stage("score cube", rows=len(df))
+
+            # Compute averages
+            avg_tagged = cube_mean(cube, "Tagged")
+            avg_best = cube_mean(cube, "Best")
+            delta = avg_best - avg_tagged
     
-        col1, col2, col3 = st.columns(3)
+            col1, col2, col3 = st.columns(3)
     
-        with col1:
-            st.metric("Avg Tagged Match Score", f"{avg_tagged:.1f}%")
-            st.caption("This is where we stand today — less than one in four tagged placements are truly optimal. Every mismatch carries hidden costs in refunds, churn, and service quality.")
+            with col1:
+                st.metric("Avg Tagged Match Score", f"{avg_tagged:.1f}%")
+                st.caption("This is where we stand today — less than one in four tagged placements are truly optimal. Every mismatch carries hidden costs in refunds, churn, and service quality.")
     
-        with col2:
-            st.metric("Avg Best Match Score", f"{avg_best:.1f}%")
-            st.caption("This is the opportunity ceiling — the alignment possible if every client were paired with their strongest-fit maid. It’s the benchmark for what ‘good’ looks like.")
+            with col2:
+                st.metric("Avg Best Match Score", f"{avg_best:.1f}%")
+                st.caption("This is the opportunity ceiling — the alignment possible if every client were paired with their strongest-fit maid. It’s the benchmark for what ‘good’ looks like.")
     
-        with col3:
-            st.metric("Improvement", f"{delta:+.1f}%")
-            st.caption("Even a small lift is massive at scale: a 3.7% gain means fewer replacements, higher client satisfaction, and measurable savings across the ERP system.")
-
-        # -------------------------------
-        # Distribution Visualization
-        # -------------------------------
-        st.markdown("### Distribution of Match Scores")
-
-        import plotly.express as px
-        import numpy as np
-
-        # Prepare data for plotting
-        tagged_scores = df[["match_score_pct"]].copy()
-        tagged_scores["type"] = "Tagged"
-
-        best_scores = best_client_df[["match_score_pct"]].copy()
-        best_scores["type"] = "Best"
-
-        dist_data = pd.concat([tagged_scores, best_scores], ignore_index=True)
-
-        # Define bins (0–100 in steps of 10)
-        bins = np.arange(0, 110, 10)
-        dist_data["bin"] = pd.cut(dist_data["match_score_pct"], bins=bins, right=False)
-
-        # Count % per bin
-        grouped = (
-            dist_data.groupby(["bin", "type"])
-            .size()
-            .reset_index(name="count")
-        )
-        grouped["percent"] = grouped.groupby("type")["count"].transform(lambda x: x / x.sum() * 100)
-
-        # Convert Interval objects to string labels for plotting
-        grouped["bin"] = grouped["bin"].astype(str)
-
-        # Grouped bar chart
-        fig = px.bar(
-            grouped,
-            x="bin",
-            y="percent",
-            color="type",
-            barmode="group",
-            color_discrete_map={
-                "Tagged": "#1f77b4",  # darker blue
-                "Best": "#6baed6"     # lighter blue
-            },
-            category_orders={"type": ["Tagged", "Best"]},  # force order
-            labels={"bin": "Match Score Range (%)", "percent": "Percentage of Clients", "type": "Group"},
-            title="Score Distribution: Tagged vs. Best Matches"
-        )
-
-        st.plotly_chart(fig, use_container_width=True)
-
-        st.caption(
-            """
-            - Most placements cluster in the **10–20% match range**, but many of these cases come from clients who **provided no preferences or matching types**. In other words, the system had little to work with
-            - When preferences are specified and data-driven matching is applied, the distribution shifts significantly to the right. This means fewer clients stuck in low-fit assignments, and more moving into stronger alignment bands.
-            - The message is clear: **better input leads to better outcomes**. By capturing and leveraging client preferences systematically, we unlock portfolio-wide improvements in satisfaction, retention, and efficiency.
-            """
-        )
-
-
-        # -------------------------------
-        # Diagnostic Slice: Compare Tagged vs Best by Feature
-        # -------------------------------
-        st.markdown("### 🔎 Diagnostic Slice: Compare Tagged vs Best by Feature")
-
-        # Pick a feature dynamically
-        client_features = [c for c in df.columns if c.startswith("clientmts_")]
-        feature_choice = st.selectbox("Choose a client feature to slice by", client_features)
-
-        if feature_choice:
-            # Prepare tagged scores
-            diag_df = pd.DataFrame({
-                "feature": df[feature_choice],
-                "tagged_score": df["match_score_pct"],
-                "client_name": df["client_name"]
-            })
-
-            # Best scores merged with feature
-            diag_best = best_client_df[["client_name", "match_score_pct"]].merge(
-                df[["client_name", feature_choice]],
-                on="client_name",
-                how="left"
-            )
-            diag_best.rename(columns={"match_score_pct": "best_score"}, inplace=True)
-
-            # Aggregate averages
-            agg = (
-                diag_df.groupby("feature")["tagged_score"].mean().reset_index()
-                .merge(
-                    diag_best.groupby(feature_choice)["best_score"].mean().reset_index(),
-                    left_on="feature",
-                    right_on=feature_choice,
-                    how="outer"
+            with col3:
+                st.metric("Improvement", f"{delta:+.1f}%")
+                st.caption("Even a small lift is massive at scale: a 3.7% gain means fewer replacements, higher client satisfaction, and measurable savings across the ERP system.")
+
+            # -------------------------------
+            # Feasible Plan: Capacity-Constrained Assignment
+            # -------------------------------
+            st.markdown("### Feasible Plan: Capacity-Constrained Assignment")
+
+            cap_col, solver_col = st.columns(2)
+            with cap_col:
+                capacity = st.number_input("Clients per maid (capacity)", min_value=1, max_value=MAX_CAPACITY, value=1)
+            with solver_col:
+                # The exact solver is only offered while the plan fits its size limit
+                n_clients, n_maids = df["client_name"].nunique(dropna=False), df["maid_id"].nunique(dropna=False)
+                exact_ok = exact_fits(n_clients, n_maids, capacity)
+                solver = st.selectbox(
+                    "Solver", [m for m in ASSIGNMENT_METHODS if exact_ok or m != "exact"],
+                    help=None if exact_ok else (f"The exact solver handles up to {EXACT_MAX_CELLS:,} client×slot "
+                                                f"cells; this plan has {n_clients * n_maids * capacity:,}."),
                 )
+
+            lazy.define(deferred_assignment(df, result_cache, data_key, capacity, solver))
+            assignment_df, assignment_stats = deferred_stage(
+                assignment_name(capacity, solver), rows=len(df), capacity=capacity, solver=solver,
+                cached=result_cache.has(data_key, f"assignment{capacity}_{solver}"),
             )
-            agg = agg.drop(columns=[feature_choice])
-
-            # Melt for plotting
-            agg_melted = agg.melt(
-                id_vars="feature",
-                value_vars=["tagged_score", "best_score"],
-                var_name="type",
-                value_name="avg_score"
-            )
-            agg_melted["type"] = agg_melted["type"].map({
-                "tagged_score": "Tagged",
-                "best_score": "Best"
-            })
-
-            # Plot with consistent blue shades # Diagnostic slice chart
-            fig3 = px.bar(
-                agg_melted,
-                x="feature",
-                y="avg_score",
-                color="type",
-                barmode="group",
-                color_discrete_map={
-                    "Tagged": "#1f77b4",
-                    "Best": "#6baed6"
-                },
-                category_orders={"type": ["Tagged", "Best"]},  # force order
-                labels={
-                    "feature": feature_choice,
-                    "avg_score": "Average Match Score (%)",
-                    "type": "Group"
-                },
-                title=f"Average Match Scores by {feature_choice}"
-            )
-            fig3.update_yaxes(range=[0, 100])
 
-            st.plotly_chart(fig3, use_container_width=True)
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Avg Assigned Match Score", f"{assignment_stats['avg_score_pct']:.1f}%")
+            with col2:
+                st.metric("Unconstrained Ceiling", f"{assignment_stats['ceiling_pct']:.1f}%")
+            with col3:
+                st.metric("Solver Runtime", f"{assignment_stats['runtime_s']:.2f}s")
 
             st.caption(
                 f"""
-                This diagnostic slice shows how **{feature_choice}** influences outcomes:
-                - **Tagged assignments** reveal current gaps.  
-                - **Best matches** illustrate how algorithmic matching improves alignment.  
-                - When values are 'unspecified' or 'any', scores tend to be lower — reinforcing that **better input yields better matches**.
+                The best-match ceiling lets one popular maid serve hundreds of clients. This plan gives each maid at most
+                **{capacity}** client(s): **{assignment_stats['assigned']:,}** of **{assignment_stats['clients']:,}** clients
+                are placed by the **{assignment_stats['method']}** solver (unplaced clients count as 0%).
+                """
+            )
+            if assignment_stats.get("note"):
+                st.info(f"Note: {assignment_stats['note']}.")
+
+            # -------------------------------
+            # Distribution Visualization
+            # -------------------------------
+            st.markdown("### Distribution of Match Scores")
+
+            # Count % per bin (0–100 in steps of 10)
+            grouped = cube_histogram(cube)
+
+            # Grouped bar chart
+            with perf.stage("figure: score distribution"):
+                fig = px.bar(
+                    grouped,
+                    x="bin",
+                    y="percent",
+                    color="type",
+                    barmode="group",
+                    color_discrete_map={
+                        "Tagged": "#1f77b4",  # darker blue
+                        "Best": "#6baed6"     # lighter blue
+                    },
+                    category_orders={"type": ["Tagged", "Best"]},  # force order
+                    labels={"bin": "Match Score Range (%)", "percent": "Percentage of Clients", "type": "Group"},
+                    title="Score Distribution: Tagged vs. Best Matches"
+                )
+
+            st.plotly_chart(fig, use_container_width=True)
+
+            st.caption(
+                """
+                - Most placements cluster in the **10–20% match range**, but many of these cases come from clients who **provided no preferences or matching types**. In other words, the system had little to work with
+                - When preferences are specified and data-driven matching is applied, the distribution shifts significantly to the right. This means fewer clients stuck in low-fit assignments, and more moving into stronger alignment bands.
+                - The message is clear: **better input leads to better outcomes**. By capturing and leveraging client preferences systematically, we unlock portfolio-wide improvements in satisfaction, retention, and efficiency.
                 """
             )
 
-        # -------------------------------
-        # Client Drilldown: Tagged vs Best
-        # -------------------------------
-        st.markdown("### 👥 Client Drilldown: Tagged vs Best Match")
+
+            # -------------------------------
+            # Diagnostic Slice: Compare Tagged vs Best by Feature
+            # -------------------------------
+            st.markdown("### 🔎 Diagnostic Slice: Compare Tagged vs Best by Feature")
+
+            # Pick a feature dynamically
+            client_features = cube_features(cube)
+            feature_choice = st.selectbox("Choose a client feature to slice by", client_features)
+
+            if feature_choice:
+                # Average tagged / best scores per feature value
+                agg = cube_slice(cube, feature_choice)
+
+                # Melt for plotting
+                agg_melted = agg.melt(
+                    id_vars="feature",
+                    value_vars=["tagged_score", "best_score"],
+                    var_name="type",
+                    value_name="avg_score"
+                )
+                agg_melted["type"] = agg_melted["type"].map({
+                    "tagged_score": "Tagged",
+                    "best_score": "Best"
+                })
+
+                # Plot with consistent blue shades # Diagnostic slice chart
+                with perf.stage("figure: diagnostic slice"):
+                    fig3 = px.bar(
+                        agg_melted,
+                        x="feature",
+                        y="avg_score",
+                        color="type",
+                        barmode="group",
+                        color_discrete_map={
+                            "Tagged": "#1f77b4",
+                            "Best": "#6baed6"
+                        },
+                        category_orders={"type": ["Tagged", "Best"]},  # force order
+                        labels={
+                            "feature": feature_choice,
+                            "avg_score": "Average Match Score (%)",
+                            "type": "Group"
+                        },
+                        title=f"Average Match Scores by {feature_choice}"
+                    )
+                    fig3.update_yaxes(range=[0, 100])
+
+                st.plotly_chart(fig3, use_container_width=True)
+
+                st.caption(
+                    f"""
+                    This diagnostic slice shows how **{feature_choice}** influences outcomes:
+                    - **Tagged assignments** reveal current gaps.  
+                    - **Best matches** illustrate how algorithmic matching improves alignment.  
+                    - When values are 'unspecified' or 'any', scores tend to be lower — reinforcing that **better input yields better matches**.
+                    """
+                )
+
+            # -------------------------------
+            # Client Drilldown: Tagged vs Best
+            # -------------------------------
+            st.markdown("### 👥 Client Drilldown: Tagged vs Best Match")
     
-        # Select a client
-        drill_client = st.selectbox("Choose a client to compare", df["client_name"].unique())
+            # Select a client
+            drill_client = st.selectbox("Choose a client to compare", df["client_name"].unique())
     
-        # Get tagged row for this client
-        tagged_row = df[df["client_name"] == drill_client].iloc[0]
+            # Get tagged row for this client
+            tagged_row = df[df["client_name"] == drill_client].iloc[0]
     
-        # Get best row for this client
-        best_row = best_client_df[best_client_df["client_name"] == drill_client].iloc[0]
+            # Get best row for this client
+            best_row = best_client_df[best_client_df["client_name"] == drill_client].iloc[0]
     
-        col1, col2 = st.columns(2)
+            col1, col2 = st.columns(2)
     
-        # --- Tagged Maid ---
-        with col1:
-            st.subheader("Tagged Maid")
-            st.write(f"**Maid:** {tagged_row['maid_id']}")
-            st.write(f"**Match Score:** {tagged_row['match_score_pct']:.1f}%")
-            explanations_tagged = explain_row_score(tagged_row.to_dict())
+            # --- Tagged Maid ---
+            with col1:
+                st.subheader("Tagged Maid")
+                st.write(f"**Maid:** {tagged_row['maid_id']}")
+                st.write(f"**Match Score:** {tagged_row['match_score_pct']:.1f}%")
+                explanations_tagged = explain_row_score(tagged_row.to_dict())
     
-            with st.expander("Positive Matches"):
-                for r in explanations_tagged["positive"]:
-                    st.write(f"- {r}")
-            with st.expander("Negative Mismatches"):
-                for r in explanations_tagged["negative"]:
-                    st.write(f"- {r}")
-            with st.expander("Neutral Notes"):
-                for r in explanations_tagged["neutral"]:
-                    st.write(f"- {r}")
+                with st.expander("Positive Matches"):
+                    for r in explanations_tagged["positive"]:
+                        st.write(f"- {r}")
+                with st.expander("Negative Mismatches"):
+                    for r in explanations_tagged["negative"]:
+                        st.write(f"- {r}")
+                with st.expander("Neutral Notes"):
+                    for r in explanations_tagged["neutral"]:
+                        st.write(f"- {r}")
     
-        # --- Best Maid ---
-        with col2:
-            st.subheader("Best Maid (Global Search)")
-            st.write(f"**Maid:** {best_row['best_maid_id']}")
-            st.write(f"**Match Score:** {best_row['match_score_pct']:.1f}%")
-            explanations_best = explain_row_score(best_row["combined"])
+            # --- Best Maid ---
+            with col2:
+                st.subheader("Best Maid (Global Search)")
+                st.write(f"**Maid:** {best_row['best_maid_id']}")
+                st.write(f"**Match Score:** {best_row['match_score_pct']:.1f}%")
+                best_pair = matching_state.combined(best_row["client_slot"], best_row["maid_slot"])
+                explanations_best = explain_row_score(best_pair)
     
-            with st.expander("Positive Matches"):
-                for r in explanations_best["positive"]:
-                    st.write(f"- {r}")
-            with st.expander("Negative Mismatches"):
-                for r in explanations_best["negative"]:
-                    st.write(f"- {r}")
-            with st.expander("Neutral Notes"):
-                for r in explanations_best["neutral"]:
-                    st.write(f"- {r}")
+                with st.expander("Positive Matches"):
+                    for r in explanations_best["positive"]:
+                        st.write(f"- {r}")
+                with st.expander("Negative Mismatches"):
+                    for r in explanations_best["negative"]:
+                        st.write(f"- {r}")
+                with st.expander("Neutral Notes"):
+                    for r in explanations_best["neutral"]:
+                        st.write(f"- {r}")
     
-        # Caption for context
-        st.caption(
-            """
-            This drilldown highlights the **efficiency gap at the client level**:
-            - **Tagged maid** shows the current placement, often suboptimal.  
-            - **Best maid** represents the algorithmic optimum, with higher alignment.  
-            - The side-by-side view makes it easy to see *what exactly drives the difference*.
-            """
-        )
-        
-        # -------------------------------
-        # Portfolio Risk Buckets
-        # -------------------------------
-        st.markdown("### Portfolio Risk Buckets: Low vs Medium vs High Fit")
-
-        # Create buckets
-        def bucket_score(score):
-            if score < 20:
-                return "Low-fit (<20%)"
-            elif score < 50:
-                return "Medium-fit (20–50%)"
-            else:
-                return "High-fit (>50%)"
-
-        tagged_scores["bucket"] = tagged_scores["match_score_pct"].apply(bucket_score)
-        best_scores["bucket"] = best_scores["match_score_pct"].apply(bucket_score)
-
-        bucket_data = pd.concat([tagged_scores, best_scores], ignore_index=True)
-
-        # Aggregate % by bucket
-        bucket_summary = (
-            bucket_data.groupby(["bucket", "type"])
-            .size()
-            .reset_index(name="count")
-        )
-        bucket_summary["percent"] = bucket_summary.groupby("type")["count"].transform(lambda x: x / x.sum() * 100)
-
-        # Ensure consistent order
-        bucket_order = ["Low-fit (<20%)", "Medium-fit (20–50%)", "High-fit (>50%)"]
-
-        # Stacked bar
-        fig_buckets = px.bar(
-            bucket_summary,
-            x="type",
-            y="percent",
-            color="bucket",
-            category_orders={"bucket": bucket_order, "type": ["Tagged", "Best"]},
-            color_discrete_map={
-                "Low-fit (<20%)": "#9ecae1",      # light blue
-                "Medium-fit (20–50%)": "#9ecae1", # same light blue
-                "High-fit (>50%)": "#08519c"      # dark blue
-            },
-            labels={"type": "Group", "percent": "Percentage of Clients", "bucket": "Risk Bucket"},
-            title="Client Distribution Across Risk Buckets"
-        )        
+            # Caption for context
+            st.caption(
+                """
+                This drilldown highlights the **efficiency gap at the client level**:
+                - **Tagged maid** shows the current placement, often suboptimal.  
+                - **Best maid** represents the algorithmic optimum, with higher alignment.  
+                - The side-by-side view makes it easy to see *what exactly drives the difference*.
+                """
+            )
         
-        st.plotly_chart(fig_buckets, use_container_width=True)
+            # -------------------------------
+            # Portfolio Risk Buckets
+            # -------------------------------
+            st.markdown("### Portfolio Risk Buckets: Low vs Medium vs High Fit")
+
+            # Aggregate % by bucket
+            bucket_summary = cube_buckets(cube)
+
+            # Ensure consistent order
+            bucket_order = BUCKET_ORDER
+
+            # Stacked bar
+            with perf.stage("figure: risk buckets"):
+                fig_buckets = px.bar(
+                    bucket_summary,
+                    x="type",
+                    y="percent",
+                    color="bucket",
+                    category_orders={"bucket": bucket_order, "type": ["Tagged", "Best"]},
+                    color_discrete_map={
+                        "Low-fit (<20%)": "#9ecae1",      # light blue
+                        "Medium-fit (20–50%)": "#9ecae1", # same light blue
+                        "High-fit (>50%)": "#08519c"      # dark blue
+                    },
+                    labels={"type": "Group", "percent": "Percentage of Clients", "bucket": "Risk Bucket"},
+                    title="Client Distribution Across Risk Buckets"
+                )        
+        
+            st.plotly_chart(fig_buckets, use_container_width=True)
         
-        st.caption(
-            """
-            When we shift from tagged to data-driven matching, the difference is clear:
-            - High-fit placements (>50%) climb from 10.9% to 15.0% — a meaningful jump in strong alignments.
-            - Medium-fit (20–50%) holds steady, moving slightly from 23.8% to 23.2%.
-            - Low-fit placements (<20%) drop from 65.3% to 61.8%, showing fewer clients stuck in mismatched assignments.
+            st.caption(
+                """
+                When we shift from tagged to data-driven matching, the difference is clear:
+                - High-fit placements (>50%) climb from 10.9% to 15.0% — a meaningful jump in strong alignments.
+                - Medium-fit (20–50%) holds steady, moving slightly from 23.8% to 23.2%.
+                - Low-fit placements (<20%) drop from 65.3% to 61.8%, showing fewer clients stuck in mismatched assignments.
                   
-            Every percentage point gained in medium-high fit matches translates into fewer costly replacements, stronger satisfaction, and more loyalty secured.
-            """
-        )
-        # -------------------------------
-        # Top Drivers of Match & Mismatch
-        # -------------------------------
-        st.markdown("### 🔎 Top Drivers of Match vs. Mismatch")
-        
-        from collections import Counter
-        import plotly.express as px
-        # --- Theme classifier (consistent with score + explanation logic) ---
-        def classify_theme(reason: str):
-            r = reason.lower()
-        
-            # Household Type
-            if "baby care" in r or "many kids" in r or "household type" in r:
-                return "Household Type"
-        
-            # Kids Experience (bonus logic in score)
-            if "kids experience" in r:
-                return "Kids Experience"
-        
-            # Pets (strong alignment)
-            if "cats" in r or "dogs" in r or "pet" in r:
-                if "refuses" in r:
-                    return "Pets"
-                elif "accepts" in r:
-                    return "Pets"
-        
-            # Pets Handling (bonus logic in score)
-            if "pet handling" in r:
-                return "Pets Handling"
-        
-            # Day-off Policy
-            if "day-off" in r or "sunday" in r:
-                return "Day-off Policy"
-        
-            # Living Arrangement
-            if "private room" in r or "living arrangement" in r:
-                return "Living Arrangement"
-        
-            # Nationality
-            if "nationality" in r or "prefers" in r:
-                return "Nationality"
-        
-            # Cuisine
-            if "cuisine" in r or "cooking" in r:
-                return "Cuisine"
-        
-            # Special Cases
-            if "caregiving" in r or "special needs" in r or "elderly" in r:
-                return "Special Cases"
-        
-            # Vegetarian / Lifestyle
-            if "veg" in r or "vegetarian" in r:
-                return "Vegetarian / Lifestyle"
-        
-            # Smoking
-            if "smoker" in r:
-                return "Smoking"
-        
-            return None  # drop neutrals or anything not in themes
-            
-        # --- Collect reasons across all rows ---
-        mismatch_reasons = []
-        match_reasons = []
-        
-        for _, row in df.iterrows():
-            exps = explain_row_score(row.to_dict())
-            mismatch_reasons.extend([classify_theme(r) for r in exps["negative"]])
-            match_reasons.extend([classify_theme(r) for r in exps["positive"]])
-        
-        # Filter out None (i.e., uncategorized)
-        mismatch_reasons = [r for r in mismatch_reasons if r is not None]
-        match_reasons = [r for r in match_reasons if r is not None]
-        
-        # --- Count and normalize ---
-        mismatch_counts = Counter(mismatch_reasons)
-        match_counts = Counter(match_reasons)
-        
-        mismatch_df = pd.DataFrame(mismatch_counts.items(), columns=["Theme", "Count"])
-        match_df = pd.DataFrame(match_counts.items(), columns=["Theme", "Count"])
-        
-        # Drop themes with zero
-        mismatch_df = mismatch_df[mismatch_df["Count"] > 0]
-        match_df = match_df[match_df["Count"] > 0]
-        
-        mismatch_df["Percent"] = mismatch_df["Count"] / mismatch_df["Count"].sum() * 100
-        match_df["Percent"] = match_df["Count"] / match_df["Count"].sum() * 100
-        
-        # Order by percentage ascending
-        mismatch_df = mismatch_df.sort_values("Percent", ascending=True)
-        match_df = match_df.sort_values("Percent", ascending=True)
-        
-        # Use more space for the charts
-        col1, col2 = st.columns([1, 1])  # equally wide, but more horizontal space
-        
-        with col1:
-            fig_mismatch = px.bar(
-                mismatch_df,
-                x="Percent", y="Theme",
-                orientation="h",
-                color="Percent",
-                color_continuous_scale="Blues",
-                title="Top Drivers of Mismatch"
-            )
-            fig_mismatch.update_traces(text=None)  # remove % labels
-            fig_mismatch.update_layout(coloraxis_showscale=False)  # remove colorbar
-            st.plotly_chart(fig_mismatch, use_container_width=True)
-        
-        with col2:
-            fig_match = px.bar(
-                match_df,
-                x="Percent", y="Theme",
-                orientation="h",
-                color="Percent",
-                color_continuous_scale="Greens",
-                title="Top Drivers of Match"
+                Every percentage point gained in medium-high fit matches translates into fewer costly replacements, stronger satisfaction, and more loyalty secured.
+                """
             )
-            fig_match.update_traces(text=None)  # remove % labels
-            fig_match.update_layout(coloraxis_showscale=False)  # remove colorbar
-            st.plotly_chart(fig_match, use_container_width=True)
-        
+            # -------------------------------
+            # Top Drivers of Match & Mismatch
+            # -------------------------------
+            st.markdown("### 🔎 Top Drivers of Match vs. Mismatch")
+
+            driver_counts_df = deferred_stage("driver counts", rows=len(df), cached=result_cache.has(data_key, "drivers"))
+
+            # --- Count and normalize ---
+            mismatch_df = driver_shares(driver_counts_df, "negative")
+            match_df = driver_shares(driver_counts_df, "positive")
+        
+            # Use more space for the charts
+            col1, col2 = st.columns([1, 1])  # equally wide, but more horizontal space
+        
+            with col1:
+                with perf.stage("figure: mismatch drivers"):
+                    fig_mismatch = px.bar(
+                        mismatch_df,
+                        x="Percent", y="Theme",
+                        orientation="h",
+                        color="Percent",
+                        color_continuous_scale="Blues",
+                        title="Top Drivers of Mismatch"
+                    )
+                    fig_mismatch.update_traces(text=None)  # remove % labels
+                    fig_mismatch.update_layout(coloraxis_showscale=False)  # remove colorbar
+                st.plotly_chart(fig_mismatch, use_container_width=True)
+        
+            with col2:
+                with perf.stage("figure: match drivers"):
+                    fig_match = px.bar(
+                        match_df,
+                        x="Percent", y="Theme",
+                        orientation="h",
+                        color="Percent",
+                        color_continuous_scale="Greens",
+                        title="Top Drivers of Match"
+                    )
+                    fig_match.update_traces(text=None)  # remove % labels
+                    fig_match.update_layout(coloraxis_showscale=False)  # remove colorbar
+                st.plotly_chart(fig_match, use_container_width=True)
+    elif tab4.open:
+        with tab4:
+            st.subheader(" Summary Metrics")
+            search_progress(lazy)
+
+    # -------------------------------
+    # Performance panel
+    # -------------------------------
+    perf.stop()
+    with perf_panel:
+        st.caption(f"{perf.total_seconds:.2f}s measured across {len(perf.records)} stages this run.")
+        st.dataframe(pd.DataFrame(perf.table()))
+        st.download_button("Download timings (JSON)", perf.to_json(), file_name="performance.json",
+                           mime="application/json")
+        st.checkbox("Trace peak memory per stage (slower)", key="perf_trace_memory")
+        if st.button("Capture a cProfile of the next run"):
+            st.session_state["profile_next_run"] = True
+            st.rerun()
+        profile_stats = perf.profile_stats()
+        if profile_stats:
+            st.code(profile_stats)
+            st.download_button("Download profile (text)", profile_stats, file_name="profile.txt")
+
+    # This run's content is out: build what the other tabs need in the background
+    lazy.prefetch("global search", "best matches", "maid index", "score cube", "driver counts",
+                  assignment_name(1, "auto"))
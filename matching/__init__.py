@@ -0,0 +1,12 @@
+from matching.rules import calculate_row_score, explain_row_score
+from matching.tables import EXPLAIN_RULES, SCORE_RULES, RuleTables
+from matching.vectorized import calculate_frame_scores, score_components
+from matching.matrix import ProfileMatrix, compute_best_matches, compute_top_k_matches, split_profiles
+from matching.assignment import compute_assignment, exact_assignment, greedy_assignment
+from matching.roster import Roster, ValuePool
+from matching.incremental import MatchingState
+from matching.summary import driver_counts
+from matching.explorer import MaidIndex
+from matching.batch import run_batch
+from matching.parallel import parallel_top_k
+from matching.pruning import PruningIndex, pruned_top_k
@@ -0,0 +1,37 @@
+import argparse
+import json
+
+from matching.batch import OUTPUT_FORMATS, run_batch
+
+
+# -------------------------------
+# Batch scoring CLI: python -m matching INPUT --out DIR
+# -------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m matching",
+        description="Score tagged pairs, run the global best-match search and summarise match drivers and scores.",
+    )
+    parser.add_argument("input", help="CSV, Parquet, Arrow/Feather or Excel export")
+    parser.add_argument("--out", default="matching_output", help="output directory (default: %(default)s)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="parquet", help="output file format")
+    parser.add_argument("--chunk-rows", type=int, default=100_000, help="rows scored per chunk")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes for chunk scoring and the global search (default: all cores)")
+    parser.add_argument("--top-k", type=int, default=1, help="maids kept per client in best_matches")
+    parser.add_argument("--prune", action="store_true",
+                        help="skip maids whose score bound cannot reach a client's top-K (single process)")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="also write the maids as a memory-mappable roster snapshot (maid_roster.roster)")
+    parser.add_argument("--stats-json", help="also write the throughput stats to this file")
+    args = parser.parse_args(argv)
+
+    stats = run_batch(args.input, args.out, fmt=args.format, chunk_rows=args.chunk_rows,
+                      workers=args.workers, top_k=args.top_k, prune=args.prune, snapshot=args.snapshot)
+    if args.stats_json:
+        with open(args.stats_json, "w") as f:
+            json.dump(stats, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from matching.matrix import ProfileMatrix, select_top_k
+
+# Instances up to this many client×slot cells are solved exactly; larger ones
+# (even when "exact" is asked for) go to the greedy solver.
+EXACT_MAX_CELLS = 250_000
+
+ASSIGNMENT_METHODS = ("auto", "greedy", "exact")
+
+
+def exact_fits(n_clients, n_maids, capacity=1):
+    """Whether the exact solver may take an instance of this size (see EXACT_MAX_CELLS)."""
+    return n_clients * n_maids * capacity <= EXACT_MAX_CELLS
+
+
+# -------------------------------
+# Exact solver: Hungarian algorithm (shortest augmenting paths)
+# -------------------------------
+def hungarian(cost):
+    """Minimum-cost assignment of every row to a distinct column (rows <= columns).
+
+    Returns the column chosen for each row.
+    """
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)    # p[j]: row (1-based) matched to column j
+    way = np.zeros(m + 1, dtype=np.int64)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            cur = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (cur < minv[1:])
+            minv[1:][better] = cur[better]
+            way[1:][better] = j0
+            masked = np.where(free, minv[1:], np.inf)
+            j1 = int(masked.argmin()) + 1
+            delta = masked[j1 - 1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[1:][free] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    cols = np.full(n, -1, dtype=np.int64)
+    matched = np.flatnonzero(p[1:])
+    cols[p[1:][matched] - 1] = matched
+    return cols
+
+
+def exact_assignment(scores, capacity=1):
+    """Maximum-weight assignment; each maid (column) takes up to `capacity` clients."""
+    n_clients, n_maids = scores.shape
+    slots = np.repeat(scores, capacity, axis=1)
+    assigned = np.full(n_clients, -1, dtype=np.int64)
+    if n_clients <= slots.shape[1]:
+        assigned = hungarian(-slots) // capacity
+    else:
+        # More clients than slots: assign every slot to a distinct client instead.
+        slot_client = hungarian(-slots.T)
+        assigned[slot_client] = np.arange(slots.shape[1]) // capacity
+    return assigned
+
+
+# -------------------------------
+# Approximate solver: greedy over each client's top candidates
+# -------------------------------
+def greedy_assignment(pm, capacity=1, candidates=50, block_size=None):
+    """Greedy maximum-weight assignment; returns (maid index per client, best score per client).
+
+    Every round shortlists the top `candidates` open maids of each unassigned
+    client and grants pairs in descending score order. Clients whose shortlist
+    filled up are rescored against the maids that still have capacity.
+    """
+    remaining = np.full(pm.n_maids, capacity, dtype=np.int64)
+    assigned = np.full(pm.n_clients, -1, dtype=np.int64)
+    ceiling = None
+    pending = np.arange(pm.n_clients)
+    block_size = block_size or pm.default_block_size()
+
+    while len(pending) and remaining.any():
+        open_maids = np.flatnonzero(remaining > 0)
+        k = min(candidates, len(open_maids))
+        cand_idx = np.empty((len(pending), k), dtype=np.int64)
+        cand_scores = np.empty((len(pending), k))
+        for start in range(0, len(pending), block_size):
+            rows = pending[start:start + block_size]
+            block = pm.score_block(rows)
+            if len(open_maids) < pm.n_maids:
+                block = block[:, open_maids]
+            idx, sc = select_top_k(block, k)
+            cand_idx[start:start + len(rows)] = open_maids[idx]
+            cand_scores[start:start + len(rows)] = sc
+        if ceiling is None:
+            ceiling = cand_scores[:, 0].copy()
+
+        # Highest score first; ties go to the earlier client, then its better rank.
+        clients = np.repeat(pending, k)
+        ranks = np.tile(np.arange(k), len(pending))
+        order = np.lexsort((ranks, clients, -cand_scores.reshape(-1)))
+        maids = cand_idx.reshape(-1)
+        for pos in order:
+            c, m = clients[pos], maids[pos]
+            if assigned[c] < 0 and remaining[m] > 0:
+                assigned[c] = m
+                remaining[m] -= 1
+        pending = pending[assigned[pending] < 0]
+
+    if ceiling is None:
+        ceiling = np.zeros(pm.n_clients)
+    return assigned, ceiling
+
+
+# -------------------------------
+# Capacity-constrained global assignment
+# -------------------------------
+def compute_assignment(df, capacity=1, method="auto", candidates=50, block_size=None):
+    """Assign clients to maids with at most `capacity` clients per maid.
+
+    Returns (assignment frame, stats); stats report the solver runtime and the
+    achieved average score next to the unconstrained best-match ceiling.
+    "exact" on an instance over EXACT_MAX_CELLS is solved greedily instead,
+    with the reason in stats["note"].
+    """
+    started = time.perf_counter()
+    pm = ProfileMatrix.from_frame(df)
+    requested, note = method, None
+    if method in ("auto", "exact"):
+        fits = exact_fits(pm.n_clients, pm.n_maids, capacity)
+        if method == "exact" and not fits:
+            note = (f"the exact solver is limited to {EXACT_MAX_CELLS:,} client×slot cells, this plan has "
+                    f"{pm.n_clients * pm.n_maids * capacity:,}; solved greedily instead")
+        method = "exact" if fits else "greedy"
+
+    if not pm.n_maids:
+        assigned, ceiling = np.full(pm.n_clients, -1, dtype=np.int64), np.zeros(pm.n_clients)
+    elif method == "exact":
+        scores = pm.score_matrix(block_size)
+        ceiling = scores.max(axis=1)
+        assigned = exact_assignment(scores, capacity)
+    elif method == "greedy":
+        assigned, ceiling = greedy_assignment(pm, capacity, candidates, block_size)
+    else:
+        raise ValueError(f"Unknown assignment method: {method}")
+
+    hit = np.flatnonzero(assigned >= 0)
+    achieved = np.full(pm.n_clients, np.nan)
+    achieved[hit] = pm.score_pairs(hit, assigned[hit])
+    maid_ids = np.full(pm.n_clients, None, dtype=object)
+    maid_ids[hit] = pm.maids_df["maid_id"].to_numpy(dtype=object)[assigned[hit]]
+
+    assignment_df = pd.DataFrame({
+        "client_name": pm.clients_df["client_name"].to_numpy(),
+        "maid_id": maid_ids,
+        "match_score_pct": achieved * 100,
+    })
+    stats = {
+        "method": method,
+        "requested_method": requested,
+        "note": note,
+        "capacity": capacity,
+        "runtime_s": time.perf_counter() - started,
+        "clients": pm.n_clients,
+        "maids": pm.n_maids,
+        "assigned": len(hit),
+        # Clients left without a maid count as zero in the plan average.
+        "avg_score_pct": float(np.nan_to_num(achieved).mean() * 100) if pm.n_clients else 0.0,
+        "avg_assigned_pct": float(np.nanmean(achieved) * 100) if len(hit) else 0.0,
+        "ceiling_pct": float(ceiling.mean() * 100) if pm.n_clients else 0.0,
+    }
+    return assignment_df, stats
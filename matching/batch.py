@@ -0,0 +1,221 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from matching.ingest import is_flag_column, iter_chunks
+from matching.matrix import ProfileMatrix, client_columns, maid_columns
+from matching.pruning import pruned_top_k
+from matching.summary import (
+    best_cube,
+    counts_frame,
+    cube_mean,
+    driver_counts,
+    merge_cubes,
+    merge_driver_counts,
+    tagged_cube,
+)
+from matching.tables import RuleTables
+from matching.vectorized import calculate_frame_scores
+
+OUTPUT_FORMATS = ("parquet", "csv")
+
+
+# -------------------------------
+# Output tables
+# -------------------------------
+class TableWriter:
+    """Appends frames to one Parquet or CSV file without holding them in memory."""
+
+    def __init__(self, path, fmt="parquet"):
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format: {fmt}")
+        self.path = path
+        self.fmt = fmt
+        self._writer = None
+        self._started = False
+
+    def write(self, frame):
+        if self.fmt == "csv":
+            frame.to_csv(self.path, mode="a" if self._started else "w", header=not self._started, index=False)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self._writer is None:
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                table = pa.Table.from_pandas(frame, schema=self._writer.schema, preserve_index=False)
+            self._writer.write_table(table)
+        self._started = True
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def write_table(frame, path, fmt="parquet"):
+    writer = TableWriter(path, fmt)
+    try:
+        writer.write(frame)
+    finally:
+        writer.close()
+
+
+# Columns of the outputs, for inputs without rows
+TAGGED_COLUMNS = ["client_name", "maid_id", "match_score", "match_score_pct"]
+BEST_COLUMNS = ["client_name", "rank", "best_maid_id", "match_score_pct"]
+CUBE_COLUMNS = ["feature", "value", "type", "bin", "score", "count", "sum"]
+
+
+def write_empty_outputs(out, fmt, top_k=1):
+    """Every output of run_batch with its columns and no rows."""
+    write_table(pd.DataFrame(columns=TAGGED_COLUMNS), out("tagged_scores"), fmt)
+    write_table(counts_frame({}, {}), out("driver_summary"), fmt)
+    best_columns = BEST_COLUMNS if top_k > 1 else [c for c in BEST_COLUMNS if c != "rank"]
+    write_table(pd.DataFrame(columns=best_columns), out("best_matches"), fmt)
+    write_table(pd.DataFrame(columns=CUBE_COLUMNS), out("score_summary"), fmt)
+
+
+# -------------------------------
+# Chunk work (runs in worker processes)
+# -------------------------------
+def score_chunk(chunk):
+    """Tagged scores, driver counts and summary cube rows of one chunk of rows."""
+    tables = RuleTables(chunk)
+    scores = calculate_frame_scores(chunk, tables)
+    tagged = pd.DataFrame({
+        "client_name": chunk["client_name"].to_numpy(),
+        "maid_id": chunk["maid_id"].to_numpy(),
+        "match_score": scores,
+        "match_score_pct": scores * 100,
+    })
+    features = chunk[[c for c in chunk.columns if c.startswith("clientmts_")]]
+    cube = tagged_cube(features.assign(match_score_pct=tagged["match_score_pct"].to_numpy()))
+    return tagged, driver_counts(chunk, tables), cube
+
+
+def map_ordered(fn, items, workers=1):
+    """fn over items on a process pool, results in input order, at most 2×workers in flight."""
+    if workers <= 1:
+        for item in items:
+            yield fn(item)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# -------------------------------
+# Batch run
+# -------------------------------
+def run_batch(input_path, out_dir, fmt="parquet", chunk_rows=100_000, workers=None, top_k=1, prune=False,
+              snapshot=False, log=print):
+    """Score a whole export without the UI.
+
+    Writes tagged_scores, best_matches (top_k rows per client when top_k > 1),
+    driver_summary and score_summary (the Tab 4 summary cube) to out_dir and
+    returns throughput stats. Rows stream through in chunks: scored chunks go
+    straight to disk and the summaries are merged as they arrive, so they
+    equal the in-memory ones exactly. Only the first row of every client and
+    maid is kept in memory, for the global search. With snapshot set, the
+    maids are also written as maid_roster.roster (see matching.snapshot).
+    An input without rows gets every output with its columns and no rows.
+    """
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(out_dir, exist_ok=True)
+    out = lambda name: os.path.join(out_dir, f"{name}.{fmt}")
+    stats = {"input": input_path, "workers": workers, "chunk_rows": chunk_rows}
+
+    # --- Tagged pairs, streamed ---
+    started = time.perf_counter()
+    client_parts, maid_parts = [], []
+    seen_clients, seen_maids = set(), set()
+    drivers, cube = None, None
+    n_rows = 0
+
+    def chunks():
+        for chunk in iter_chunks(input_path, chunk_rows):
+            if chunk.empty:
+                continue
+            # First occurrence of every profile, as split_profiles keeps it.
+            clients = chunk.drop_duplicates(subset=["client_name"])
+            clients = clients[~clients["client_name"].isin(seen_clients)]
+            seen_clients.update(clients["client_name"])
+            client_parts.append(clients[["client_name"] + client_columns(chunk.columns)])
+            maids = chunk.drop_duplicates(subset=["maid_id"])
+            maids = maids[~maids["maid_id"].isin(seen_maids)]
+            seen_maids.update(maids["maid_id"])
+            maid_parts.append(maids[maid_columns(chunk.columns) + [c for c in chunk.columns if is_flag_column(c)]])
+            yield chunk
+
+    writer = TableWriter(out("tagged_scores"), fmt)
+    try:
+        for tagged, chunk_drivers, chunk_cube in map_ordered(score_chunk, chunks(), workers):
+            writer.write(tagged)
+            drivers = chunk_drivers if drivers is None else merge_driver_counts([drivers, chunk_drivers])
+            cube = chunk_cube if cube is None else merge_cubes([cube, chunk_cube])
+            n_rows += len(tagged)
+    finally:
+        writer.close()
+    if not n_rows:
+        write_empty_outputs(out, fmt, top_k)
+        stats.update(rows=0, tagged_s=time.perf_counter() - started, rows_per_s=0.0,
+                     clients=0, maids=0, pairs=0, search_s=0.0, pairs_per_s=0.0)
+        log("no rows to score: wrote empty outputs")
+        return stats
+    write_table(drivers, out("driver_summary"), fmt)
+    elapsed = time.perf_counter() - started
+    stats.update(rows=n_rows, tagged_s=elapsed, rows_per_s=n_rows / elapsed if elapsed else 0.0)
+    log(f"tagged scores: {n_rows:,} rows in {elapsed:.2f}s ({stats['rows_per_s']:,.0f} rows/s)")
+
+    # --- Global search over the distinct profiles ---
+    started = time.perf_counter()
+    clients_df = pd.concat(client_parts, ignore_index=True)
+    maids_df = pd.concat(maid_parts, ignore_index=True)
+    pm = ProfileMatrix(clients_df, maids_df)
+    compression = pm.compression()
+    stats.update(client_profiles=compression["client_profiles"], maid_profiles=compression["maid_profiles"],
+                 compression_ratio=compression["ratio"])
+    if prune:
+        top_idx, top_scores, prune_stats = pruned_top_k(pm, top_k)
+        stats["scored_fraction"] = prune_stats["scored_fraction"]
+    else:
+        top_idx, top_scores = pm.top_k(top_k, workers=workers)
+    k = top_idx.shape[1]
+    best = pd.DataFrame({
+        "client_name": np.repeat(clients_df["client_name"].to_numpy(), k),
+        "rank": np.tile(np.arange(1, k + 1), pm.n_clients),
+        "best_maid_id": maids_df["maid_id"].to_numpy()[top_idx.reshape(-1)],
+        "match_score_pct": top_scores.reshape(-1) * 100,
+    })
+    cube = merge_cubes([cube, best_cube(clients_df, best[best["rank"] == 1])])
+    stats.update(tagged_mean_pct=cube_mean(cube, "Tagged"), best_mean_pct=cube_mean(cube, "Best"))
+    if top_k <= 1:
+        best = best.drop(columns="rank")
+    write_table(best, out("best_matches"), fmt)
+    write_table(cube, out("score_summary"), fmt)
+    if snapshot:
+        from matching.snapshot import SNAPSHOT_EXTENSION, write_snapshot
+
+        write_snapshot(maids_df, os.path.join(out_dir, f"maid_roster{SNAPSHOT_EXTENSION}"))
+    elapsed = time.perf_counter() - started
+    pairs = pm.n_clients * pm.n_maids
+    stats.update(clients=pm.n_clients, maids=pm.n_maids, pairs=pairs, search_s=elapsed,
+                 pairs_per_s=pairs / elapsed if elapsed else 0.0)
+    log(f"global search: {pm.n_clients:,} clients x {pm.n_maids:,} maids = {pairs:,} pairs "
+        f"in {elapsed:.2f}s ({stats['pairs_per_s']:,.0f} pairs/s)")
+    log(f"profiles: {compression['client_profiles']:,} x {compression['maid_profiles']:,} distinct "
+        f"({compression['ratio']:.1f}x fewer pairs scored)")
+    if prune:
+        log(f"pruning: scored {stats['scored_fraction']:.1%} of pairs")
+    return stats
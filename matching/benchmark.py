@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from matching.matrix import compute_best_matches, compute_top_k_matches
+from matching.rules import calculate_row_score
+from matching.summary import cube_buckets, cube_features, cube_histogram, cube_slice, driver_counts, score_cube
+from matching.synthetic import synthetic_pairs
+from matching.vectorized import calculate_frame_scores
+
+REPORT_VERSION = 1
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+# The row-by-row reference scorer is only timed up to this many pairs.
+REFERENCE_MAX_PAIRS = 10_000
+
+# A stage is flagged as a regression when it is this much slower than baseline.
+DEFAULT_TOLERANCE = 0.25
+
+# Stages faster than this are too noisy to flag on time alone.
+MIN_COMPARED_SECONDS = 0.05
+
+# Shortlist length of the top-K stage.
+TOP_K = 10
+
+STAGE_NAMES = ("tagged_scores", "global_search", f"top_{TOP_K}", "explanations", "tab4_summary",
+               "tagged_scores_reference")
+
+
+# -------------------------------
+# Benchmarked stages
+# -------------------------------
+def _tab4(df, best):
+    cube = score_cube(df, best)
+    cube_histogram(cube)
+    cube_buckets(cube)
+    for feature in cube_features(cube):
+        cube_slice(cube, feature)
+
+
+def _tab4_stage(df):
+    # The Tab 4 figures read the tagged scores and best matches; computed once, untimed
+    scored = df.assign(match_score_pct=calculate_frame_scores(df) * 100)
+    best = compute_best_matches(df)
+    return lambda: _tab4(scored, best)
+
+
+def stages(df, top_k=TOP_K):
+    """(name, pairs processed, prepare) of every benchmarked stage on one dataset.
+
+    prepare() computes what the stage reads (untimed) and returns the callable
+    to time, so stages left out of a run cost nothing.
+    """
+    n_clients, n_maids = df["client_name"].nunique(), df["maid_id"].nunique()
+    found = [
+        ("tagged_scores", len(df), lambda: lambda: calculate_frame_scores(df)),
+        ("global_search", n_clients * n_maids, lambda: lambda: compute_best_matches(df)),
+        (f"top_{top_k}", n_clients * n_maids, lambda: lambda: compute_top_k_matches(df, top_k)),
+        ("explanations", len(df), lambda: lambda: driver_counts(df)),
+        ("tab4_summary", len(df), lambda: _tab4_stage(df)),
+    ]
+    if len(df) <= REFERENCE_MAX_PAIRS:
+        found.append(("tagged_scores_reference", len(df), lambda: lambda: df.apply(calculate_row_score, axis=1)))
+    return found
+
+
+def measure(fn, repeat=3):
+    """(best wall time in s, peak traced allocation in MB) of fn().
+
+    Timing runs without tracemalloc, which slows Python-level code; the peak
+    comes from one extra traced run.
+    """
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(times), peak / 2 ** 20
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeat=3, skew=1.0, cardinality=None, seed=0, only=None, log=print):
+    """Time every stage (or the stages named in only) at every size; returns the JSON-ready report."""
+    unknown = sorted(set(only or ()) - set(STAGE_NAMES))
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(unknown)}; choose from {', '.join(STAGE_NAMES)}")
+    results = []
+    for n_pairs in sizes:
+        df = synthetic_pairs(n_pairs, skew=skew, cardinality=cardinality, seed=seed)
+        for name, pairs, prepare in stages(df):
+            if only and name not in only:
+                continue
+            seconds, peak_mb = measure(prepare(), repeat)
+            results.append({
+                "stage": name,
+                "size": n_pairs,
+                "pairs": pairs,
+                "seconds": seconds,
+                "pairs_per_s": pairs / seconds if seconds else 0.0,
+                "peak_mb": peak_mb,
+            })
+            log(f"{name:>24} {n_pairs:>10,} {seconds:>9.4f}s {results[-1]['pairs_per_s']:>14,.0f} pairs/s "
+                f"{peak_mb:>9.1f} MB")
+    return {
+        "version": REPORT_VERSION,
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "config": {"sizes": list(sizes), "repeat": repeat, "skew": skew, "cardinality": cardinality, "seed": seed},
+        "results": results,
+    }
+
+
+# -------------------------------
+# Baseline comparison
+# -------------------------------
+def compare(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Per (stage, size) ratio of time and peak memory to the baseline; regressions flagged."""
+    before = {(r["stage"], r["size"]): r for r in baseline["results"]}
+    rows = []
+    for r in report["results"]:
+        old = before.get((r["stage"], r["size"]))
+        if old is None:
+            continue
+        time_ratio = r["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+        memory_ratio = r["peak_mb"] / old["peak_mb"] if old["peak_mb"] else float("inf")
+        rows.append({
+            "stage": r["stage"],
+            "size": r["size"],
+            "time_ratio": time_ratio,
+            "memory_ratio": memory_ratio,
+            "regression": (time_ratio > 1 + tolerance and r["seconds"] >= MIN_COMPARED_SECONDS)
+            or memory_ratio > 1 + tolerance,
+        })
+    return rows
+
+
+# -------------------------------
+# CLI: python -m matching.benchmark
+# -------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m matching.benchmark",
+        description="Time scoring, global search, top-K, explanations and the Tab 4 summary on synthetic data.",
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="tagged pairs per dataset (about as many client x maid pairs in the search)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage; the best is reported")
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf skew of column values (0 = uniform)")
+    parser.add_argument("--cardinality", type=int, help="distinct nationality / cuisine values")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stage", action="append", choices=STAGE_NAMES, help="only run this stage (repeatable)")
+    parser.add_argument("--out", default="benchmark.json", help="report file (default: %(default)s)")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="slowdown (or memory growth) ratio above 1 that counts as a regression")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, args.repeat, args.skew, args.cardinality, args.seed, args.stage)
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["comparison"] = compare(report, json.load(f), args.tolerance)
+        for row in report["comparison"]:
+            flag = "REGRESSION" if row["regression"] else ""
+            print(f"{row['stage']:>24} {row['size']:>10,} time x{row['time_ratio']:.2f} "
+                  f"memory x{row['memory_ratio']:.2f} {flag}")
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    return 1 if any(row["regression"] for row in report.get("comparison", [])) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from matching.assignment import compute_assignment
+from matching.incremental import MatchingState
+from matching.matrix import CLIENT_PREFIXES, MAID_PREFIXES
+from matching.tables import RULES_VERSION
+
+CACHE_DIR = os.environ.get(
+    "MATCHING_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "maidscc-matching")
+)
+RESULT_CACHE_BYTES = int(os.environ.get("MATCHING_RESULT_CACHE_BYTES", 512 * 1024 * 1024))
+
+
+# -------------------------------
+# Dataset fingerprint
+# -------------------------------
+def scoring_columns(columns):
+    """Columns that can change a score, a match or an explanation."""
+    return [
+        c for c in columns
+        if c in ("client_name", "maid_id", "cooking_group") or c.startswith(CLIENT_PREFIXES + MAID_PREFIXES)
+    ]
+
+
+def fingerprint(df):
+    """Content key of the scoring-relevant columns plus the rules version.
+
+    Row hashes are vectorized (pandas' hash_pandas_object), so fingerprinting is
+    a small fraction of the cost of scoring the same frame.
+    """
+    cols = scoring_columns(df.columns)
+    digest = hashlib.sha1(f"{RULES_VERSION}|{len(df)}|{'|'.join(cols)}".encode())
+    for col in cols:
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Same key whether the upload came through the typed ingest or not.
+            values = values.astype(object)
+        digest.update(pd.util.hash_pandas_object(values, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+# -------------------------------
+# On-disk result cache
+# -------------------------------
+class ResultCache:
+    """Columnar (Parquet) results keyed by fingerprint, evicted least-recently-used.
+
+    Files live under root as "<key>.<name>.parquet"; reads refresh the file's
+    mtime, and writes evict the stalest files until the cache fits max_bytes.
+    """
+
+    def __init__(self, root=None, max_bytes=RESULT_CACHE_BYTES):
+        self.root = root or os.path.join(CACHE_DIR, "results")
+        self.max_bytes = max_bytes
+
+    def _path(self, key, name):
+        return os.path.join(self.root, f"{key}.{name}.parquet")
+
+    def has(self, key, name):
+        return os.path.exists(self._path(key, name))
+
+    def get(self, key, name):
+        path = self._path(key, name)
+        try:
+            frame = pd.read_parquet(path)
+            os.utime(path)
+            return frame
+        except (ImportError, OSError, ValueError):
+            return None
+
+    def put(self, key, name, frame):
+        path = self._path(key, name)
+        tmp = None
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            # A temp file of its own: sessions and background jobs may write
+            # the same result at the same time
+            fd, tmp = tempfile.mkstemp(dir=self.root, prefix=os.path.basename(path) + ".", suffix=".tmp")
+            os.close(fd)
+            frame.to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+        except (ImportError, OSError, ValueError, TypeError):
+            if tmp is not None and os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        self.evict()
+
+    def evict(self):
+        try:
+            entries = [e for e in os.scandir(self.root) if e.name.endswith((".parquet", ".roster"))]
+        except OSError:
+            return
+        stats = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in entries]
+        total = sum(size for _, size, _ in stats)
+        for _, size, path in sorted(stats):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def get_or_compute(self, key, name, compute):
+        frame = self.get(key, name)
+        if frame is None:
+            frame = compute()
+            self.put(key, name, frame)
+        return frame
+
+
+# -------------------------------
+# Cached pipeline stages
+# -------------------------------
+def cached_tagged_scores(df, cache, key, score):
+    """match_score for every row of df, from cache when this dataset was seen before."""
+    frame = cache.get_or_compute(key, "tagged", lambda: pd.DataFrame({"match_score": score(df)}))
+    return np.asarray(frame["match_score"].to_numpy(), dtype=float)
+
+
+def cached_assignment(df, cache, key, capacity=1, method="auto"):
+    """compute_assignment(df, capacity, method), from cache when this plan was computed before.
+
+    The stats dict is cached next to the assignment frame as a one-row frame.
+    """
+    name = f"assignment{capacity}_{method}"
+    assignment_df, stats = cache.get(key, name), cache.get(key, name + "_stats")
+    if assignment_df is None or stats is None:
+        assignment_df, stats = compute_assignment(df, capacity, method)
+        cache.put(key, name, assignment_df)
+        cache.put(key, name + "_stats", pd.DataFrame([stats]))
+        return assignment_df, stats
+    return assignment_df, stats.to_dict("records")[0]
+
+
+def cached_matching_state(df, cache, key, k):
+    """Fresh MatchingState whose top-K search is skipped when the dataset was seen before."""
+    name = f"top{k}"
+    top_k = cache.get(key, name)
+    state = MatchingState(df, k=k, top_k=top_k)
+    if top_k is None:
+        cache.put(key, name, state.export_top_k())
+    return state
+
+
+def synced_matching_state(df, cache, key, k, previous=None, search=None):
+    """(MatchingState of df, how it was built) reusing previous, a state of an earlier upload.
+
+    A dataset with cached results is loaded from the cache ("cached");
+    otherwise previous is synced in place, rescoring only changed client rows
+    / maid columns ("incremental"), unless too much changed. Then the state
+    is searched from scratch ("full"), by search() when given: a callable
+    returning the top-K frame of df (e.g. from a background SearchJob).
+    """
+    name = f"top{k}"
+    if cache.has(key, name):
+        return cached_matching_state(df, cache, key, k), "cached"
+    if previous is not None and previous.sync(df, rebuild=False) is not None:
+        # Later runs on this upload (any session) load it instead of syncing again
+        cache.put(key, name, previous.export_top_k(df))
+        return previous, "incremental"
+    if search is None:
+        return cached_matching_state(df, cache, key, k), "full"
+    return MatchingState(df, k=k, top_k=search()), "full"
@@ -0,0 +1,242 @@
+import argparse
+import itertools
+import sys
+
+import numpy as np
+import pandas as pd
+
+from matching.incremental import MatchingState
+from matching.ingest import apply_schema
+from matching.matrix import CLIENT_PREFIXES, MAID_PREFIXES, ProfileMatrix, combine_pair
+from matching.parallel import parallel_top_k
+from matching.pruning import pruned_top_k
+from matching.roster import plain_value
+from matching.rules import calculate_row_score, explain_row_score
+from matching.synthetic import CLIENT_VALUES, MAID_VALUES
+from matching.tables import EXPLAIN_RULES, SCORE_RULES, RuleTables
+from matching.vectorized import calculate_frame_scores
+
+# Values of every rule column: the synthetic vocabularies plus the edge cases
+# the reference is quirky about (empty day-off, living needing both tokens,
+# nationality substring matches, "+"-joined cuisines, "veg" inside other words).
+# Client columns hold strings only and maid living arrangements are never NaN:
+# the reference raises on those, so no engine has to agree with it there.
+DOMAIN = {
+    **{col: list(values) for col, values in CLIENT_VALUES.items()},
+    **{col: list(values) for col, values in MAID_VALUES.items()},
+}
+DOMAIN["clientmts_household_type"] += ["", "Baby"]
+DOMAIN["clientmts_pet_type"] += ["", "cats"]
+DOMAIN["clientmts_dayoff_policy"] += [""]
+DOMAIN["clientmts_living_arrangement"] += ["abu_dhabi+private_room", "private_room_abu_dhabi", ""]
+DOMAIN["clientmts_nationality_preference"] += ["", "Filipina", "filipina+kenyan", "nan"]
+DOMAIN["clientmts_cuisine_preference"] += ["", "+", "vegan", "veg+", "not_specified"]
+DOMAIN["clientmts_special_cases"] += [""]
+DOMAIN["maidmts_household_type"] += ["", np.nan]
+DOMAIN["maidmts_pet_type"] += ["", np.nan]
+DOMAIN["maidmts_dayoff_policy"] += ["", np.nan]
+DOMAIN["maidmts_living_arrangement"] += ["refuses_abu_dhabi+requires_no_private_room", ""]
+DOMAIN["maid_nationality"] += ["", "filipina+kenyan", "Filipina", "african"]
+DOMAIN["cooking_group"] += ["", "veg", "+", "unspecified"]
+DOMAIN["maidpref_caregiving_profile"] += ["", np.nan]
+DOMAIN["maidpref_kids_experience"] += ["", np.nan]
+DOMAIN["maidpref_pet_handling"] += ["", np.nan]
+DOMAIN["maidpref_personality"] += ["not_veg_friendly", ""]
+DOMAIN["maidpref_smoking"] += ["", np.nan, "Non_smoker"]
+
+# Optional maid columns the reference guards ("maid_nationality" in row, row.get("cooking_group")).
+OPTIONAL_COLUMNS = ("maid_nationality", "cooking_group")
+
+TAGGED_ENGINES = ("vectorized", "typed")
+SEARCH_ENGINES = ("matrix", "top_k", "parallel", "pruned", "incremental", "progressive")
+EXPLAIN_ENGINES = ("tables",)
+ENGINES = TAGGED_ENGINES + SEARCH_ENGINES + EXPLAIN_ENGINES
+
+
+# -------------------------------
+# Corpus
+# -------------------------------
+def _frame(columns):
+    df = pd.DataFrame(columns)
+    df.insert(0, "client_name", [f"client_{i}" for i in range(len(df))])
+    df.insert(1, "maid_id", np.arange(len(df)) + 1000)
+    return df
+
+
+def rule_corpus():
+    """Every (client value, maid value) combination of every rule, other columns at their first value."""
+    base = {col: values[0] for col, values in DOMAIN.items()}
+    rows = []
+    for rule in SCORE_RULES + EXPLAIN_RULES:
+        client_values = DOMAIN[rule.client_col] if rule.client_col else [None]
+        for c, m in itertools.product(client_values, DOMAIN[rule.maid_col]):
+            row = dict(base)
+            if rule.client_col:
+                row[rule.client_col] = c
+            row[rule.maid_col] = m
+            rows.append(row)
+    return _frame(rows)
+
+
+def sampled_corpus(n, seed=0):
+    """n rows with every column drawn uniformly from its domain."""
+    rng = np.random.default_rng(seed)
+    return _frame({
+        col: np.array(values, dtype=object)[rng.integers(0, len(values), n)] for col, values in DOMAIN.items()
+    })
+
+
+def variants(df):
+    """df, plus df without each optional maid column."""
+    yield "all columns", df
+    for col in OPTIONAL_COLUMNS:
+        yield f"without {col}", df.drop(columns=col)
+
+
+# -------------------------------
+# Divergence reports
+# -------------------------------
+def _same(a, b):
+    return a == b or (a != a and b != b)
+
+
+def _divergence(engine, variant, what, expected, got, **where):
+    return {"engine": engine, "variant": variant, "what": what, "expected": plain_value(expected), "got": plain_value(got),
+            **where}
+
+
+def check_tagged(df, variant, engines=TAGGED_ENGINES):
+    """Ratios of the tagged rows against calculate_row_score; first divergent row per engine."""
+    expected = df.apply(calculate_row_score, axis=1).to_numpy()
+    found = []
+    for engine in engines:
+        frame = apply_schema(df.copy()) if engine == "typed" else df
+        got = calculate_frame_scores(frame).to_numpy()
+        bad = np.flatnonzero([not _same(a, b) for a, b in zip(expected, got)])
+        if len(bad):
+            i = bad[0]
+            found.append(_divergence(engine, variant, "score", expected[i], got[i], row=df.iloc[i].to_dict()))
+    return found
+
+
+def check_explanations(df, variant, engines=EXPLAIN_ENGINES):
+    """Explanations of the tagged rows against explain_row_score."""
+    found = []
+    if "tables" in engines:
+        tables = RuleTables(df)
+        client_codes, maid_codes = tables.encode(df, EXPLAIN_RULES)
+        records = df.to_dict("records")
+        for i, row in enumerate(records):
+            expected, got = explain_row_score(row), tables.explain(client_codes, maid_codes, i)
+            if expected != got:
+                found.append(_divergence("tables", variant, "explanation", expected, got, row=row))
+                break
+    return found
+
+
+def reference_top_k(expected, k):
+    """Top k maids per client of a score matrix: score descending, then maid order."""
+    order = np.argsort(-expected, axis=1, kind="stable")[:, :k]
+    return order, np.take_along_axis(expected, order, axis=1)
+
+
+def check_search(df, variant, engines=SEARCH_ENGINES, k=5, workers=2):
+    """Global-search engines against calculate_row_score of every combined client x maid pair."""
+    pm = ProfileMatrix.from_frame(df)
+    columns = [c for c in df.columns if c.startswith(CLIENT_PREFIXES + MAID_PREFIXES)]
+    clients = pm.clients_df.to_dict("records")
+    maids = pm.maids_df.to_dict("records")
+    expected = np.array([[calculate_row_score(combine_pair(c, m, columns)) for m in maids] for c in clients])
+    k = min(k, pm.n_maids)
+    top_idx, top_scores = reference_top_k(expected, k)
+
+    def pair(i, j):
+        return {"client": clients[i]["client_name"], "maid": maids[j]["maid_id"],
+                "row": combine_pair(clients[i], maids[j], columns)}
+
+    found = []
+    for engine in engines:
+        if engine == "matrix":
+            got = pm.score_matrix()
+            bad = np.argwhere(got != expected)
+            if len(bad):
+                i, j = bad[0]
+                found.append(_divergence(engine, variant, "score", expected[i, j], got[i, j], **pair(i, j)))
+            continue
+        if engine == "top_k":
+            idx, scores = pm.top_k(k)
+        elif engine == "parallel":
+            idx, scores = parallel_top_k(pm, k, workers=workers)
+        elif engine == "pruned":
+            idx, scores, _ = pruned_top_k(pm, k)
+        else:
+            # progressive: the block-by-block search the app runs in the background
+            progress = (lambda fraction, state: None) if engine == "progressive" else None
+            state = MatchingState(df, k=k, progress=progress)
+            idx, scores = state.top_idx[:, :k], state.top_scores[:, :k]
+        bad = np.argwhere((idx != top_idx) | (scores != top_scores))
+        if len(bad):
+            i, rank = bad[0]
+            found.append(_divergence(
+                engine, variant, f"top-{k} rank {rank + 1}",
+                (maids[top_idx[i, rank]]["maid_id"], top_scores[i, rank]),
+                (maids[idx[i, rank]]["maid_id"], scores[i, rank]),
+                **pair(i, top_idx[i, rank]),
+            ))
+    return found
+
+
+def check_equivalence(samples=2000, search_samples=150, seed=0, engines=ENGINES, k=5, workers=2, log=print):
+    """Run every engine against the reference; returns the first divergence of each (engine, variant).
+
+    The tagged and explanation engines see every rule's exhaustive value grid
+    plus `samples` random rows; the search engines see the full client x
+    maid matrix of `search_samples` random profiles.
+    """
+    tagged = pd.concat([rule_corpus(), sampled_corpus(samples, seed)], ignore_index=True)
+    tagged["client_name"] = [f"client_{i}" for i in range(len(tagged))]
+    tagged["maid_id"] = np.arange(len(tagged)) + 1000
+    search = sampled_corpus(search_samples, seed + 1)
+
+    found = []
+    for variant, df in variants(tagged):
+        found += check_tagged(df, variant, [e for e in engines if e in TAGGED_ENGINES])
+        found += check_explanations(df, variant, [e for e in engines if e in EXPLAIN_ENGINES])
+        log(f"tagged rows ({variant}): {len(df):,} rows checked")
+    for variant, df in variants(search):
+        found += check_search(df, variant, [e for e in engines if e in SEARCH_ENGINES], k, workers)
+        log(f"global search ({variant}): {len(df) ** 2:,} pairs checked")
+    return found
+
+
+# -------------------------------
+# CLI: python -m matching.equivalence
+# -------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m matching.equivalence",
+        description="Check every accelerated scorer against the reference calculate_row_score / explain_row_score.",
+    )
+    parser.add_argument("--samples", type=int, default=2000, help="random tagged rows on top of the rule grids")
+    parser.add_argument("--search-samples", type=int, default=150, help="random profiles for the global search")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", action="append", choices=ENGINES, help="only check this engine (repeatable)")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=2, help="processes for the parallel engine")
+    args = parser.parse_args(argv)
+
+    found = check_equivalence(args.samples, args.search_samples, args.seed, args.engine or ENGINES,
+                              args.top_k, args.workers)
+    for d in found:
+        print(f"DIVERGENCE {d['engine']} ({d['variant']}), {d['what']}: expected {d['expected']!r}, "
+              f"got {d['got']!r}")
+        for key, value in d.items():
+            if key not in ("engine", "variant", "what", "expected", "got"):
+                print(f"    {key}: {value}")
+    if not found:
+        print("all engines match the reference")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+from matching.matrix import MAID_PREFIXES
+from matching.roster import Roster
+
+LANGUAGE_PREFIX = "maidspeaks_"
+
+# Synthetic "feature" of the group explorer that filters by spoken languages.
+LANGUAGE_FEATURE = "maid_speaks_language"
+
+PAGE_SIZE = 25
+
+
+def language_name(col):
+    return col.replace(LANGUAGE_PREFIX, "").capitalize()
+
+
+# -------------------------------
+# Maid group index
+# -------------------------------
+class MaidIndex:
+    """Maid profiles indexed for paging: feature value -> maids, language -> bitset.
+
+    Maids are deduplicated by maid_id and kept sorted by it, so every group is
+    an ascending array of row positions and a page is a slice. Profiles are
+    held as a Roster (int-coded columns, languages packed into one bitmask
+    per maid), so filtering by several languages is one mask test. Feature
+    groups are built on first use.
+    """
+
+    def __init__(self, df):
+        maids = df.drop_duplicates(subset=["maid_id"])
+        maids = maids.loc[:, ~maids.columns.duplicated()].reset_index(drop=True)
+        profile_cols = [c for c in maids.columns if c.startswith(MAID_PREFIXES)]
+        lang_cols = [c for c in maids.columns if c.startswith(LANGUAGE_PREFIX)]
+        roster = Roster(maids, "maid_id", [c for c in profile_cols if c != "maid_id"], flags=lang_cols)
+        order = maids["maid_id"].sort_values(kind="stable").index.to_numpy()
+        self._setup(roster, profile_cols, maids["maid_id"].to_numpy(), order)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Index over a RosterSnapshot's memory-mapped roster (see matching.snapshot)."""
+        index = cls.__new__(cls)
+        index._setup(snapshot.roster(), snapshot.header["profile_columns"], snapshot.maid_ids(),
+                     snapshot.array("order"))
+        return index
+
+    def _setup(self, roster, profile_cols, maid_ids, order):
+        # Roster slots in maid_id order: position i of every group / page is roster slot slots[i]
+        self.roster = roster
+        self.slots = order
+        self.n_maids = len(order)
+
+        # Maid-related columns (excluding 'maidmts_at_hiring') and engineered language columns
+        self.maid_cols = [c for c in profile_cols if c != "maidmts_at_hiring"]
+        self.lang_cols = roster.flags
+        self.languages = [language_name(c) for c in self.lang_cols]
+        self.maid_ids = maid_ids[order]
+        self._id_text = None
+        self._groups = {}
+
+    @property
+    def features(self):
+        return self.maid_cols + [LANGUAGE_FEATURE]
+
+    def groups(self, feature):
+        """{value: ascending maid positions} of feature, in groupby (sorted) order; NaN dropped."""
+        if feature not in self._groups:
+            codes, values = pd.factorize(pd.Series(self.roster.column(feature, self.slots).tolist()), sort=True)
+            order = np.argsort(codes, kind="stable")
+            sizes = np.bincount(codes[codes >= 0], minlength=len(values))
+            parts = np.split(order[(codes < 0).sum():], np.cumsum(sizes)[:-1]) if len(values) else []
+            self._groups[feature] = dict(zip(values, parts))
+        return self._groups[feature]
+
+    def members(self, feature, value):
+        """Ascending positions of the maids whose feature equals value."""
+        return self.groups(feature).get(value, np.array([], dtype=np.int64))
+
+    def speakers(self, languages):
+        """Ascending positions of maids who speak every one of languages."""
+        if not len(languages):
+            return np.arange(self.n_maids)
+        return self.roster.having([self.lang_cols[self.languages.index(lang)] for lang in languages], self.slots)
+
+    def search(self, positions, text):
+        """positions whose maid_id contains text (case-insensitive)."""
+        text = text.strip().lower()
+        if not text:
+            return positions
+        if self._id_text is None:
+            self._id_text = pd.Series(self.maid_ids).astype(str).str.lower()
+        hits = self._id_text.iloc[positions].str.contains(text, regex=False).to_numpy()
+        return positions[hits]
+
+    def page(self, positions, number, page_size=PAGE_SIZE):
+        """maid_ids of one page (0-based) of positions."""
+        start = number * page_size
+        return self.maid_ids[positions[start:start + page_size]]
+
+    def n_pages(self, positions, page_size=PAGE_SIZE):
+        return max(1, -(-len(positions) // page_size))
+
+    def profile(self, maid_id):
+        """{column: value} of one maid's profile columns and language flags."""
+        record = self.roster.record(self.slots[np.searchsorted(self.maid_ids, maid_id)])
+        return {col: record[col] for col in self.maid_cols + self.lang_cols}
@@ -0,0 +1,331 @@
+import numpy as np
+import pandas as pd
+
+from matching.matrix import (
+    BLOCK_CELLS,
+    CLIENT_PREFIXES,
+    MAID_PREFIXES,
+    ProfileMatrix,
+    client_columns,
+    combine_pair,
+    maid_columns,
+    select_top_k,
+    sort_candidates,
+    split_profiles,
+)
+from matching.roster import Roster, ValuePool
+from matching.tables import SCORE_RULES, score_luts
+
+# sync() rebuilds from scratch when more than this share of profiles changed.
+REBUILD_FRACTION = 0.1
+
+
+# -------------------------------
+# Incremental matching state
+# -------------------------------
+class MatchingState:
+    """Top-K maids per client, kept current as single profiles change.
+
+    Clients and maids live in append-only slots (removed ones are deactivated),
+    so a profile change only rescores the affected client row or maid column.
+    Ties resolve in slot order, i.e. the order profiles were first seen.
+    Profiles are kept as int-coded Rosters sharing one value pool; results
+    refer to pairs by slot and combined() rebuilds a pair's row on demand.
+
+    With a progress callback the search runs one block of client profiles at
+    a time: clients become active as their block completes, and after each
+    block progress(share of clients done, state) is called, so another thread
+    can read the partial results (an exception raised there aborts the search).
+    """
+
+    def __init__(self, df, k=10, top_k=None, workers=1, prune=False, progress=None):
+        self.k = k
+        self.workers = workers
+        self.prune = prune
+        self.columns = [c for c in df.columns if c.startswith(CLIENT_PREFIXES + MAID_PREFIXES)]
+        self.client_cols = client_columns(df.columns)
+        self.maid_cols = maid_columns(df.columns)
+
+        clients_df, maids_df = split_profiles(df)
+        pm = ProfileMatrix(clients_df, maids_df)
+        self.tables = pm.tables
+        self.skip = {r for r, mc in enumerate(pm.maid_codes) if mc is None}
+
+        pool = ValuePool()
+        self.clients = Roster(clients_df, "client_name", self.client_cols, pool=pool)
+        self.client_active = np.ones(len(self.clients), dtype=bool)
+        self.client_codes = self._stack(pm.client_codes, len(self.clients))
+
+        self.maids = Roster(maids_df, "maid_id", [c for c in self.maid_cols if c != "maid_id"], pool=pool)
+        self.maid_active = np.ones(len(self.maids), dtype=bool)
+        self.maid_codes = self._stack(pm.maid_codes, len(self.maids))
+
+        # Maid slots fit in int32, halving the K-wide index table.
+        self.top_idx = np.full((len(self.clients), k), -1, dtype=np.int32)
+        self.top_scores = np.full((len(self.clients), k), -np.inf)
+        self.searching = False
+        self._best = None
+        if top_k is not None:
+            # Restored from export_top_k() of the same dataset: skip the search.
+            rows, cols = top_k["client_slot"].to_numpy(), top_k["rank"].to_numpy() - 1
+            self.top_idx[rows, cols] = top_k["maid_slot"].to_numpy()
+            self.top_scores[rows, cols] = top_k["match_score"].to_numpy()
+        elif progress is not None:
+            self._search_blocks(pm, progress)
+        else:
+            top_idx, top_scores = pm.top_k(k, workers=workers, prune=prune)
+            self.top_idx[:, :top_idx.shape[1]] = top_idx
+            self.top_scores[:, :top_idx.shape[1]] = top_scores
+
+    def _search_blocks(self, pm, progress):
+        self.searching = True
+        self.client_active[:] = False
+        # Clients of each block of profiles, via the clients sorted by profile
+        by_profile = np.argsort(pm.client_profile, kind="stable")
+        sorted_profiles = pm.client_profile[by_profile]
+        done = 0
+        for start, stop, idx, scores in pm.iter_top_k(self.k):
+            lo, hi = np.searchsorted(sorted_profiles, [start, stop])
+            rows = by_profile[lo:hi]
+            profiles = pm.client_profile[rows] - start
+            self.top_idx[rows, :idx.shape[1]] = idx[profiles]
+            self.top_scores[rows, :idx.shape[1]] = scores[profiles]
+            self.client_active[rows] = True
+            done += len(rows)
+            progress(done / len(self.client_active), self)
+        self.client_active[:] = True  # also clients left unscored without any maid
+        self.searching = False
+
+    @staticmethod
+    def _stack(codes, n):
+        return np.stack([c if c is not None else np.zeros(n, dtype=np.int32) for c in codes], axis=1)
+
+    def _maid_rule_codes(self, maids):
+        return [None if r in self.skip else self.maid_codes[maids, r] for r in range(len(SCORE_RULES))]
+
+    # -------------------------------
+    # Rescoring
+    # -------------------------------
+    def _score_rows(self, rows):
+        """Recompute the top-K of client slots `rows` against every active maid."""
+        self.top_idx[rows] = -1
+        self.top_scores[rows] = -np.inf
+        active = np.flatnonzero(self.maid_active)
+        k = min(self.k, len(active))
+        if not k:
+            return
+        maid_codes = [mc[None, :] if mc is not None else None for mc in self._maid_rule_codes(active)]
+        step = max(1, BLOCK_CELLS // len(active))
+        for start in range(0, len(rows), step):
+            block_rows = rows[start:start + step]
+            client_codes = [self.client_codes[block_rows, r][:, None] for r in range(len(SCORE_RULES))]
+            block = score_luts()[2][self.tables.state_index(client_codes, maid_codes)]
+            idx, scores = select_top_k(block, k)
+            self.top_idx[block_rows, :k] = active[idx]
+            self.top_scores[block_rows, :k] = scores
+
+    def _offer_maid(self, m):
+        """Merge new/changed maid slot m into every active client's top-K."""
+        clients = np.flatnonzero(self.client_active)
+        if not len(clients):
+            return
+        client_codes = [self.client_codes[clients, r] for r in range(len(SCORE_RULES))]
+        maid_codes = [None if mc is None else np.full(len(clients), mc[0])
+                      for mc in self._maid_rule_codes(np.array([m]))]
+        score = score_luts()[2][self.tables.state_index(client_codes, maid_codes)]
+
+        idx, scores = self.top_idx[clients], self.top_scores[clients]
+        was_in = (idx == m).any(axis=1)
+        full = idx[:, -1] >= 0
+        beats_last = (score > scores[:, -1]) | ((score == scores[:, -1]) & (m <= idx[:, -1]))
+        # A listed maid that dropped below the old K-th entry may have been
+        # overtaken by a maid outside the list: only a full row rescan can tell.
+        rescan = was_in & full & ~beats_last
+        merge = (was_in & ~rescan) | (~was_in & (~full | beats_last))
+
+        if merge.any():
+            m_idx, m_scores = idx[merge], scores[merge]
+            listed = m_idx == m
+            m_idx[listed], m_scores[listed] = -1, -np.inf
+            m_idx = np.hstack([m_idx, np.full((len(m_idx), 1), m)])
+            m_scores = np.hstack([m_scores, score[merge][:, None]])
+            m_idx, m_scores = sort_candidates(m_idx, m_scores)
+            self.top_idx[clients[merge]] = m_idx[:, :self.k]
+            self.top_scores[clients[merge]] = m_scores[:, :self.k]
+        if rescan.any():
+            self._score_rows(clients[rescan])
+
+    # -------------------------------
+    # Profile changes
+    # -------------------------------
+    def upsert_client(self, record):
+        record = {"client_name": record["client_name"], **{c: record[c] for c in self.client_cols}}
+        self.tables.extend(record)
+        codes = np.array([c[0] for c in self.tables.client_codes(record)], dtype=np.int32)
+        i = self.clients.put(record)
+        if i == len(self.client_active):
+            self.client_active = np.append(self.client_active, True)
+            self.client_codes = np.vstack([self.client_codes, codes])
+            self.top_idx = np.vstack([self.top_idx, np.full((1, self.k), -1, dtype=np.int32)])
+            self.top_scores = np.vstack([self.top_scores, np.full((1, self.k), -np.inf)])
+        else:
+            self.client_codes[i] = codes
+        self._score_rows(np.array([i]))
+        self._best = None
+
+    def remove_client(self, client_name):
+        i = self.clients.drop(client_name)
+        self.client_active[i] = False
+        self.top_idx[i], self.top_scores[i] = -1, -np.inf
+        self._best = None
+
+    def upsert_maid(self, record):
+        record = {c: record[c] for c in self.maid_cols}
+        self.tables.extend(record)
+        codes = np.array([0 if c is None else c[0] for c in self.tables.maid_codes(record)], dtype=np.int32)
+        j = self.maids.put(record)
+        if j == len(self.maid_active):
+            self.maid_active = np.append(self.maid_active, True)
+            self.maid_codes = np.vstack([self.maid_codes, codes])
+        else:
+            self.maid_codes[j] = codes
+        self._offer_maid(j)
+        self._best = None
+
+    def remove_maid(self, maid_id):
+        j = self.maids.drop(maid_id)
+        self.maid_active[j] = False
+        affected = np.flatnonzero(self.client_active & (self.top_idx == j).any(axis=1))
+        if len(affected):
+            self._score_rows(affected)
+        self._best = None
+
+    def sync(self, df, rebuild=True):
+        """Apply only the profile changes between the state and df; returns change counts.
+
+        When too much changed, the state is rebuilt from scratch, or, with
+        rebuild=False, left as it is and None is returned.
+        """
+        columns = [c for c in df.columns if c.startswith(CLIENT_PREFIXES + MAID_PREFIXES)]
+        if columns != self.columns:
+            if not rebuild:
+                return None
+            self.__init__(df, self.k, workers=self.workers, prune=self.prune)
+            return {"rebuilt": True}
+
+        clients_df, maids_df = split_profiles(df)
+        clients, maids = set(clients_df["client_name"]), set(maids_df["maid_id"])
+
+        gone_clients = [n for n in self.clients.pos if n not in clients]
+        gone_maids = [m for m in self.maids.pos if m not in maids]
+        new_maids = maids_df[self.maids.changed(maids_df)]
+        new_clients = clients_df[self.clients.changed(clients_df)]
+
+        n_changes = len(gone_clients) + len(gone_maids) + len(new_maids) + len(new_clients)
+        if n_changes > REBUILD_FRACTION * (len(clients) + len(maids)):
+            # A mostly different upload is cheaper to rebuild than to patch.
+            if not rebuild:
+                return None
+            self.__init__(df, self.k, workers=self.workers, prune=self.prune)
+            return {"rebuilt": True}
+
+        for name in gone_clients:
+            self.remove_client(name)
+        for maid_id in gone_maids:
+            self.remove_maid(maid_id)
+        for record in new_maids.to_dict("records"):
+            self.upsert_maid(record)
+        for record in new_clients.to_dict("records"):
+            self.upsert_client(record)
+        return {
+            "clients": len(gone_clients) + len(new_clients),
+            "maids": len(gone_maids) + len(new_maids),
+            "rebuilt": False,
+        }
+
+    # -------------------------------
+    # Results
+    # -------------------------------
+    def _active_clients(self):
+        return np.flatnonzero(self.client_active)
+
+    def best_matches(self):
+        """compute_best_matches' frame built from the maintained top-K.
+
+        Instead of a "combined" dict per row it carries the pair's client_slot
+        and maid_slot (-1 without a maid); combined() rebuilds the row.
+        """
+        if self._best is not None:
+            return self._best
+        # Results read while the search still runs are partial: never keep them
+        searching = self.searching
+        clients = self._active_clients()
+        maid_slots = self.top_idx[clients, 0]
+        found = maid_slots >= 0
+        maid_ids = self.maids.column("maid_id", np.maximum(maid_slots, 0))
+        maid_ids[~found] = None
+        best = pd.DataFrame({
+            "client_name": pd.Series(self.clients.column("client_name", clients).tolist()),
+            "best_maid_id": pd.Series(maid_ids.tolist()),
+            "match_score_pct": np.where(found, self.top_scores[clients, 0] * 100, -100.0),
+            "client_slot": clients.astype(np.int32),
+            "maid_slot": maid_slots,
+        })
+        if not searching:
+            self._best = best
+        return best
+
+    def combined(self, client_slot, maid_slot):
+        """The combined client x maid row the global search scored (None without a maid)."""
+        if maid_slot < 0:
+            return None
+        return combine_pair(self.clients.record(client_slot), self.maids.record(maid_slot), self.columns)
+
+    def compression(self):
+        """Active clients / maids vs their distinct rule-code profiles (see ProfileMatrix.compression)."""
+        clients = self.client_codes[self.client_active]
+        maids = self.maid_codes[self.maid_active]
+        n_client_profiles = len(np.unique(clients, axis=0)) if len(clients) else 0
+        n_maid_profiles = len(np.unique(maids, axis=0)) if len(maids) else 0
+        profile_pairs = n_client_profiles * n_maid_profiles
+        return {
+            "clients": len(clients),
+            "client_profiles": n_client_profiles,
+            "maids": len(maids),
+            "maid_profiles": n_maid_profiles,
+            "ratio": len(clients) * len(maids) / profile_pairs if profile_pairs else 1.0,
+        }
+
+    def export_top_k(self, df=None):
+        """Slot-indexed top-K (exact ratios) that MatchingState(df, k, top_k=...) restores.
+
+        A state synced to df numbers its slots differently from a fresh one;
+        passing df renumbers them as MatchingState(df) does.
+        """
+        rows, cols = np.nonzero((self.top_idx >= 0) & self.client_active[:, None])
+        maids, scores = self.top_idx[rows, cols], self.top_scores[rows, cols]
+        if df is not None:
+            clients_df, maids_df = split_profiles(df)
+            rows = pd.Index(clients_df["client_name"]).get_indexer(self.clients.column("client_name"))[rows]
+            maids = pd.Index(maids_df["maid_id"]).get_indexer(self.maids.column("maid_id"))[maids]
+        return pd.DataFrame({
+            "client_slot": rows.astype(np.int32),
+            "rank": (cols + 1).astype(np.int16),
+            "maid_slot": maids.astype(np.int32),
+            "match_score": scores,
+        })
+
+    def top_k_matches(self, k=None):
+        """Same tidy frame as compute_top_k_matches (k <= the state's K)."""
+        k = min(k or self.k, self.k)
+        clients = self._active_clients()
+        idx, scores = self.top_idx[clients, :k], self.top_scores[clients, :k]
+        filled = idx >= 0
+        names = self.clients.column("client_name", clients)
+        maid_ids = pd.Series(self.maids.column("maid_id").tolist()).to_numpy()
+        return pd.DataFrame({
+            "client_name": np.repeat(names, k).reshape(len(clients), k)[filled],
+            "rank": np.tile(np.arange(1, k + 1), (len(clients), 1))[filled],
+            "maid_id": maid_ids[np.maximum(idx, 0)][filled] if len(maid_ids) else np.array([], dtype=object),
+            "match_score_pct": scores[filled] * 100,
+        })
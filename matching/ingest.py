@@ -0,0 +1,125 @@
+import hashlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from matching.cache import CACHE_DIR, ResultCache
+from matching.matrix import maid_columns
+
+# Declared upload schema: profile attributes are small categorical vocabularies,
+# language flags are 0/1 and everything else keeps pandas' inference.
+CATEGORY_PREFIXES = ("clientmts_", "maidmts_", "maidpref_")
+CATEGORY_COLUMNS = ("maid_nationality", "cooking_group")
+FLAG_PREFIXES = ("maidspeaks_",)
+# Part of the ingest cache key: bump on any change to the schema below, so
+# uploads cached under the old one are parsed again.
+SCHEMA_VERSION = 1
+
+COLUMNAR_EXTENSIONS = (".parquet", ".pq", ".arrow", ".feather")
+UPLOAD_TYPES = ["xlsx", "csv", "parquet", "arrow", "feather"]
+
+
+# -------------------------------
+# Schema
+# -------------------------------
+def is_category_column(col):
+    return col.startswith(CATEGORY_PREFIXES) or col in CATEGORY_COLUMNS
+
+
+def is_flag_column(col):
+    return col.startswith(FLAG_PREFIXES)
+
+
+def schema_dtypes(columns):
+    """dtype mapping for the parser: categorical attributes load straight as category."""
+    return {c: "category" for c in columns if is_category_column(c)}
+
+
+def apply_schema(df):
+    """Coerce an already-loaded frame (Excel, Parquet, Arrow) to the declared schema."""
+    for col in df.columns:
+        if is_category_column(col) and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+        elif is_flag_column(col) and df[col].dtype != np.uint8:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(np.uint8)
+    return df
+
+
+# -------------------------------
+# Upload reading
+# -------------------------------
+def _parse(data, ext):
+    if ext in (".parquet", ".pq"):
+        return pd.read_parquet(io.BytesIO(data))
+    if ext in (".arrow", ".feather"):
+        return pd.read_feather(io.BytesIO(data))
+    if ext == ".csv":
+        header = pd.read_csv(io.BytesIO(data), nrows=0).columns
+        return pd.read_csv(io.BytesIO(data), dtype=schema_dtypes(header))
+    return pd.read_excel(io.BytesIO(data))
+
+
+def read_upload(uploaded_file, name=None, cache_dir=CACHE_DIR):
+    """Load an upload (CSV, Excel, Parquet or Arrow/Feather) with the declared schema.
+
+    CSV and Excel uploads are converted once and the columnar copy is cached
+    under cache_dir keyed by the file's content hash, extension and the schema
+    version, so re-uploading the same file reads Parquet instead of parsing it
+    again. The copies are evicted least-recently-used like ResultCache's.
+    """
+    name = name or uploaded_file.name
+    data = uploaded_file.getvalue() if hasattr(uploaded_file, "getvalue") else uploaded_file.read()
+    ext = os.path.splitext(name)[1].lower()
+    if ext in COLUMNAR_EXTENSIONS:
+        return apply_schema(_parse(data, ext))
+
+    digest = hashlib.sha1(f"{SCHEMA_VERSION}|{ext}|".encode())
+    digest.update(data)
+    key = digest.hexdigest()
+    cache = ResultCache(os.path.join(cache_dir, "ingest"))
+    df = cache.get(key, "upload")
+    if df is None:
+        # Caching is best-effort (see ResultCache.put): unwritable dirs or
+        # mixed-type columns that Parquet refuses just mean the next upload is
+        # parsed again.
+        df = apply_schema(_parse(data, ext))
+        cache.put(key, "upload", df)
+    return df
+
+
+# -------------------------------
+# Streaming reads (batch mode)
+# -------------------------------
+def iter_chunks(path, chunk_rows=100_000):
+    """Yield the rows of a CSV / Parquet / Excel file as schema-typed frames of chunk_rows.
+
+    CSV and Parquet are read incrementally; Excel has no streaming reader and
+    is loaded once, then sliced.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        header = pd.read_csv(path, nrows=0).columns
+        for chunk in pd.read_csv(path, dtype=schema_dtypes(header), chunksize=chunk_rows):
+            yield apply_schema(chunk.reset_index(drop=True))
+    elif ext in (".parquet", ".pq"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield apply_schema(batch.to_pandas())
+    else:
+        df = apply_schema(pd.read_feather(path) if ext in (".arrow", ".feather") else pd.read_excel(path))
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows].reset_index(drop=True)
+
+
+def read_maids(path, chunk_rows=100_000):
+    """First row of every maid of an export (profile and flag columns), read chunk by chunk."""
+    parts, seen = [], set()
+    for chunk in iter_chunks(path, chunk_rows):
+        maids = chunk.drop_duplicates(subset=["maid_id"])
+        maids = maids[~maids["maid_id"].isin(seen)]
+        seen.update(maids["maid_id"])
+        parts.append(maids[maid_columns(chunk.columns) + [c for c in chunk.columns if is_flag_column(c)]])
+    return pd.concat(parts, ignore_index=True)
@@ -0,0 +1,123 @@
+import threading
+import time
+
+from matching.incremental import MatchingState
+
+
+class Cancelled(Exception):
+    """The global search was cancelled before it finished."""
+
+
+# -------------------------------
+# Global search on a background thread
+# -------------------------------
+class SearchJob:
+    """Global search of one dataset, running on its own thread.
+
+    The search fills in one block of client profiles at a time; `state` is
+    the partially searched MatchingState (read-only for everyone else, see
+    MatchingState.best_matches) and `fraction` the share of clients done.
+    The finished top-K is written to the result cache, so a session that
+    comes back later (e.g. after a browser refresh) restores it from there.
+    """
+
+    def __init__(self, df, cache, key, k):
+        self.cache = cache
+        self.key = key
+        self.k = k
+        self.state = None
+        self.fraction = 0.0
+        self.top_k = None
+        self.error = None
+        self.started = time.perf_counter()
+        self.finished = None
+        self.done = threading.Event()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(df,), name=f"search-{key[:8]}", daemon=True)
+        self._thread.start()
+
+    def _progress(self, fraction, state):
+        if self._cancel.is_set():
+            raise Cancelled(f"search of {self.key[:8]} cancelled")
+        self.state, self.fraction = state, fraction
+
+    def _run(self, df):
+        try:
+            state = MatchingState(df, k=self.k, progress=self._progress)
+            self.state, self.fraction = state, 1.0
+            self.top_k = state.export_top_k()
+            self.cache.put(self.key, f"top{self.k}", self.top_k)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished = time.perf_counter()
+            self.done.set()
+
+    def cancel(self):
+        """Stop the search after its current block."""
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def eta(self):
+        """Seconds left at the pace so far (None before the first block)."""
+        if self.done.is_set():
+            return 0.0
+        if not self.fraction:
+            return None
+        return self.elapsed * (1 - self.fraction) / self.fraction
+
+    def wait(self, stop=None, poll=0.2):
+        """The finished top-K frame (see MatchingState.export_top_k).
+
+        Raises Cancelled when the job was cancelled, or as soon as the stop
+        event is set, and re-raises the search's own error.
+        """
+        while not self.done.wait(poll):
+            if stop is not None and stop.is_set():
+                raise Cancelled("no longer needed")
+        if self.error is not None:
+            raise self.error
+        return self.top_k
+
+
+class SearchJobs:
+    """Global searches by dataset key, shared by every session of the process.
+
+    A session asking for a dataset that is already being searched (the same
+    upload in another tab, or after a browser refresh) waits for that job
+    instead of starting another; a job is cancelled as soon as no session
+    waits for it any more.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._waiting = {}
+
+    def get(self, key):
+        return self._jobs.get(key)
+
+    def search(self, df, cache, key, k, stop=None):
+        """Top-K frame of df's global search, run by the dataset's shared job."""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job.cancelled or job.error is not None or job.k != k:
+                job = self._jobs[key] = SearchJob(df, cache, key, k)
+                self._waiting[key] = 0
+            self._waiting[key] += 1
+        try:
+            return job.wait(stop)
+        finally:
+            with self._lock:
+                self._waiting[key] -= 1
+                if not self._waiting[key] and self._jobs.get(key) is job:
+                    # Nobody needs it any more: stop it, or drop it once its results are cached
+                    job.cancel()
+                    del self._jobs[key], self._waiting[key]
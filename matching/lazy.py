@@ -0,0 +1,87 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+# -------------------------------
+# Per-dataset results, computed on first access
+# -------------------------------
+class LazyResults:
+    """Named results of one dataset, each computed once, when first needed.
+
+    `define({name: compute})` registers how to compute them; `get(name)`
+    returns a result, computing it inline the first time, and `prefetch(name)`
+    queues it on a background thread instead, so it is usually ready by the
+    time a tab asks for it (get() then waits for it). Queued computations run
+    one at a time in submission order; a compute may get() other results. A
+    result that failed raises again on every get() until it is forgotten.
+    Long computations can watch `closed`, set once the results are dropped;
+    after close() finished results stay readable, but nothing new is computed.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.computes = {}
+        self._futures = {}
+        self._timings = {}
+        self.closed = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lazy-results")
+
+    def _timed(self, name, compute, background):
+        started = time.perf_counter()
+        try:
+            return compute()
+        finally:
+            self._timings[name] = {"computed_s": time.perf_counter() - started, "background": background}
+
+    def define(self, computes):
+        self.computes.update(computes)
+
+    def _check_open(self):
+        if self.closed.is_set():
+            raise RuntimeError(f"results of {self.key[:8]} are closed")
+
+    def prefetch(self, *names):
+        self._check_open()
+        for name in names:
+            if self.status(name) == "missing":
+                self._futures[name] = self._executor.submit(self._timed, name, self.computes[name], True)
+
+    def get(self, name):
+        future = self._futures.get(name)
+        if future is None or future.cancelled():
+            self._check_open()
+            future = self._futures[name] = Future()
+            try:
+                future.set_result(self._timed(name, self.computes[name], False))
+            except Exception as e:
+                future.set_exception(e)
+            except BaseException:  # interrupted (e.g. by a rerun): compute again next time
+                del self._futures[name]
+                future.cancel()
+                raise
+        return future.result()
+
+    def status(self, name):
+        """"missing", "queued", "running", "done" or "failed"."""
+        future = self._futures.get(name)
+        if future is None or future.cancelled():
+            return "missing"
+        if not future.done():
+            return "running" if future.running() else "queued"
+        return "failed" if future.exception() is not None else "done"
+
+    def forget(self, *names):
+        """Drop finished (or failed) results, so the next get() / prefetch() computes them again."""
+        for name in names:
+            if self.status(name) in ("done", "failed"):
+                del self._futures[name]
+
+    def timing(self, name):
+        """{"computed_s", "background"} of a computed result, or {} before that."""
+        return dict(self._timings.get(name, {}))
+
+    def close(self):
+        """Drop queued computations and signal `closed` to the running one (results stay readable)."""
+        self.closed.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
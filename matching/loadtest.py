@@ -0,0 +1,144 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from matching.service import CLIENT_COLUMNS, DEFAULT_PORT
+from matching.synthetic import synthetic_profiles
+
+
+# -------------------------------
+# Keep-alive client connection
+# -------------------------------
+class Connection:
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def post(self, path, payload):
+        """(status, decoded JSON body) of one POST."""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode()
+        self.writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            header = await self.reader.readline()
+            if header in (b"\r\n", b""):
+                break
+            name, _, value = header.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+# -------------------------------
+# Open-loop load
+# -------------------------------
+async def run_load(url, rate, duration, connections=64, k=10, explain=False, seed=0):
+    """Send rate queries/s for duration seconds over a pool of connections; returns latencies and errors.
+
+    Queries are scheduled on a fixed clock (open loop), so a slow server
+    shows up as latency instead of as a lower request rate.
+    """
+    parts = urlsplit(url)
+    host, port = parts.hostname or "127.0.0.1", parts.port or DEFAULT_PORT
+    clients, _ = synthetic_profiles(max(1, int(rate * duration)), 1, seed=seed)
+    queries = [{"client": rec, "k": k, "explain": explain}
+               for rec in clients[["client_name"] + CLIENT_COLUMNS].to_dict("records")]
+    pool = asyncio.Queue()
+    for _ in range(connections):
+        pool.put_nowait(Connection(host, port))
+    latencies, errors = [], []
+
+    async def one(query, scheduled):
+        conn = await pool.get()
+        try:
+            status, payload = await conn.post("/match", query)
+            if status != 200:
+                errors.append(f"{status}: {payload.get('error')}")
+        except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+            conn.close()
+            errors.append(repr(e))
+        finally:
+            pool.put_nowait(conn)
+        latencies.append(time.perf_counter() - scheduled)
+
+    loop_started = time.perf_counter()
+    tasks = []
+    for i, query in enumerate(queries):
+        scheduled = loop_started + i / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(query, scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - loop_started
+    while not pool.empty():
+        pool.get_nowait().close()
+    return np.array(latencies), errors, elapsed
+
+
+def summarize(latencies, errors, elapsed):
+    ms = latencies * 1000
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        **{f"p{q}_ms": float(np.percentile(ms, q)) if len(ms) else None for q in (50, 90, 99)},
+        "max_ms": float(ms.max()) if len(ms) else None,
+    }
+
+
+# -------------------------------
+# CLI: python -m matching.loadtest
+# -------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m matching.loadtest",
+        description="Fire synthetic client queries at a running matching service and report latency percentiles.",
+    )
+    parser.add_argument("--url", default=f"http://127.0.0.1:{DEFAULT_PORT}")
+    parser.add_argument("--rate", type=float, default=300, help="queries per second (default: %(default)s)")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load (default: %(default)s)")
+    parser.add_argument("--connections", type=int, default=64, help="keep-alive connections in the pool")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--explain", action="store_true", help="ask for explanations of every match")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--p99-ms", type=float, help="exit 1 if the p99 latency is above this")
+    parser.add_argument("--out", help="also write the summary to this JSON file")
+    args = parser.parse_args(argv)
+
+    latencies, errors, elapsed = asyncio.run(run_load(
+        args.url, args.rate, args.duration, args.connections, args.top_k, args.explain, args.seed))
+    summary = summarize(latencies, errors, elapsed)
+    print(f"{summary['requests']:,} requests in {elapsed:.1f}s ({summary['throughput_rps']:,.0f}/s), "
+          f"{summary['errors']} errors")
+    if len(latencies):
+        print(f"latency p50 {summary['p50_ms']:.1f} ms, p90 {summary['p90_ms']:.1f} ms, "
+              f"p99 {summary['p99_ms']:.1f} ms, max {summary['max_ms']:.1f} ms")
+    for error in sorted(set(errors))[:5]:
+        print(f"    {error}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(summary, f, indent=2)
+    return 1 if errors or (args.p99_ms and summary["p99_ms"] > args.p99_ms) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+import numpy as np
+import pandas as pd
+
+from matching.tables import RuleTables, score_luts
+
+CLIENT_PREFIXES = ("clientmts_",)
+MAID_PREFIXES = ("maidmts_", "maidpref_", "maid_")
+
+# Number of client×maid cells scored per block; bounds peak memory of the search.
+BLOCK_CELLS = 1 << 21
+
+
+# -------------------------------
+# Client / Maid profile tables
+# -------------------------------
+def client_columns(columns):
+    return [c for c in columns if c.startswith(CLIENT_PREFIXES)]
+
+
+def maid_columns(columns):
+    return [c for c in columns if c.startswith(MAID_PREFIXES)]
+
+
+def split_profiles(df):
+    clients_df = df.drop_duplicates(subset=["client_name"]).reset_index(drop=True)
+    maids_df = df.drop_duplicates(subset=["maid_id"]).reset_index(drop=True)
+    return clients_df, maids_df
+
+
+def combine_pair(client_row, maid_row, columns):
+    # Same combined row the global search has always scored: clientmts_* from
+    # the client, maidmts_/maidpref_/maid_ from the maid, everything else dropped.
+    combined = {}
+    for col in columns:
+        if col.startswith(CLIENT_PREFIXES):
+            combined[col] = client_row[col]
+        elif col.startswith(MAID_PREFIXES):
+            combined[col] = maid_row[col]
+    return combined
+
+
+def profile_signatures(codes, n):
+    """Group rows with identical rule codes.
+
+    Returns (profile of every row, first row of every profile); profiles are
+    numbered in order of first appearance, so profile order is row order.
+    """
+    columns = [c for c in codes if c is not None]
+    if not columns or not n:
+        return np.zeros(n, dtype=np.int64), np.zeros(min(n, 1), dtype=np.int64)
+    _, first, inverse = np.unique(np.stack(columns, axis=1), axis=0, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    renumber = np.empty(len(order), dtype=np.int64)
+    renumber[order] = np.arange(len(order))
+    return renumber[inverse.reshape(-1)], first[order]
+
+
+# -------------------------------
+# Encoded client / maid profiles
+# -------------------------------
+class ProfileMatrix:
+    """Clients and maids encoded separately against one set of rule tables.
+
+    Clients (and maids) with identical rule codes share a profile; scores are
+    computed once per client profile × maid profile and gathered back out to
+    individuals, which is exact because the score only depends on the codes.
+    """
+
+    def __init__(self, clients_df, maids_df, tables=None):
+        self.clients_df = clients_df
+        self.maids_df = maids_df
+        # Only the columns that make it into the combined row are visible to the
+        # rules, exactly as in the old per-pair search (so e.g. cooking_group,
+        # which has no maid prefix, never counts in the global search).
+        self.clients = clients_df[client_columns(clients_df.columns)]
+        self.maids = maids_df[maid_columns(maids_df.columns)]
+        self.tables = tables if tables is not None else RuleTables(self.clients, self.maids)
+        self.client_codes = self.tables.client_codes(self.clients)
+        self.maid_codes = self.tables.maid_codes(self.maids)
+
+        self.client_profile, self.client_reps = profile_signatures(self.client_codes, self.n_clients)
+        self.maid_profile, self.maid_reps = profile_signatures(self.maid_codes, self.n_maids)
+        self.profile_client_codes = [cc[self.client_reps] for cc in self.client_codes]
+        # Bound tables have one column per maid profile.
+        self.bound = self.tables.bind_maids([None if mc is None else mc[self.maid_reps] for mc in self.maid_codes])
+
+    @classmethod
+    def from_frame(cls, df, tables=None):
+        clients_df, maids_df = split_profiles(df)
+        return cls(clients_df, maids_df, tables)
+
+    @property
+    def n_clients(self):
+        return len(self.clients_df)
+
+    @property
+    def n_maids(self):
+        return len(self.maids_df)
+
+    @property
+    def n_client_profiles(self):
+        return len(self.client_reps)
+
+    @property
+    def n_maid_profiles(self):
+        return len(self.maid_reps)
+
+    def compression(self):
+        """Individuals vs distinct profiles on both sides, and the pair-count ratio."""
+        profile_pairs = self.n_client_profiles * self.n_maid_profiles
+        return {
+            "clients": self.n_clients,
+            "client_profiles": self.n_client_profiles,
+            "maids": self.n_maids,
+            "maid_profiles": self.n_maid_profiles,
+            "ratio": self.n_clients * self.n_maids / profile_pairs if profile_pairs else 1.0,
+        }
+
+    def default_block_size(self):
+        return max(1, BLOCK_CELLS // max(self.n_maids, 1))
+
+    def score_profiles(self, profiles):
+        """(len(profiles), n_maid_profiles) ratio matrix for client profiles."""
+        return self.tables.score_bound(self.bound, self.profile_client_codes, profiles)
+
+    def score_block(self, rows):
+        """(len(rows), n_maids) ratio matrix for clients[rows]."""
+        profiles, inverse = np.unique(self.client_profile[rows], return_inverse=True)
+        return self.score_profiles(profiles)[inverse][:, self.maid_profile]
+
+    def score_pairs(self, client_idx, maid_idx):
+        """Ratios of the aligned (client_idx[i], maid_idx[i]) pairs."""
+        index = self.tables.state_index(
+            [cc[client_idx] for cc in self.client_codes],
+            [mc[maid_idx] if mc is not None else None for mc in self.maid_codes],
+        )
+        return score_luts()[2][index]
+
+    def iter_blocks(self, block_size=None):
+        """Yield (start, stop, block) over all clients, block_size clients at a time."""
+        block_size = block_size or self.default_block_size()
+        for start in range(0, self.n_clients, block_size):
+            stop = min(start + block_size, self.n_clients)
+            yield start, stop, self.score_block(np.arange(start, stop))
+
+    def top_k(self, k, block_size=None, workers=1, prune=False):
+        """(n_clients, k) maid indices and ratios, best first.
+
+        workers != 1 spreads client blocks over processes (None: all cores);
+        prune skips maids whose score bound cannot reach a client's top-K.
+        """
+        if prune:
+            from matching.pruning import pruned_top_k
+
+            return pruned_top_k(self, k)[:2]
+        if workers != 1:
+            from matching.parallel import parallel_top_k
+
+            return parallel_top_k(self, k, workers, block_size)
+        k = min(k, self.n_maids)
+        top_idx = np.empty((self.n_client_profiles, k), dtype=np.int64)
+        top_scores = np.empty((self.n_client_profiles, k))
+        for start, stop, idx, scores in self.iter_top_k(k, block_size):
+            top_idx[start:stop], top_scores[start:stop] = idx, scores
+        return top_idx[self.client_profile], top_scores[self.client_profile]
+
+    def iter_top_k(self, k, block_size=None):
+        """Yield (start, stop, maid indices, ratios): the top-K of client profiles [start, stop), block by block."""
+        k = min(k, self.n_maids)
+        if not k:
+            return
+        block_size = block_size or self.default_block_size()
+        for start in range(0, self.n_client_profiles, block_size):
+            stop = min(start + block_size, self.n_client_profiles)
+            yield (start, stop) + profile_top_k(
+                self.score_profiles(np.arange(start, stop)), k, self.maid_profile, self.maid_reps)
+
+    def score_matrix(self, block_size=None):
+        out = np.empty((self.n_clients, self.n_maids))
+        for start, stop, block in self.iter_blocks(block_size):
+            out[start:stop] = block
+        return out
+
+
+# -------------------------------
+# Partial selection
+# -------------------------------
+def profile_top_k(block, k, maid_profile, maid_reps):
+    """select_top_k over individual maids, given a block scored per maid profile."""
+    if k == 1:
+        # Profiles are numbered by first appearance, so the first best profile
+        # holds the first best maid.
+        best = block.argmax(axis=1)
+        return maid_reps[best][:, None], block[np.arange(len(block)), best][:, None]
+    return select_top_k(block[:, maid_profile], k)
+
+
+def select_top_k(block, k):
+    """Top k columns of every row of block, best first.
+
+    Only the k winners per row are sorted (argpartition-style threshold), and
+    ties keep maid order, so rank 1 is always the maid the best-match search picks.
+    """
+    n_rows, n_cols = block.shape
+    kth = np.partition(block, n_cols - k, axis=1)[:, n_cols - k][:, None]
+    above = block > kth
+    tied = block == kth
+    room = k - above.sum(axis=1, keepdims=True)
+    chosen = above | (tied & (np.cumsum(tied, axis=1) <= room))
+    idx = np.nonzero(chosen)[1].reshape(n_rows, k)
+    scores = np.take_along_axis(block, idx, axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+def sort_candidates(idx, scores):
+    """Order candidate lists best first; ties keep maid order, empty slots (-1, -inf) go last."""
+    order = np.argsort(np.where(idx < 0, np.iinfo(np.int64).max, idx), axis=1, kind="stable")
+    idx, scores = np.take_along_axis(idx, order, axis=1), np.take_along_axis(scores, order, axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+# -------------------------------
+# Global search: best maid per client
+# -------------------------------
+def compute_best_matches(df, block_size=None, workers=1, prune=False):
+    pm = ProfileMatrix.from_frame(df)
+    clients_df, maids_df = pm.clients_df, pm.maids_df
+
+    best_idx = np.zeros(pm.n_clients, dtype=np.int64)
+    best_score = np.zeros(pm.n_clients)
+    if pm.n_maids:
+        # Top-1 keeps the first maximum, same tie-break as the strict ">" scan
+        top_idx, top_scores = pm.top_k(1, block_size, workers, prune)
+        best_idx, best_score = top_idx[:, 0], top_scores[:, 0]
+
+    columns = [c for c in df.columns if c.startswith(CLIENT_PREFIXES + MAID_PREFIXES)]
+    client_records = clients_df.to_dict("records")
+    maid_records = maids_df.to_dict("records")
+
+    best_matches = []
+    for i, client_rec in enumerate(client_records):
+        if not pm.n_maids:
+            best_matches.append({
+                "client_name": client_rec["client_name"],
+                "best_maid_id": None,
+                "match_score_pct": -100,
+                "combined": None,
+            })
+            continue
+        maid_rec = maid_records[best_idx[i]]
+        best_matches.append({
+            "client_name": client_rec["client_name"],
+            "best_maid_id": maid_rec["maid_id"],
+            "match_score_pct": best_score[i] * 100,
+            "combined": combine_pair(client_rec, maid_rec, columns),
+        })
+
+    return pd.DataFrame(best_matches)
+
+
+# -------------------------------
+# Global search: top-K shortlist per client
+# -------------------------------
+def compute_top_k_matches(df, k=10, block_size=None, workers=1, prune=False):
+    """Tidy (client_name, rank, maid_id, match_score_pct) frame, k rows per client."""
+    pm = ProfileMatrix.from_frame(df)
+    top_idx, top_scores = pm.top_k(k, block_size, workers, prune)
+    k = top_idx.shape[1]
+    return pd.DataFrame({
+        "client_name": np.repeat(pm.clients_df["client_name"].to_numpy(), k),
+        "rank": np.tile(np.arange(1, k + 1), pm.n_clients),
+        "maid_id": pm.maids_df["maid_id"].to_numpy()[top_idx.reshape(-1)],
+        "match_score_pct": top_scores.reshape(-1) * 100,
+    })
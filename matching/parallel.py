@@ -0,0 +1,112 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from matching.matrix import profile_top_k
+from matching.tables import score_luts
+
+# Client blocks handed out per worker; more than one evens out uneven blocks.
+BLOCKS_PER_WORKER = 4
+
+# Arrays attached by each worker process (see _init_worker).
+_shared = {}
+
+
+# -------------------------------
+# Shared-memory arrays
+# -------------------------------
+def share_arrays(arrays):
+    """Copy arrays into one shared-memory segment; returns (segment, layout)."""
+    layout, offset = [], 0
+    for a in arrays:
+        offset = -(-offset // 8) * 8    # keep every array 8-byte aligned
+        layout.append((a.shape, a.dtype.str, offset))
+        offset += a.nbytes
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for a, (shape, dtype, start) in zip(arrays, layout):
+        np.ndarray(shape, dtype, buffer=shm.buf, offset=start)[...] = a
+    return shm, layout
+
+
+def attach_arrays(name, layout):
+    """Read-only views of a segment created by share_arrays (no copy).
+
+    Pool workers share their parent's resource tracker, so the segment stays
+    owned by (and is unlinked once by) the process that created it.
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    arrays = []
+    for shape, dtype, start in layout:
+        view = np.ndarray(shape, dtype, buffer=shm.buf, offset=start)
+        view.flags.writeable = False
+        arrays.append(view)
+    return shm, arrays
+
+
+# -------------------------------
+# Worker side
+# -------------------------------
+def _init_worker(name, layout, rules):
+    shm, arrays = attach_arrays(name, layout)
+    _shared["shm"] = shm
+    _shared["ratio"], _shared["maid_profile"], _shared["maid_reps"] = arrays[:3]
+    # One (bound maid-profile table, client profile codes) pair per client
+    # column, as in ProfileMatrix.bound.
+    _shared["bound"] = [(arrays[3 + 2 * i], arrays[4 + 2 * i]) for i in range(len(rules))]
+
+
+def _top_k_block(start, stop, k):
+    index = None
+    for table, codes in _shared["bound"]:
+        part = table[codes[start:stop]]
+        if index is None:
+            index = part
+        else:
+            index += part
+    idx, scores = profile_top_k(_shared["ratio"][index], k, _shared["maid_profile"], _shared["maid_reps"])
+    return start, idx, scores
+
+
+# -------------------------------
+# Parallel global search
+# -------------------------------
+def parallel_top_k(pm, k, workers=None, block_size=None):
+    """Same (top_idx, top_scores) as pm.top_k(k), with client blocks spread over processes.
+
+    The bound maid-profile tables, the client profile codes and the ratio
+    table are placed in shared memory once; workers only receive (start, stop)
+    bounds of a block of client profiles and return its top-K, which is
+    written back at its offset, so the result (ties included) does not depend
+    on the worker count.
+    """
+    workers = workers or os.cpu_count() or 1
+    k = min(k, pm.n_maids)
+    n = pm.n_client_profiles
+    if workers <= 1 or not k or not n:
+        return pm.top_k(k, block_size)
+
+    block_size = block_size or min(pm.default_block_size(), max(1, -(-n // (workers * BLOCKS_PER_WORKER))))
+    arrays = [score_luts()[2], pm.maid_profile, pm.maid_reps]
+    for r, table in pm.bound:
+        arrays += [np.ascontiguousarray(table), np.ascontiguousarray(pm.profile_client_codes[r])]
+
+    top_idx = np.empty((n, k), dtype=np.int64)
+    top_scores = np.empty((n, k))
+    shm, layout = share_arrays(arrays)
+    try:
+        initargs = (shm.name, layout, [r for r, _ in pm.bound])
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+            futures = [
+                pool.submit(_top_k_block, start, min(start + block_size, n), k)
+                for start in range(0, n, block_size)
+            ]
+            for future in futures:
+                start, idx, scores = future.result()
+                top_idx[start:start + len(idx)] = idx
+                top_scores[start:start + len(idx)] = scores
+    finally:
+        shm.close()
+        shm.unlink()
+    return top_idx[pm.client_profile], top_scores[pm.client_profile]
@@ -0,0 +1,113 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Append every run's stage records here as JSON lines when set.
+PERF_LOG = os.environ.get("MATCHING_PERF_LOG")
+
+
+def max_rss_mb():
+    """Peak resident memory of the process so far, or None where unavailable."""
+    if resource is None:
+        return None
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# -------------------------------
+# Stage timings
+# -------------------------------
+class Profiler:
+    """Wall time, sizes and memory of each pipeline stage of one app run.
+
+    `with profiler.stage("tagged scores", rows=n) as info:` times the block;
+    extra details (e.g. info["cached"] = True) can be added inside it. Memory
+    is the process peak RSS after the stage, plus the stage's own peak traced
+    allocation when trace_memory is set (tracemalloc slows Python code down).
+    With cprofile set, the whole run is also captured by cProfile between
+    start() and stop().
+    """
+
+    def __init__(self, trace_memory=False, cprofile=False):
+        self.trace_memory = trace_memory
+        self.records = []
+        self.started = time.time()
+        self._profile = cProfile.Profile() if cprofile else None
+
+    def start(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self._profile is not None:
+            self._profile.enable()
+        return self
+
+    def stop(self):
+        if self._profile is not None:
+            self._profile.disable()
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        if PERF_LOG:
+            self.write_log(PERF_LOG)
+
+    @contextmanager
+    def stage(self, name, **info):
+        record = {"stage": name, **info}
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - started
+            if self.trace_memory and tracemalloc.is_tracing():
+                record["peak_traced_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            record["max_rss_mb"] = max_rss_mb()
+            self.records.append(record)
+
+    @property
+    def total_seconds(self):
+        return sum(r["seconds"] for r in self.records)
+
+    def table(self):
+        """Records as rows for display: stage, seconds, share of the run, sizes, memory, then details."""
+        total = self.total_seconds or 1.0
+        first = ("stage", "seconds", "share_pct", "rows", "pairs", "max_rss_mb", "peak_traced_mb")
+        rows = []
+        for r in self.records:
+            row = {"stage": r["stage"], "seconds": r["seconds"], "share_pct": r["seconds"] / total * 100,
+                   "rows": r.get("rows"), "pairs": r.get("pairs"), "max_rss_mb": r["max_rss_mb"]}
+            if "peak_traced_mb" in r:
+                row["peak_traced_mb"] = r["peak_traced_mb"]
+            row.update((k, v) for k, v in r.items() if k not in first)
+            rows.append(row)
+        return rows
+
+    def to_json(self):
+        return json.dumps({"started": self.started, "stages": self.records}, indent=2, default=str)
+
+    def write_log(self, path):
+        """Append one JSON line per stage (with the run's start time) to path."""
+        try:
+            with open(path, "a") as f:
+                for r in self.records:
+                    f.write(json.dumps({"run": self.started, **r}, default=str) + "\n")
+        except OSError:
+            pass
+
+    def profile_stats(self, limit=30, sort="cumulative"):
+        """Top functions of the cProfile capture as text ("" when not capturing)."""
+        if self._profile is None:
+            return ""
+        out = io.StringIO()
+        pstats.Stats(self._profile, stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue()
@@ -0,0 +1,135 @@
+import numpy as np
+
+from matching.matrix import select_top_k, sort_candidates
+from matching.tables import EARNED, MISSED, NOT_APPLICABLE, SCORE_RULES, score_luts
+
+# Rules whose compatible-maid sets are indexed: the strong household / pets /
+# day-off / living rules plus nationality and caregiving. Maids with the same
+# codes for these rules form one class and share a score bound.
+INDEXED_RULES = ("household", "pets", "dayoff", "living", "nationality", "special_cases")
+
+# Maids scored per client before the first bound check; doubles every round.
+FIRST_CHUNK = 256
+
+# Clients (sorted by requirement codes) sharing one bound vector and visit order.
+BLOCK_CLIENTS = 64
+
+# Every ratio is a fraction of weight sums (multiples of 0.1, at most 3.5), so
+# distinct ratios differ by far more than 1e-6: rounding to this many decimals
+# compares ratios exactly, regardless of float summation order.
+LEVEL_DECIMALS = 6
+
+# Best-case order of the per-rule states: earning beats not applying, which
+# beats missing (each step can only raise the ratio).
+_STATE_RANK = np.array([1, 0, 2])                  # indexed by state
+_RANK_STATE = np.array([MISSED, NOT_APPLICABLE, EARNED])
+
+
+def _levels(ratios):
+    return np.round(ratios, LEVEL_DECIMALS)
+
+
+# -------------------------------
+# Inverted index: client requirement value -> compatible maid classes
+# -------------------------------
+class PruningIndex:
+    """Maid classes (same indexed requirement codes) with per-rule best-case states.
+
+    For every rule and client value, the index holds the best state any maid of
+    a class can reach: exact for the indexed rules, the best over the class's
+    maids for the others. Scoring that best-case state vector bounds the ratio
+    of every maid in the class, so maids can be visited best bound first and
+    dropped once a client's K-th exact score beats all remaining bounds.
+    """
+
+    def __init__(self, pm):
+        self.pm = pm
+        self.rules = [r for r, mc in enumerate(pm.maid_codes) if mc is not None]
+        indexed = [r for r in self.rules if SCORE_RULES[r].key in INDEXED_RULES]
+
+        maid_codes = np.stack([pm.maid_codes[r] for r in indexed], axis=1)
+        _, maid_class = np.unique(maid_codes, axis=0, return_inverse=True)
+        self.maid_class = maid_class.reshape(-1)
+        by_class = np.argsort(self.maid_class, kind="stable")
+        starts = np.flatnonzero(np.diff(self.maid_class[by_class], prepend=-1))
+        self.n_classes = len(starts)
+
+        # best[r]: (n client codes of rule r, n classes) best-case state rank.
+        self.best = {}
+        for r in self.rules:
+            states = pm.tables.state_tables[r][:, pm.maid_codes[r][by_class]] // 3 ** r
+            self.best[r] = np.maximum.reduceat(_STATE_RANK[states], starts, axis=1)
+
+        # Client profiles ordered by requirement codes (indexed rules first),
+        # so that consecutive profiles share tight bounds.
+        rules = indexed + [r for r in self.rules if r not in indexed]
+        self.client_order = np.lexsort([pm.profile_client_codes[r] for r in reversed(rules)])
+
+    def class_bounds(self, clients):
+        """Upper bound (as a ratio level) of every maid class for all of the client profiles."""
+        index = np.zeros(self.n_classes, dtype=np.int32)
+        for r in self.rules:
+            rank = self.best[r][np.unique(self.pm.profile_client_codes[r][clients])].max(axis=0)
+            index += _RANK_STATE[rank] * 3 ** r
+        return _levels(score_luts()[2][index])
+
+    def visit_order(self, clients):
+        """Maids by descending bound, ties in maid order; and each position's bound."""
+        levels = self.class_bounds(clients)
+        distinct, rank = np.unique(-levels, return_inverse=True)
+        # Small integer keys sort stably in linear time and keep maid order within a level.
+        order = np.argsort(rank.astype(np.uint16)[self.maid_class], kind="stable")
+        return order, -distinct[rank][self.maid_class[order]]
+
+
+# -------------------------------
+# Pruned global search
+# -------------------------------
+def pruned_top_k(pm, k, index=None):
+    """Same (top_idx, top_scores) as pm.top_k(k), skipping maids that cannot make a client's top-K.
+
+    Returns (top_idx, top_scores, stats); stats["scored_fraction"] is the share
+    of client profile × maid cells actually scored.
+    """
+    k = min(k, pm.n_maids)
+    n = pm.n_client_profiles
+    top_idx = np.full((n, k), -1, dtype=np.int64)
+    top_scores = np.full((n, k), -np.inf)
+    stats = {"pairs": n * pm.n_maids, "scored": 0, "maid_classes": 0}
+    if not k or not n:
+        stats["scored_fraction"] = 0.0
+        return top_idx[pm.client_profile], top_scores[pm.client_profile], stats
+
+    index = index or PruningIndex(pm)
+    stats["maid_classes"] = index.n_classes
+    for first in range(0, n, BLOCK_CLIENTS):
+        clients = index.client_order[first:first + BLOCK_CLIENTS]
+        order, bound = index.visit_order(clients)
+        bound = np.append(bound, -np.inf)
+
+        active, start, step = clients, 0, max(FIRST_CHUNK, 4 * k)
+        while len(active) and start < pm.n_maids:
+            # Columns in maid order, so the chunk's own top-k keeps tie order.
+            maids = np.sort(order[start:start + step])
+            columns = pm.maid_profile[maids]
+            block = pm.tables.score_bound([(r, table[:, columns]) for r, table in pm.bound],
+                                          pm.profile_client_codes, active)
+            stats["scored"] += block.size
+            chunk_idx, chunk_scores = select_top_k(block, min(k, len(maids)))
+            idx = np.hstack([top_idx[active], maids[chunk_idx]])
+            scores = np.hstack([top_scores[active], chunk_scores])
+            idx, scores = sort_candidates(idx, scores)
+            top_idx[active], top_scores[active] = idx[:, :k], scores[:, :k]
+
+            start += step
+            step *= 2
+            # Unvisited maids can't overtake the K-th score when their bound is
+            # a strictly lower ratio. A K-th score of exactly 1.0 (the maximum)
+            # is only tied, never beaten, and the tying maids not yet visited
+            # come later in maid order, so they cannot displace it either.
+            kth = top_scores[active, k - 1]
+            next_bound = bound[min(start, pm.n_maids)]
+            active = active[(_levels(kth) <= next_bound) & (kth < 1.0)]
+
+    stats["scored_fraction"] = stats["scored"] / stats["pairs"]
+    return top_idx[pm.client_profile], top_scores[pm.client_profile], stats
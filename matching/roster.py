@@ -0,0 +1,177 @@
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+
+def plain_value(value):
+    """value as a plain Python object: numpy scalars unwrapped, tuples element-wise."""
+    if isinstance(value, tuple):
+        return tuple(plain_value(v) for v in value)
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _pool_key(value):
+    # Type-qualified, so 1, 1.0 and True stay distinct values; all NaN-likes of
+    # one type share a key.
+    if pd.isna(value):
+        return type(value), "<NA>"
+    return type(value), value
+
+
+# -------------------------------
+# Shared value dictionary
+# -------------------------------
+class ValuePool:
+    """One dictionary of distinct cell values shared by every column of a roster."""
+
+    def __init__(self):
+        self.values = []
+        self._ids = {}
+        self._array = None
+
+    @classmethod
+    def from_values(cls, values):
+        pool = cls()
+        for value in values:
+            pool.id(value)
+        return pool
+
+    def __len__(self):
+        return len(self.values)
+
+    def id(self, value):
+        value = plain_value(value)
+        key = _pool_key(value)
+        i = self._ids.get(key)
+        if i is None:
+            i = self._ids[key] = len(self.values)
+            self.values.append(value)
+            self._array = None
+        return i
+
+    def ids(self, values):
+        """int32 ids of an array of values (new values are added)."""
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object), use_na_sentinel=False)
+        lookup = np.array([self.id(v) for v in uniques], dtype=np.int32)
+        return lookup[codes] if len(codes) else np.zeros(0, dtype=np.int32)
+
+    def decode(self, ids):
+        if self._array is None:
+            self._array = np.array(self.values + [None], dtype=object)[:-1]
+        return self._array[ids]
+
+
+# -------------------------------
+# Compact profile store
+# -------------------------------
+class Roster:
+    """Client or maid profiles as int32 ids into a ValuePool, one row per slot.
+
+    Slots are append-only and addressed by the profile key (client_name or
+    maid_id). Flag columns (0/1, e.g. maidspeaks_*) are packed into one
+    uint64 bitmask per slot instead of a column each.
+    """
+
+    def __init__(self, frame, key, columns, flags=(), pool=None):
+        if len(flags) > 64:
+            raise ValueError("at most 64 flag columns fit in the bitmask")
+        self.key = key
+        self.columns = list(columns)
+        self.flags = list(flags)
+        self.pool = pool if pool is not None else ValuePool()
+        self.keys = list(frame[key])
+        self.pos = {k: i for i, k in enumerate(self.keys)}
+        self.ids = np.empty((len(frame), len(self.columns)), dtype=np.int32)
+        for c, col in enumerate(self.columns):
+            self.ids[:, c] = self.pool.ids(frame[col].to_numpy(dtype=object))
+        self.mask = self._mask(frame)
+
+    @classmethod
+    def from_arrays(cls, key, columns, flags, pool, keys, ids, mask):
+        """Roster over existing arrays (e.g. read-only views of a snapshot), without copying them."""
+        roster = cls.__new__(cls)
+        roster.key, roster.columns, roster.flags, roster.pool = key, list(columns), list(flags), pool
+        roster.keys = list(keys)
+        roster.ids, roster.mask = ids, mask
+        return roster
+
+    @cached_property
+    def pos(self):
+        # Set eagerly by __init__; built on first lookup for rosters over existing arrays.
+        return {k: i for i, k in enumerate(self.keys)}
+
+    def _mask(self, frame):
+        mask = np.zeros(len(frame), dtype=np.uint64)
+        for bit, col in enumerate(self.flags):
+            mask |= (frame[col].to_numpy() == 1).astype(np.uint64) << np.uint64(bit)
+        return mask
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def nbytes(self):
+        return self.ids.nbytes + self.mask.nbytes
+
+    # -------------------------------
+    # Updates
+    # -------------------------------
+    def encode(self, record):
+        return np.array([self.pool.id(record[col]) for col in self.columns], dtype=np.int32)
+
+    def put(self, record):
+        """Store record (a mapping) under its key; returns its slot."""
+        ids = self.encode(record)
+        mask = np.uint64(sum(1 << bit for bit, col in enumerate(self.flags) if record.get(col) == 1))
+        i = self.pos.get(record[self.key])
+        if i is None:
+            i = len(self.keys)
+            self.keys.append(record[self.key])
+            self.pos[record[self.key]] = i
+            self.ids = np.vstack([self.ids, ids[None, :]])
+            self.mask = np.append(self.mask, mask)
+        else:
+            self.ids[i], self.mask[i] = ids, mask
+        return i
+
+    def drop(self, key):
+        """Forget key (its slot stays allocated); returns the slot."""
+        return self.pos.pop(key)
+
+    def changed(self, frame):
+        """Boolean mask of the rows of frame whose key is new or whose profile differs from the stored one."""
+        keys = frame[self.key].to_numpy(dtype=object)
+        slots = np.array([self.pos.get(k, -1) for k in keys], dtype=np.int64)
+        differs = slots < 0
+        known = np.flatnonzero(~differs)
+        for c, col in enumerate(self.columns):
+            ids = self.pool.ids(frame[col].to_numpy(dtype=object)[known])
+            differs[known] |= ids != self.ids[slots[known], c]
+        if self.flags:
+            differs[known] |= self._mask(frame.iloc[known]) != self.mask[slots[known]]
+        return differs
+
+    # -------------------------------
+    # Decoding
+    # -------------------------------
+    def record(self, slot):
+        """{key, columns..., flags...} of one slot, decoded."""
+        values = self.pool.decode(self.ids[slot])
+        record = {self.key: self.keys[slot], **dict(zip(self.columns, values))}
+        for bit, col in enumerate(self.flags):
+            record[col] = int(self.mask[slot] >> np.uint64(bit) & np.uint64(1))
+        return record
+
+    def column(self, col, slots=None):
+        """Decoded values of one column (the key column included)."""
+        slots = np.arange(len(self)) if slots is None else slots
+        if col == self.key:
+            return np.array(self.keys + [None], dtype=object)[:-1][slots]
+        return self.pool.decode(self.ids[slots, self.columns.index(col)])
+
+    def having(self, flags, slots=None):
+        """Positions (in slots, or all slots) of the profiles with every one of flags set."""
+        bits = np.uint64(sum(1 << self.flags.index(col) for col in flags))
+        mask = self.mask if slots is None else self.mask[slots]
+        return np.flatnonzero(mask & bits == bits)
@@ -0,0 +1,312 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from matching.ingest import read_maids
+from matching.roster import plain_value
+from matching.snapshot import is_snapshot, load_snapshot
+from matching.matrix import maid_columns, profile_signatures, profile_top_k
+from matching.tables import EXPLAIN_RULES, SCORE_RULES, RuleTables
+
+# Client columns every query must carry (the reference indexes them directly).
+CLIENT_COLUMNS = list(dict.fromkeys(rule.client_col for rule in SCORE_RULES if rule.client_col))
+
+DEFAULT_PORT = 8765
+MAX_K = 50
+
+# A batch is scored once this many queries are waiting or the oldest has
+# waited this long, whichever comes first.
+MAX_BATCH = 256
+MAX_WAIT_MS = 2.0
+
+MAX_BODY_BYTES = 1 << 20
+
+
+class QueryError(ValueError):
+    """A malformed query; answered with 400 and never batched."""
+
+
+# -------------------------------
+# Maid roster held in memory
+# -------------------------------
+class MatchEngine:
+    """A maid roster encoded once, scoring batches of client profiles against it.
+
+    Maid codes, maid profiles and the rule tables folded onto them stay in
+    memory; a batch of clients is one gather per client column and one top-K
+    selection, exactly as the global search scores them. Client values the
+    tables have not seen yet extend the vocabularies (codes stay valid).
+    """
+
+    def __init__(self, maids_df):
+        maids_df = maids_df.drop_duplicates(subset=["maid_id"]).reset_index(drop=True)
+        maids = maids_df[maid_columns(maids_df.columns)]
+        self.maid_ids = maids_df["maid_id"].to_numpy()
+        self.tables = RuleTables(maids)
+        self.maid_codes = self.tables.maid_codes(maids)
+        self.explain_codes = self.tables.maid_codes(maids, EXPLAIN_RULES)
+        self.maid_profile, self.maid_reps = profile_signatures(self.maid_codes, self.n_maids)
+        self._bind()
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Engine over the memory-mapped arrays of a RosterSnapshot (nothing is re-encoded)."""
+        engine = cls.__new__(cls)
+        engine.maid_ids = snapshot.maid_ids()
+        engine.tables = snapshot.tables()
+        engine.maid_codes = snapshot.maid_codes()
+        engine.explain_codes = snapshot.explain_codes()
+        engine.maid_profile, engine.maid_reps = snapshot.array("maid_profile"), snapshot.array("maid_reps")
+        engine.bound = snapshot.bound()
+        return engine
+
+    @classmethod
+    def load(cls, path):
+        """Engine over a roster snapshot, or over the maids of an export."""
+        return cls.from_snapshot(load_snapshot(path)) if is_snapshot(path) else cls(read_maids(path))
+
+    def _bind(self):
+        self.bound = self.tables.bind_maids([None if mc is None else mc[self.maid_reps] for mc in self.maid_codes])
+
+    @property
+    def n_maids(self):
+        return len(self.maid_ids)
+
+    def top_k(self, clients, k):
+        """(len(clients), k) maid positions and ratios for client profiles (a frame of CLIENT_COLUMNS)."""
+        clients = clients[CLIENT_COLUMNS]
+        if self.tables.extend(clients):
+            self._bind()
+        codes = self.tables.client_codes(clients)
+        k = min(k, self.n_maids)
+        if not k:
+            return np.empty((len(clients), 0), dtype=np.int64), np.empty((len(clients), 0))
+        block = self.tables.score_bound(self.bound, codes, np.arange(len(clients)))
+        return profile_top_k(block, k, self.maid_profile, self.maid_reps)
+
+    def explain(self, clients, rows, maids):
+        """explain_row_score of the combined rows of pairs (clients row rows[i], maid position maids[i]).
+
+        clients must have gone through top_k first, so their values are in the tables.
+        """
+        client_codes = [cc[rows] for cc in self.tables.client_codes(clients[CLIENT_COLUMNS], EXPLAIN_RULES)]
+        maid_codes = [mc[maids] for mc in self.explain_codes]
+        return [self.tables.explain(client_codes, maid_codes, i) for i in range(len(rows))]
+
+
+# -------------------------------
+# Micro-batching
+# -------------------------------
+def parse_query(body):
+    """(client record, k, explain) of a /match request body."""
+    try:
+        query = json.loads(body)
+    except ValueError as e:
+        raise QueryError(f"invalid JSON: {e}")
+    if not isinstance(query, dict) or not isinstance(query.get("client"), dict):
+        raise QueryError('expected {"client": {...}, "k": 10, "explain": false}')
+    client = query["client"]
+    missing = [c for c in CLIENT_COLUMNS if c not in client]
+    if missing:
+        raise QueryError(f"client is missing {', '.join(missing)}")
+    for col in CLIENT_COLUMNS:
+        if isinstance(client[col], (dict, list)):
+            raise QueryError(f"{col} must be a single value")
+    k = query.get("k", 10)
+    if not isinstance(k, int) or isinstance(k, bool) or not 1 <= k <= MAX_K:
+        raise QueryError(f"k must be an integer between 1 and {MAX_K}")
+    return client, k, bool(query.get("explain", False))
+
+
+class Batcher:
+    """Collects concurrent queries and scores each batch in one engine call.
+
+    Scoring runs on a single worker thread, so the event loop keeps reading
+    requests while a batch is scored and the next batch fills up meanwhile.
+    """
+
+    def __init__(self, engine, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.stats = {"queries": 0, "batches": 0}
+
+    async def match(self, client, k, explain=False):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((client, k, explain, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                results = await loop.run_in_executor(self.executor, self.score, batch)
+            except Exception as e:  # a failed batch fails its queries, not the service
+                results = [e] * len(batch)
+            for (*_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def score(self, batch):
+        """Results of a list of (client, k, explain, future) queries (runs on the worker thread)."""
+        clients = pd.DataFrame([{c: client[c] for c in CLIENT_COLUMNS} for client, *_ in batch])
+        top_idx, top_scores = self.engine.top_k(clients, max(k for _, k, _, _ in batch))
+        self.stats["queries"] += len(batch)
+        self.stats["batches"] += 1
+        results = []
+        for i, (client, k, _, _) in enumerate(batch):
+            results.append({"client_name": client.get("client_name"), "matches": [
+                {"rank": rank, "maid_id": plain_value(self.engine.maid_ids[j]), "match_score_pct": ratio * 100}
+                for rank, (j, ratio) in enumerate(zip(top_idx[i, :k], top_scores[i, :k]), start=1)
+            ]})
+        # Explanations of every requested pair of the batch in one encoding pass
+        pairs = [(i, rank) for i, (_, k, explain, _) in enumerate(batch) if explain
+                 for rank in range(len(results[i]["matches"]))]
+        if pairs:
+            rows, ranks = np.array(pairs).T
+            for (i, rank), explanation in zip(pairs, self.engine.explain(clients, rows, top_idx[rows, ranks])):
+                results[i]["matches"][rank]["explanation"] = explanation
+        return results
+
+
+# -------------------------------
+# HTTP front end (stdlib asyncio, HTTP/1.1 keep-alive)
+# -------------------------------
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+def _response(status, payload, keep_alive=True):
+    body = json.dumps(payload, default=str).encode()
+    head = (f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode() + body
+
+
+class MatchServer:
+    """POST /match {"client": {...}, "k": 10, "explain": false} -> top-K maids; GET /health."""
+
+    def __init__(self, engine, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.engine = engine
+        self.batcher = Batcher(engine, max_batch, max_wait_ms)
+        self.started = time.time()
+
+    async def handle(self, method, path, body):
+        if path == "/health":
+            return 200, {"status": "ok", "maids": self.engine.n_maids,
+                         "maid_profiles": len(self.engine.maid_reps), "uptime_s": time.time() - self.started,
+                         **self.batcher.stats}
+        if path != "/match":
+            return 404, {"error": f"no route {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            client, k, explain = parse_query(body)
+        except QueryError as e:
+            return 400, {"error": str(e)}
+        try:
+            return 200, await self.batcher.match(client, k, explain)
+        except KeyError as e:
+            return 400, {"error": f"cannot score client: {e}"}
+        except Exception as e:
+            return 500, {"error": repr(e)}
+
+    async def connection(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    method, path, version = line.decode("latin-1").split()
+                except ValueError:
+                    writer.write(_response(400, {"error": "bad request line"}, keep_alive=False))
+                    break
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY_BYTES:
+                    writer.write(_response(413, {"error": "body too large"}, keep_alive=False))
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                status, payload = await self.handle(method, path.split("?")[0], body)
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT, ready=None):
+        batcher = asyncio.create_task(self.batcher.run())
+        server = await asyncio.start_server(self.connection, host, port, backlog=1024)
+        if ready is not None:
+            ready(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+
+
+# -------------------------------
+# CLI: python -m matching.service ROSTER
+# -------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m matching.service",
+        description="Serve best-maid queries for single clients against a maid roster kept in memory.",
+    )
+    parser.add_argument("roster", help="roster snapshot (see matching.snapshot) or an export holding the maids")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="queries scored per batch at most")
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS,
+                        help="longest a query waits for its batch to fill")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    engine = MatchEngine.load(args.roster)
+    print(f"{engine.n_maids:,} maids ({len(engine.maid_reps):,} profiles) loaded in "
+          f"{time.perf_counter() - started:.2f}s", flush=True)
+    server = MatchServer(engine, args.max_batch, args.max_wait_ms)
+    try:
+        asyncio.run(server.serve(args.host, args.port,
+                                 ready=lambda s: print(f"listening on http://{args.host}:{args.port}", flush=True)))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
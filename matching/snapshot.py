@@ -0,0 +1,214 @@
+import argparse
+import json
+import mmap
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from matching.explorer import LANGUAGE_PREFIX
+from matching.ingest import read_maids
+from matching.matrix import MAID_PREFIXES, maid_columns, profile_signatures
+from matching.roster import Roster, ValuePool, plain_value
+from matching.tables import EXPLAIN_RULES, RULES_VERSION, SCORE_RULES, RuleTables
+
+# File layout: MAGIC, uint64 header length, JSON header, then the arrays, each
+# starting on an ALIGN-byte boundary. Bump SNAPSHOT_VERSION on any change.
+MAGIC = b"MCCROSTR"
+SNAPSHOT_VERSION = 1
+ALIGN = 64
+
+SNAPSHOT_EXTENSION = ".roster"
+
+
+# -------------------------------
+# Writing
+# -------------------------------
+def snapshot_arrays(maids_df):
+    """(header fields, {name: array}) of a maid snapshot of maids_df (one row per maid, first-seen order)."""
+    maids_df = maids_df.drop_duplicates(subset=["maid_id"]).reset_index(drop=True)
+    maids_df = maids_df.loc[:, ~maids_df.columns.duplicated()]
+    profile_cols = [c for c in maids_df.columns if c.startswith(MAID_PREFIXES)]
+    flags = [c for c in maids_df.columns if c.startswith(LANGUAGE_PREFIX)]
+    roster = Roster(maids_df, "maid_id", [c for c in profile_cols if c != "maid_id"], flags=flags)
+
+    # Scoring side, exactly as the global search encodes maids (see ProfileMatrix)
+    maids = maids_df[maid_columns(maids_df.columns)]
+    tables = RuleTables(maids)
+    maid_codes = tables.maid_codes(maids)
+    maid_profile, maid_reps = profile_signatures(maid_codes, len(maids))
+    bound = tables.bind_maids([None if mc is None else mc[maid_reps] for mc in maid_codes])
+
+    keys = maids_df["maid_id"].to_numpy()
+    numeric_keys = keys.dtype.kind in "iu"
+    arrays = {
+        "keys": keys.astype(np.int64) if numeric_keys else roster.pool.ids(keys),
+        # Slots in maid_id order, for the profile explorer's paging
+        "order": maids_df["maid_id"].sort_values(kind="stable").index.to_numpy().astype(np.int64),
+        "ids": roster.ids,
+        "mask": roster.mask,
+        "maid_codes": np.stack([np.zeros(len(maids), np.int32) if mc is None else mc for mc in maid_codes]),
+        "explain_codes": np.stack(tables.maid_codes(maids, EXPLAIN_RULES)),
+        "maid_profile": maid_profile.astype(np.int64),
+        "maid_reps": maid_reps.astype(np.int64),
+    }
+    for r, table in enumerate(tables.state_tables):
+        arrays[f"state_{r}"] = table
+    for r, table in enumerate(tables.outcome_tables):
+        arrays[f"outcome_{r}"] = table
+    for b, (_, table) in enumerate(bound):
+        arrays[f"bound_{b}"] = table
+    header = {
+        "n_maids": len(maids_df),
+        "profile_columns": profile_cols,
+        "columns": roster.columns,
+        "flags": flags,
+        "numeric_keys": bool(numeric_keys),
+        "dictionary": roster.pool.values,
+        "vocab": {col: list(values) for col, values in tables.vocab.items()},
+        "messages": tables.messages,
+        "skipped_rules": [r for r, mc in enumerate(maid_codes) if mc is None],
+        "bound_rules": [r for r, _ in bound],
+    }
+    return header, arrays
+
+
+def write_snapshot(maids_df, path):
+    """Write the maid snapshot of maids_df to path (atomically); returns its size in bytes."""
+    header, arrays = snapshot_arrays(maids_df)
+    layout, offset = {}, 0
+    for name, a in arrays.items():
+        a = np.ascontiguousarray(a)
+        arrays[name] = a
+        layout[name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": offset}
+        offset = -(-(offset + a.nbytes) // ALIGN) * ALIGN
+    header = {"version": SNAPSHOT_VERSION, "rules_version": RULES_VERSION, **header, "arrays": layout}
+    raw = json.dumps(header, default=plain_value).encode()
+    start = -(-(len(MAGIC) + 8 + len(raw)) // ALIGN) * ALIGN
+
+    # A temp file of its own, so concurrent writers of one snapshot never share it
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                               prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC + len(raw).to_bytes(8, "little") + raw)
+            for name, a in arrays.items():
+                f.seek(start + layout[name]["offset"])
+                f.write(a.tobytes())
+            f.truncate(start + offset)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return start + offset
+
+
+# -------------------------------
+# Reading (memory-mapped, zero-copy)
+# -------------------------------
+class RosterSnapshot:
+    """A maid snapshot mapped read-only into memory.
+
+    Arrays are views of the mapping, so opening one costs the header parse
+    only, and every process mapping the same file shares one physical copy
+    through the page cache.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a maid roster snapshot")
+        size = int.from_bytes(self._mmap[len(MAGIC):len(MAGIC) + 8], "little")
+        self.header = json.loads(self._mmap[len(MAGIC) + 8:len(MAGIC) + 8 + size])
+        if self.header["version"] != SNAPSHOT_VERSION or self.header["rules_version"] != RULES_VERSION:
+            raise ValueError(f"{path} was written by another snapshot / rules version; rebuild it")
+        self._start = -(-(len(MAGIC) + 8 + size) // ALIGN) * ALIGN
+
+    def array(self, name):
+        spec = self.header["arrays"][name]
+        count = int(np.prod(spec["shape"]))
+        a = np.frombuffer(self._mmap, dtype=spec["dtype"], count=count, offset=self._start + spec["offset"])
+        return a.reshape(spec["shape"])
+
+    @property
+    def n_maids(self):
+        return self.header["n_maids"]
+
+    @property
+    def nbytes(self):
+        return len(self._mmap)
+
+    def pool(self):
+        return ValuePool.from_values(self.header["dictionary"])
+
+    def maid_ids(self, pool=None):
+        keys = self.array("keys")
+        if self.header["numeric_keys"]:
+            return keys
+        return (pool or self.pool()).decode(keys)
+
+    def roster(self):
+        pool = self.pool()
+        return Roster.from_arrays("maid_id", self.header["columns"], self.header["flags"], pool,
+                                  self.maid_ids(pool).tolist(), self.array("ids"), self.array("mask"))
+
+    def tables(self):
+        return RuleTables.from_compiled(
+            self.header["vocab"],
+            [self.array(f"state_{r}") for r in range(len(SCORE_RULES))],
+            [self.array(f"outcome_{r}") for r in range(len(EXPLAIN_RULES))],
+            self.header["messages"],
+        )
+
+    def maid_codes(self):
+        codes = self.array("maid_codes")
+        return [None if r in self.header["skipped_rules"] else codes[r] for r in range(len(SCORE_RULES))]
+
+    def explain_codes(self):
+        return list(self.array("explain_codes"))
+
+    def bound(self):
+        return [(r, self.array(f"bound_{b}")) for b, r in enumerate(self.header["bound_rules"])]
+
+
+def load_snapshot(path):
+    return RosterSnapshot(path)
+
+
+def is_snapshot(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+# -------------------------------
+# CLI: python -m matching.snapshot INPUT OUTPUT
+# -------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m matching.snapshot",
+        description="Write the maids of an export as a memory-mappable roster snapshot.",
+    )
+    parser.add_argument("input", help="CSV, Parquet, Arrow/Feather or Excel export")
+    parser.add_argument("output", help=f"snapshot file (conventionally *{SNAPSHOT_EXTENSION})")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    size = write_snapshot(read_maids(args.input), args.output)
+    print(f"wrote {args.output}: {size / 2 ** 20:.1f} MB in {time.perf_counter() - started:.2f}s")
+    started = time.perf_counter()
+    snapshot = load_snapshot(args.output)
+    snapshot.roster(), snapshot.tables()
+    print(f"{snapshot.n_maids:,} maids; opened in {(time.perf_counter() - started) * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
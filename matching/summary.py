@@ -0,0 +1,189 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from matching.tables import EXPLAIN_RULES, NEGATIVE, POSITIVE, RuleTables
+
+BUCKET_ORDER = ["Low-fit (<20%)", "Medium-fit (20–50%)", "High-fit (>50%)"]
+
+# Score bins of the distribution chart, [0, 10) ... [90, 100); the bucket
+# thresholds (20, 50) fall on bin edges, so buckets are unions of bins.
+SCORE_BINS = np.arange(0, 110, 10)
+
+# Feature / value of the cube rows that cover every client.
+CUBE_TOTAL = "(all)"
+
+
+# -------------------------------
+# Top Drivers of Match & Mismatch
+# -------------------------------
+def driver_counts(df, tables=None):
+    """(Kind, Theme, Count) frame of positive/negative explanation outcomes over the rows of df.
+
+    One pass builds the pair × rule outcome matrix; every outcome is themed by
+    its rule, so no sentence is built or parsed. Themes appear in order of
+    their first outcome (row, then rule), as reading the rows' explanations
+    top to bottom would list them.
+    """
+    tables = tables if tables is not None else RuleTables(df)
+    outcomes = tables.outcome_codes(*tables.encode(df, EXPLAIN_RULES))
+    found = {}
+    for kind in (NEGATIVE, POSITIVE):
+        hits = outcomes == kind
+        counts = hits.sum(axis=0)
+        first = hits.argmax(axis=0)
+        themes = {}  # theme -> [(first row, rule), count]
+        for r in np.flatnonzero(counts):
+            entry = themes.setdefault(EXPLAIN_RULES[r].theme, [(first[r], r), 0])
+            entry[0] = min(entry[0], (first[r], r))
+            entry[1] += int(counts[r])
+        found[kind] = {t: c for t, (_, c) in sorted(themes.items(), key=lambda item: item[1][0])}
+    return counts_frame(found[NEGATIVE], found[POSITIVE])
+
+
+def counts_frame(mismatch_counts, match_counts):
+    return pd.DataFrame(
+        [("negative", t, c) for t, c in mismatch_counts.items()]
+        + [("positive", t, c) for t, c in match_counts.items()],
+        columns=["Kind", "Theme", "Count"],
+    )
+
+
+def merge_driver_counts(frames):
+    """Sum driver count frames of several chunks, keeping first-seen theme order."""
+    mismatch_counts, match_counts = Counter(), Counter()
+    for frame in frames:
+        for kind, theme, count in frame.itertuples(index=False):
+            (mismatch_counts if kind == "negative" else match_counts)[theme] += count
+    return counts_frame(mismatch_counts, match_counts)
+
+
+def driver_shares(counts, kind):
+    """Theme / Count / Percent of one kind, ascending by share (as charted)."""
+    shares = counts[counts["Kind"] == kind][["Theme", "Count"]]
+    # Drop themes with zero
+    shares = shares[shares["Count"] > 0].copy()
+    shares["Percent"] = shares["Count"] / shares["Count"].sum() * 100
+    # Order by percentage ascending
+    return shares.sort_values("Percent", ascending=True)
+
+
+# -------------------------------
+# Portfolio Risk Buckets
+# -------------------------------
+def bucket_score(score):
+    if score < 20:
+        return "Low-fit (<20%)"
+    elif score < 50:
+        return "Medium-fit (20–50%)"
+    else:
+        return "High-fit (>50%)"
+
+
+# -------------------------------
+# Summary cube (Tab 4)
+# -------------------------------
+def score_bins(scores_pct):
+    """Bin of every score: i for [SCORE_BINS[i], SCORE_BINS[i + 1]), -1 below 0, 10 at 100 and above (and NaN)."""
+    return np.searchsorted(SCORE_BINS, scores_pct, side="right") - 1
+
+
+def _cube_part(feature, kind, values, scores):
+    frame = pd.DataFrame({"value": np.asarray(values, dtype=object), "score": scores})
+    part = frame.groupby(["value", "score"], dropna=False).size().rename("count").reset_index()
+    part.insert(0, "type", kind)
+    part.insert(0, "feature", feature)
+    return part
+
+
+def tagged_cube(df):
+    """Unmerged cube rows of the tagged pairs of df (a whole upload or one chunk of it)."""
+    tagged = df["match_score_pct"].to_numpy(dtype=float)
+    parts = [_cube_part(CUBE_TOTAL, "Tagged", np.full(len(tagged), CUBE_TOTAL, dtype=object), tagged)]
+    for feature in [c for c in df.columns if c.startswith("clientmts_")]:
+        parts.append(_cube_part(feature, "Tagged", df[feature].to_numpy(), tagged))
+    return pd.concat(parts, ignore_index=True)
+
+
+def best_cube(clients, best_df):
+    """Unmerged cube rows of the best matches; clients holds each client's first tagged row."""
+    rows = pd.Index(clients["client_name"]).get_indexer(best_df["client_name"])
+    best = best_df["match_score_pct"].to_numpy(dtype=float)
+    parts = [_cube_part(CUBE_TOTAL, "Best", np.full(len(best), CUBE_TOTAL, dtype=object), best)]
+    for feature in [c for c in clients.columns if c.startswith("clientmts_")]:
+        parts.append(_cube_part(feature, "Best", clients[feature].to_numpy()[rows], best))
+    return pd.concat(parts, ignore_index=True)
+
+
+def merge_cubes(parts):
+    """Add up cube rows (of chunks, or of tagged and best parts) into one cube.
+
+    Rows are keyed by the exact score, so merging only adds integer counts
+    and the result does not depend on how the rows were split; sums are
+    taken afterwards as score × count. Features keep first-seen order, the
+    rest of the key is sorted.
+    """
+    cube = pd.concat(parts, ignore_index=True)
+    cube = cube.groupby(["feature", "type", "value", "score"], dropna=False, sort=False)["count"].sum().reset_index()
+    features = {f: i for i, f in enumerate(pd.unique(cube["feature"]))}
+    cube = cube.sort_values(
+        ["feature", "type", "value", "score"],
+        key=lambda col: col.map(features) if col.name == "feature" else col.astype(str) if col.name == "value" else col,
+        kind="stable",
+    ).reset_index(drop=True)
+    cube.insert(3, "bin", score_bins(cube["score"].to_numpy()))
+    cube["sum"] = cube["score"] * cube["count"]
+    return cube[["feature", "value", "type", "bin", "score", "count", "sum"]]
+
+
+def score_cube(df, best_df):
+    """(feature, value, type, score) -> bin, count, sum of score % for tagged rows and best matches.
+
+    Built once per dataset; the Tab 4 metrics and charts are read from it.
+    Tagged rows are sliced by their own feature value, best matches by the
+    value on the client's first tagged row, so every client counts once.
+    Streaming runs build the same cube chunk by chunk (see merge_cubes).
+    """
+    clients = df.drop_duplicates(subset=["client_name"])
+    return merge_cubes([tagged_cube(df), best_cube(clients, best_df)])
+
+
+def cube_features(cube):
+    return [f for f in cube["feature"].unique() if f != CUBE_TOTAL]
+
+
+def cube_mean(cube, kind):
+    """Average score % of one type over all rows."""
+    total = cube[(cube["feature"] == CUBE_TOTAL) & (cube["type"] == kind)]
+    return total["sum"].sum() / total["count"].sum() if total["count"].sum() else np.nan
+
+
+def cube_histogram(cube):
+    """bin / type / count / percent of the 0–100 distribution chart (scores of 100% fall outside it)."""
+    total = cube[(cube["feature"] == CUBE_TOTAL) & cube["bin"].between(0, len(SCORE_BINS) - 2)]
+    grouped = total.groupby(["bin", "type"])["count"].sum().reset_index()
+    grouped["percent"] = grouped.groupby("type")["count"].transform(lambda x: x / x.sum() * 100)
+    labels = {i: str(pd.Interval(lo, hi, closed="left")) for i, (lo, hi) in enumerate(zip(SCORE_BINS, SCORE_BINS[1:]))}
+    grouped["bin"] = grouped["bin"].map(labels)
+    return grouped
+
+
+def cube_buckets(cube):
+    """bucket / type / count / percent of the risk bucket chart."""
+    total = cube[cube["feature"] == CUBE_TOTAL]
+    edges = {b: bucket_score(SCORE_BINS[b]) for b in range(len(SCORE_BINS))}
+    buckets = total["bin"].map(lambda b: edges.get(b, BUCKET_ORDER[0]))
+    summary = total.groupby([buckets.rename("bucket"), total["type"]])["count"].sum().reset_index()
+    summary["percent"] = summary.groupby("type")["count"].transform(lambda x: x / x.sum() * 100)
+    return summary
+
+
+def cube_slice(cube, feature):
+    """feature / tagged_score / best_score: average score % per value of a client feature."""
+    part = cube[(cube["feature"] == feature) & cube["value"].notna()]
+    sums = part.groupby(["value", "type"])[["count", "sum"]].sum()
+    means = (sums["sum"] / sums["count"]).unstack("type")
+    means = means.reindex(columns=["Tagged", "Best"])
+    means.columns = ["tagged_score", "best_score"]
+    return means.rename_axis("feature").reset_index()
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+# Values of every rule column, most common (typically "not specified") first.
+CLIENT_VALUES = {
+    "clientmts_household_type": ["unspecified", "baby", "many_kids", "baby_and_kids", "no_kids"],
+    "clientmts_pet_type": ["no_pets", "cat", "dog", "both", "bird"],
+    "clientmts_dayoff_policy": ["unspecified", "fixed_sunday", "flexible"],
+    "clientmts_living_arrangement": ["unspecified", "private_room", "private_room+abu_dhabi", "abu_dhabi", "shared"],
+    "clientmts_nationality_preference": ["any", "filipina", "ethiopian", "kenyan", "african"],
+    "clientmts_cuisine_preference": ["unspecified", "lebanese", "khaleeji+lebanese", "indian+veg", "veg",
+                                     "international"],
+    "clientmts_special_cases": ["unspecified", "elderly", "special_needs", "elderly_and_special"],
+}
+MAID_VALUES = {
+    "maidmts_household_type": ["unspecified", "refuses_baby", "refuses_many_kids", "refuses_baby_and_kids",
+                               "accepts_all"],
+    "maidmts_pet_type": ["unspecified", "refuses_cat", "refuses_dog", "refuses_both_pets"],
+    "maidmts_dayoff_policy": ["unspecified", "refuses_fixed_sunday", "flexible"],
+    "maidmts_living_arrangement": ["unspecified", "requires_no_private_room", "refuses_abu_dhabi",
+                                   "requires_no_private_room+refuses_abu_dhabi"],
+    "maid_nationality": ["filipina", "ethiopian", "kenyan", "ugandan", "south_african", np.nan],
+    "cooking_group": ["not_specified", "lebanese+khaleeji", "indian", "khaleeji", "veg+international", np.nan],
+    "maidpref_caregiving_profile": ["unspecified", "elderly_experienced", "special_needs", "elderly_and_special"],
+    "maidpref_kids_experience": ["unspecified", "lessthan2", "above2", "both"],
+    "maidpref_pet_handling": ["unspecified", "cats", "dogs", "both"],
+    "maidpref_personality": ["unspecified", "calm", "veg_friendly", "veg_friendly+calm", np.nan],
+    "maidpref_smoking": ["unspecified", "non_smoker", "smoker"],
+    "maidmts_at_hiring": ["yes", "no"],
+}
+LANGUAGES = ["english", "arabic", "french", "hindi", "tagalog", "amharic"]
+
+# Open vocabularies that `cardinality` widens with synthetic tokens.
+NATIONALITY_COLUMNS = ("clientmts_nationality_preference", "maid_nationality")
+CUISINE_COLUMNS = ("clientmts_cuisine_preference", "cooking_group")
+
+
+def _vocabulary(col, values, cardinality):
+    if not cardinality or col not in NATIONALITY_COLUMNS + CUISINE_COLUMNS:
+        return values
+    prefix = "nationality" if col in NATIONALITY_COLUMNS else "cuisine"
+    extra = [f"{prefix}_{i}" for i in range(max(0, cardinality - len(values)))]
+    if col in CUISINE_COLUMNS:
+        # Every third cuisine is a "+"-joined pair of tokens, like "indian+veg"
+        extra = [f"{t}+{extra[(i + 1) % len(extra)]}" if i % 3 == 0 else t for i, t in enumerate(extra)]
+    return values + extra
+
+
+def _draw(rng, values, n, skew):
+    """n draws from values with Zipf-like weights 1 / (rank + 1) ** skew (0 = uniform)."""
+    weights = 1.0 / np.arange(1, len(values) + 1) ** skew
+    return np.array(values, dtype=object)[rng.choice(len(values), n, p=weights / weights.sum())]
+
+
+# -------------------------------
+# Synthetic client / maid tables
+# -------------------------------
+def synthetic_profiles(n_clients, n_maids, skew=1.0, cardinality=None, seed=0):
+    """(clients_df, maids_df) with every clientmts_/maidmts_/maidpref_/maidspeaks_ column.
+
+    skew concentrates each column on its first ("not specified") values;
+    cardinality widens the nationality and cuisine vocabularies to that many
+    distinct values.
+    """
+    rng = np.random.default_rng(seed)
+    clients = pd.DataFrame({
+        col: _draw(rng, _vocabulary(col, values, cardinality), n_clients, skew)
+        for col, values in CLIENT_VALUES.items()
+    })
+    clients.insert(0, "client_name", [f"client_{i}" for i in range(n_clients)])
+
+    maids = pd.DataFrame({
+        col: _draw(rng, _vocabulary(col, values, cardinality), n_maids, skew)
+        for col, values in MAID_VALUES.items()
+    })
+    maids.insert(0, "maid_id", np.arange(n_maids) + 1000)
+    for i, lang in enumerate(LANGUAGES):
+        # Fewer speakers of the rarer languages
+        maids[f"maidspeaks_{lang}"] = (rng.random(n_maids) < 0.8 / (i + 1)).astype(np.int64)
+    return clients, maids
+
+
+def synthetic_pairs(n_pairs, n_clients=None, n_maids=None, skew=1.0, cardinality=None, seed=0):
+    """Tagged (client, maid) export of n_pairs rows, like the app's uploads.
+
+    Every client and maid keeps one profile across its rows; by default there
+    are about sqrt(n_pairs) of each, so the global search also covers about
+    n_pairs pairs.
+    """
+    side = max(1, int(np.sqrt(n_pairs)))
+    clients, maids = synthetic_profiles(n_clients or side, n_maids or side, skew, cardinality, seed)
+    rng = np.random.default_rng(seed + 1)
+    client_rows = rng.integers(0, len(clients), n_pairs)
+    maid_rows = rng.integers(0, len(maids), n_pairs)
+    return pd.concat(
+        [clients.iloc[client_rows].reset_index(drop=True), maids.iloc[maid_rows].reset_index(drop=True)],
+        axis=1,
+    )
@@ -0,0 +1,610 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+WEIGHT_STRONG = 0.6
+WEIGHT_MODERATE = 0.3
+WEIGHT_BONUS = 0.1
+
+# Per-rule outcome of a client/maid pair in the score.
+NOT_APPLICABLE, MISSED, EARNED = 0, 1, 2
+
+# Per-rule outcome of a client/maid pair in the explanation.
+NO_NOTE, POSITIVE, NEGATIVE, NEUTRAL = 0, 1, 2, 3
+KINDS = {POSITIVE: "positive", NEGATIVE: "negative", NEUTRAL: "neutral"}
+
+# Column defaults: REQUIRED raises KeyError like row[col]; SKIP drops the rule
+# like the reference's `"maid_nationality" in row` guard.
+REQUIRED = object()
+SKIP = object()
+
+# Bump whenever a rule, weight or explanation text changes: cached results are
+# keyed on it, so old entries stop matching instead of being served stale.
+RULES_VERSION = 2
+
+
+def _has(value, token):
+    # Substring tests only ever see strings in well-formed uploads.
+    return isinstance(value, str) and token in value
+
+
+class Rule:
+    """One rule: outcome(client value, maid value) plus how it enters the score / explanation.
+
+    cases, when given, maps the client and maid vocabularies to a
+    (n_client_values, n_maid_values) integer matrix of cases, pairs of one
+    case having the same outcome; tables are then compiled from one outcome()
+    call per case instead of one per value pair.
+    """
+
+    def __init__(self, key, client_col, maid_col, outcome, weight=None, theme=None,
+                 client_default=REQUIRED, maid_default=REQUIRED, cases=None):
+        self.key = key
+        self.client_col = client_col
+        self.maid_col = maid_col
+        self.outcome = outcome
+        self.weight = weight
+        self.theme = theme
+        self.client_default = client_default
+        self.maid_default = maid_default
+        self.cases = cases
+
+
+# -------------------------------
+# Multi-valued fields, tokenized once per vocabulary
+# -------------------------------
+def _equals(values, target):
+    return np.array([v == target for v in values], dtype=bool)
+
+
+def _tokens(values, ids):
+    """CSR (indptr, token ids) of the "+"-separated tokens of str(value); ids maps token -> id."""
+    indptr, tokens = [0], []
+    for value in values:
+        tokens.extend(ids.setdefault(t, len(ids)) for t in set(str(value).split("+")))
+        indptr.append(len(tokens))
+    return np.array(indptr), np.array(tokens, dtype=np.int64)
+
+
+def _shared_token(c_values, m_values):
+    """(len(c_values), len(m_values)) bool: set(str(c).split("+")) & set(str(m).split("+"))."""
+    ids = {}
+    c_ptr, c_tokens = _tokens(c_values, ids)
+    m_ptr, m_tokens = _tokens(m_values, ids)
+    # Maid values by token (the transposed CSR)
+    order = np.argsort(m_tokens, kind="stable")
+    maids_by_token = np.repeat(np.arange(len(m_values)), np.diff(m_ptr))[order]
+    starts = np.searchsorted(m_tokens[order], np.arange(len(ids) + 1))
+    # Every (client value, maid value) pair sharing a token: the sparse product
+    counts = starts[c_tokens + 1] - starts[c_tokens]
+    offsets = np.cumsum(counts) - counts
+    rows = np.repeat(np.repeat(np.arange(len(c_values)), np.diff(c_ptr)), counts)
+    cols = maids_by_token[np.repeat(starts[c_tokens] - offsets, counts) + np.arange(counts.sum())]
+    shared = np.zeros((len(c_values), len(m_values)), dtype=bool)
+    shared[rows, cols] = True
+    return shared
+
+
+def _contained(c_values, m_values):
+    """(len(c_values), len(m_values)) bool: isinstance(c, str) and c in str(m).
+
+    Every str(m) is cut into its substrings of the client values' lengths and
+    those are looked up among the client values, so the work grows with the
+    maid values' lengths rather than with the number of value pairs.
+    """
+    position = {c: i for i, c in enumerate(c_values) if isinstance(c, str)}
+    lengths = sorted({len(c) for c in position})
+    contained = np.zeros((len(c_values), len(m_values)), dtype=bool)
+    for j, m in enumerate(m_values):
+        m = str(m)
+        for n in lengths:
+            for start in range(len(m) - n + 1):
+                i = position.get(m[start:start + n])
+                if i is not None:
+                    contained[i, j] = True
+    return contained
+
+
+def _nationality_cases(c_values, m_values):
+    # Outcomes (and explanation texts) depend on the client value and the substring test only
+    return 2 * np.arange(len(c_values))[:, None] + _contained(c_values, m_values)
+
+
+def _cuisine_cases(c_values, m_values):
+    # 0: not applicable / neutral, 1: no shared token, 2: shared token
+    applicable = ~_equals(c_values, "unspecified")[:, None] & ~_equals([str(m) for m in m_values], "not_specified")
+    return np.where(applicable, 1 + _shared_token(c_values, m_values), 0)
+
+
+# -------------------------------
+# Score rules (mirror calculate_row_score, in the same order)
+# -------------------------------
+def _score_household(c_house, m_house):
+    if c_house == "unspecified":
+        return NOT_APPLICABLE
+    if (
+        (c_house == "baby" and m_house != "refuses_baby") or
+        (c_house == "many_kids" and m_house != "refuses_many_kids") or
+        (c_house == "baby_and_kids" and m_house != "refuses_baby_and_kids")
+    ):
+        return EARNED
+    return MISSED
+
+
+def _score_pets(c_pets, m_pets):
+    if c_pets == "no_pets":
+        return NOT_APPLICABLE
+    if (
+        (c_pets == "cat" and m_pets != "refuses_cat") or
+        (c_pets == "dog" and m_pets != "refuses_dog") or
+        (c_pets == "both" and m_pets != "refuses_both_pets")
+    ):
+        return EARNED
+    return MISSED
+
+
+def _score_dayoff(c_dayoff, m_dayoff):
+    if c_dayoff == "unspecified":
+        return NOT_APPLICABLE
+    if c_dayoff not in ["", "unspecified"] and m_dayoff != "refuses_fixed_sunday":
+        return EARNED
+    return MISSED
+
+
+def _score_living(c_living, m_living):
+    if c_living == "unspecified":
+        return NOT_APPLICABLE
+    if (
+        (_has(c_living, "private_room") and not _has(m_living, "requires_no_private_room"))
+        and (_has(c_living, "abu_dhabi") and not _has(m_living, "refuses_abu_dhabi"))
+    ):
+        return EARNED
+    return MISSED
+
+
+def _score_nationality(c_nat, m_nat):
+    if c_nat == "any":
+        return NOT_APPLICABLE
+    return EARNED if isinstance(c_nat, str) and c_nat in str(m_nat) else MISSED
+
+
+def _score_cuisine(c_cuisine, m_cooking):
+    m_cooking = str(m_cooking)
+    if c_cuisine == "unspecified" or m_cooking == "not_specified":
+        return NOT_APPLICABLE
+    if set(str(c_cuisine).split("+")) & set(m_cooking.split("+")):
+        return EARNED
+    return MISSED
+
+
+def _score_special(c_special, m_care):
+    if c_special == "unspecified":
+        return NOT_APPLICABLE
+    if (
+        (c_special == "elderly" and m_care in ["elderly_experienced", "elderly_and_special"]) or
+        (c_special == "special_needs" and m_care in ["special_needs", "elderly_and_special"]) or
+        (c_special == "elderly_and_special" and m_care == "elderly_and_special")
+    ):
+        return EARNED
+    return MISSED
+
+
+def _score_kids(c_house, m_kids):
+    if c_house not in ["baby", "many_kids", "baby_and_kids"]:
+        return NOT_APPLICABLE
+    if (
+        (c_house == "baby" and m_kids in ["lessthan2", "both"]) or
+        (c_house == "many_kids" and m_kids in ["above2", "both"]) or
+        (c_house == "baby_and_kids" and m_kids == "both")
+    ):
+        return EARNED
+    return MISSED
+
+
+def _score_pet_handling(c_pets, m_handling):
+    if c_pets == "no_pets":
+        return NOT_APPLICABLE
+    if (
+        (c_pets == "cat" and m_handling in ["cats", "both"]) or
+        (c_pets == "dog" and m_handling in ["dogs", "both"]) or
+        (c_pets == "both" and m_handling == "both")
+    ):
+        return EARNED
+    return MISSED
+
+
+def _score_veg(c_cuisine, m_personality):
+    if not _has(c_cuisine, "veg"):
+        return NOT_APPLICABLE
+    return EARNED if "veg_friendly" in str(m_personality) else MISSED
+
+
+def _score_smoking(_, m_smoking):
+    return EARNED if m_smoking == "non_smoker" else MISSED
+
+
+SCORE_RULES = [
+    Rule("household", "clientmts_household_type", "maidmts_household_type", _score_household, WEIGHT_STRONG),
+    Rule("pets", "clientmts_pet_type", "maidmts_pet_type", _score_pets, WEIGHT_STRONG),
+    Rule("dayoff", "clientmts_dayoff_policy", "maidmts_dayoff_policy", _score_dayoff, WEIGHT_STRONG),
+    Rule("living", "clientmts_living_arrangement", "maidmts_living_arrangement", _score_living, WEIGHT_STRONG),
+    Rule("nationality", "clientmts_nationality_preference", "maid_nationality", _score_nationality,
+         WEIGHT_MODERATE, maid_default=SKIP, cases=_nationality_cases),
+    Rule("cuisine", "clientmts_cuisine_preference", "cooking_group", _score_cuisine,
+         WEIGHT_MODERATE, maid_default="not_specified", cases=_cuisine_cases),
+    Rule("special_cases", "clientmts_special_cases", "maidpref_caregiving_profile", _score_special, WEIGHT_BONUS),
+    Rule("kids_experience", "clientmts_household_type", "maidpref_kids_experience", _score_kids, WEIGHT_BONUS),
+    Rule("pet_handling", "clientmts_pet_type", "maidpref_pet_handling", _score_pet_handling, WEIGHT_BONUS),
+    Rule("veg", "clientmts_cuisine_preference", "maidpref_personality", _score_veg, WEIGHT_BONUS),
+    Rule("smoking", None, "maidpref_smoking", _score_smoking, WEIGHT_BONUS),
+]
+
+
+# -------------------------------
+# Explanation rules (mirror explain_row_score, in the same order)
+# -------------------------------
+def _explain_household(c_house, m_house):
+    if c_house != "unspecified":
+        if c_house == "baby" and m_house != "refuses_baby":
+            return POSITIVE, "Client wants baby care, maid accepts it."
+        elif c_house == "baby":
+            return NEGATIVE, "Client wants baby care, maid refuses it."
+        elif c_house == "many_kids" and m_house != "refuses_many_kids":
+            return POSITIVE, "Client has many kids, maid accepts it."
+        elif c_house == "many_kids":
+            return NEGATIVE, "Client has many kids, maid refuses it."
+        return NO_NOTE, None
+    return NEUTRAL, "Client did not specify household type."
+
+
+def _explain_pets(c_pets, m_pets):
+    if c_pets != "no_pets":
+        if c_pets == "cat" and m_pets != "refuses_cat":
+            return POSITIVE, "Client has cats, maid accepts cats."
+        elif c_pets == "cat":
+            return NEGATIVE, "Client has cats, maid refuses cats."
+        elif c_pets == "dog" and m_pets != "refuses_dog":
+            return POSITIVE, "Client has dogs, maid accepts dogs."
+        elif c_pets == "dog":
+            return NEGATIVE, "Client has dogs, maid refuses dogs."
+        return NO_NOTE, None
+    return NEUTRAL, "Client did not specify pets."
+
+
+def _explain_dayoff(c_dayoff, m_dayoff):
+    if c_dayoff != "unspecified":
+        if m_dayoff != "refuses_fixed_sunday":
+            return POSITIVE, "Client specified day-off, maid accepts flexible policy."
+        return NEGATIVE, "Client specified day-off, maid refuses fixed Sunday."
+    return NEUTRAL, "Client did not specify day-off policy."
+
+
+def _explain_living(c_living, m_living):
+    if c_living != "unspecified":
+        if "private_room" in str(c_living) and "requires_no_private_room" not in str(m_living):
+            return POSITIVE, "Client requires private room, maid accepts it."
+        return NEGATIVE, "Client requires private room, maid refuses it."
+    return NEUTRAL, "Client did not specify living arrangement."
+
+
+def _explain_nationality(c_nat, m_nat):
+    if c_nat != "any":
+        if isinstance(c_nat, str) and c_nat in str(m_nat):
+            return POSITIVE, f"Client prefers {c_nat}, maid matches it."
+        return NEGATIVE, f"Client prefers {c_nat}, maid does not match."
+    return NEUTRAL, "Client did not specify nationality preference."
+
+
+def _explain_cuisine(c_cuisine, m_cooking):
+    m_cooking = str(m_cooking)
+    if c_cuisine != "unspecified" and m_cooking != "not_specified":
+        if set(str(c_cuisine).split("+")) & set(m_cooking.split("+")):
+            return POSITIVE, "Client cuisine preference matches maid cooking skills."
+        return NEGATIVE, "Client cuisine preference does not match maid cooking skills."
+    return NEUTRAL, "Client did not specify cuisine preference."
+
+
+def _explain_special(c_special, m_care):
+    if c_special != "unspecified":
+        if _score_special(c_special, m_care) == EARNED:
+            return POSITIVE, "Client requires caregiving, maid has relevant experience."
+        return NEGATIVE, "Client requires caregiving, maid lacks the required experience."
+    return NEUTRAL, "Client did not specify caregiving needs."
+
+
+def _explain_smoking(_, m_smoke):
+    if m_smoke == "non_smoker":
+        return POSITIVE, "Maid is a non-smoker."
+    return NEUTRAL, "Maid profile indicates smoking tolerance or unspecified."
+
+
+EXPLAIN_RULES = [
+    Rule("household", "clientmts_household_type", "maidmts_household_type", _explain_household,
+         theme="Household Type", client_default="unspecified", maid_default="unspecified"),
+    Rule("pets", "clientmts_pet_type", "maidmts_pet_type", _explain_pets,
+         theme="Pets", client_default="no_pets", maid_default="unspecified"),
+    Rule("dayoff", "clientmts_dayoff_policy", "maidmts_dayoff_policy", _explain_dayoff,
+         theme="Day-off Policy", client_default="unspecified", maid_default="unspecified"),
+    Rule("living", "clientmts_living_arrangement", "maidmts_living_arrangement", _explain_living,
+         theme="Living Arrangement", client_default="unspecified", maid_default="unspecified"),
+    Rule("nationality", "clientmts_nationality_preference", "maid_nationality", _explain_nationality,
+         theme="Nationality", client_default="any", maid_default="unspecified", cases=_nationality_cases),
+    Rule("cuisine", "clientmts_cuisine_preference", "cooking_group", _explain_cuisine,
+         theme="Cuisine", client_default="unspecified", maid_default="not_specified", cases=_cuisine_cases),
+    Rule("special_cases", "clientmts_special_cases", "maidpref_caregiving_profile", _explain_special,
+         theme="Special Cases", client_default="unspecified", maid_default="unspecified"),
+    Rule("smoking", None, "maidpref_smoking", _explain_smoking,
+         theme="Smoking", maid_default="unspecified"),
+]
+
+
+# -------------------------------
+# State index -> score lookup
+# -------------------------------
+@lru_cache(maxsize=None)
+def score_luts(n_rules=len(SCORE_RULES)):
+    # Every pair's per-rule states pack into one base-3 index; the float sums are
+    # replayed here in rule order so looking them up is bit-identical to the
+    # running total in calculate_row_score.
+    index = np.arange(3 ** n_rules)
+    score = np.zeros(len(index))
+    max_score = np.zeros(len(index))
+    for r, rule in enumerate(SCORE_RULES[:n_rules]):
+        state = (index // 3 ** r) % 3
+        max_score = max_score + np.where(state != NOT_APPLICABLE, rule.weight, 0.0)
+        score = score + np.where(state == EARNED, rule.weight, 0.0)
+    ratio = np.divide(score, max_score, out=np.zeros(len(index)), where=max_score > 0)
+    return score, max_score, ratio
+
+
+# -------------------------------
+# Compiled tables for one dataset
+# -------------------------------
+def _values(frame, col):
+    if isinstance(frame, pd.DataFrame):
+        return frame[col].to_numpy(dtype=object)
+    return np.array([frame[col]], dtype=object)
+
+
+def _factorize(frame, col):
+    """(codes, distinct values) of a frame column, values as objects in order of first appearance.
+
+    Categorical columns (typed ingest) already carry their distinct values;
+    other columns (e.g. pandas' Arrow-backed strings) are factorized natively,
+    so only the distinct values are converted to Python objects.
+    """
+    values = frame[col]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        distinct = np.append(values.cat.categories.to_numpy(dtype=object), np.nan)
+        return np.where(codes < 0, len(distinct) - 1, codes), distinct
+    codes, distinct = pd.factorize(values, use_na_sentinel=False)
+    return codes, pd.Index(distinct).to_numpy(dtype=object)
+
+
+def _distinct(frame, col):
+    if isinstance(frame, pd.DataFrame):
+        values = frame[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            distinct = values.cat.categories.to_numpy(dtype=object)
+            return np.append(distinct, np.nan) if values.hasnans else distinct
+        return _factorize(frame, col)[1]
+    return _values(frame, col)
+
+
+def _has_col(frame, col):
+    return col in (frame.columns if isinstance(frame, pd.DataFrame) else frame)
+
+
+class RuleTables:
+    """Per-rule lookup tables over the category codes of one dataset.
+
+    Every rule column is mapped to small integer codes once; the score state and
+    explanation outcome of every code combination are precomputed, so scoring a
+    pair is a handful of table lookups and no string work.
+    """
+
+    def __init__(self, *frames):
+        self.vocab = {}
+        columns = {}
+        for rule in SCORE_RULES + EXPLAIN_RULES:
+            for col, default in ((rule.client_col, rule.client_default), (rule.maid_col, rule.maid_default)):
+                if col is None:
+                    continue
+                columns.setdefault(col, [])
+                if default not in (REQUIRED, SKIP):
+                    columns[col].append(np.array([default], dtype=object))
+        for col, parts in columns.items():
+            for frame in frames:
+                if _has_col(frame, col):
+                    parts.append(_distinct(frame, col))
+            values = np.concatenate(parts) if parts else np.array([], dtype=object)
+            self.vocab[col] = pd.Index(pd.factorize(values, use_na_sentinel=False)[1], dtype=object)
+        self._compile_all()
+
+    @classmethod
+    def from_compiled(cls, vocab, state_tables, outcome_tables, messages):
+        """Tables restored from saved vocabularies and compiled tables (see matching.snapshot), not recompiled."""
+        tables = cls.__new__(cls)
+        tables.vocab = {col: pd.Index(values, dtype=object) for col, values in vocab.items()}
+        tables.state_tables = list(state_tables)
+        tables.outcome_tables = list(outcome_tables)
+        tables.messages = [[tuple(note) for note in notes] for notes in messages]
+        return tables
+
+    def _compile_all(self):
+        self.state_tables = [self._compile(rule, lambda v: v * 3 ** r, np.int32)
+                             for r, rule in enumerate(SCORE_RULES)]
+        self.messages = []
+        self.outcome_tables = []
+        for rule in EXPLAIN_RULES:
+            notes = {}
+            table = self._compile(rule, lambda v: notes.setdefault(v, len(notes)), np.int16)
+            self.messages.append(list(notes))
+            self.outcome_tables.append(table)
+
+    def extend(self, frame):
+        """Add values of frame unseen so far; returns True if the tables were recompiled.
+
+        New values are appended to the vocabularies, so codes handed out earlier
+        stay valid.
+        """
+        changed = False
+        for col, vocab in self.vocab.items():
+            if not _has_col(frame, col):
+                continue
+            values = _distinct(frame, col)
+            new = values[vocab.get_indexer(values) < 0]
+            if len(new):
+                new = pd.factorize(new, use_na_sentinel=False)[1]
+                self.vocab[col] = vocab.append(pd.Index(new, dtype=object))
+                changed = True
+        if changed:
+            self._compile_all()
+        return changed
+
+    def _compile(self, rule, cell, dtype):
+        c_values = self.vocab[rule.client_col] if rule.client_col else [None]
+        m_values = self.vocab[rule.maid_col]
+        if rule.cases is not None and len(c_values) and len(m_values):
+            # One outcome per case, taken at its first pair in row-major order
+            # (the order of the loop below, so explanation notes number alike)
+            cases = rule.cases(c_values, m_values)
+            _, first, inverse = np.unique(cases, return_index=True, return_inverse=True)
+            cells = np.empty(len(first), dtype=dtype)
+            for u in np.argsort(first):
+                i, j = divmod(first[u], len(m_values))
+                cells[u] = cell(rule.outcome(c_values[i], m_values[j]))
+            return cells[inverse.reshape(cases.shape)]
+        table = np.zeros((len(c_values), len(m_values)), dtype=dtype)
+        for i, c in enumerate(c_values):
+            for j, m in enumerate(m_values):
+                table[i, j] = cell(rule.outcome(c, m))
+        return table
+
+    def codes(self, frame, col, default, memo=None):
+        """Integer codes of frame[col] (a DataFrame or a single row mapping).
+
+        memo (a dict) shares the factorized columns of one frame between calls,
+        so a column read by several rules is factorized once.
+        """
+        n = len(frame) if isinstance(frame, pd.DataFrame) else 1
+        if col is None:
+            return np.zeros(n, dtype=np.int32)
+        if not _has_col(frame, col):
+            if default is REQUIRED:
+                raise KeyError(col)
+            if default is SKIP:
+                return None
+            return np.full(n, self.vocab[col].get_loc(default), dtype=np.int32)
+        if not isinstance(frame, pd.DataFrame):
+            codes = self.vocab[col].get_indexer(_values(frame, col))
+        elif memo is not None and col in memo:
+            return memo[col]
+        else:
+            # Translate the codes of the column's distinct values instead of
+            # hashing every row's value
+            codes, distinct = _factorize(frame, col)
+            codes = self.vocab[col].get_indexer(distinct)[codes]
+        if (codes < 0).any():
+            raise KeyError(f"{col}: value outside the compiled vocabulary")
+        codes = codes.astype(np.int32)
+        if memo is not None:
+            memo[col] = codes
+        return codes
+
+    def client_codes(self, frame, rules=SCORE_RULES, memo=None):
+        memo = {} if memo is None else memo
+        return [self.codes(frame, rule.client_col, rule.client_default, memo) for rule in rules]
+
+    def maid_codes(self, frame, rules=SCORE_RULES, memo=None):
+        memo = {} if memo is None else memo
+        return [self.codes(frame, rule.maid_col, rule.maid_default, memo) for rule in rules]
+
+    def encode(self, frame, rules=SCORE_RULES):
+        """Client and maid code arrays of every rule, as two lists."""
+        memo = {}
+        return self.client_codes(frame, rules, memo), self.maid_codes(frame, rules, memo)
+
+    # -------------------------------
+    # Scoring
+    # -------------------------------
+    def state_index(self, client_codes, maid_codes):
+        """Packed rule states for aligned (1-D) or broadcast (2-D) code arrays."""
+        index = None
+        for table, cc, mc in zip(self.state_tables, client_codes, maid_codes):
+            if mc is None:
+                continue
+            part = table[cc, mc]
+            if index is None:
+                index = part
+            else:
+                index += part
+        return index
+
+    def score_rows(self, frame):
+        """(score, max_score, ratio) for each row of a tagged frame."""
+        index = self.state_index(*self.encode(frame))
+        score, max_score, ratio = score_luts()
+        return score[index], max_score[index], ratio[index]
+
+    def bind_maids(self, maid_codes):
+        """Fold the state tables onto a fixed maid list.
+
+        Returns [(rule position, (n_client_codes, n_maids) table)], one entry per
+        client column, so a block of clients is scored with a row gather per
+        client column instead of a 2-D gather per rule.
+        """
+        bound = {}
+        for r, (rule, table, mc) in enumerate(zip(SCORE_RULES, self.state_tables, maid_codes)):
+            if mc is None:
+                continue
+            part = table[:, mc]
+            if rule.client_col in bound:
+                bound[rule.client_col][1] += part
+            else:
+                bound[rule.client_col] = [r, part]
+        # Client-independent rules (smoking) have a single row; fold it into the
+        # first client column (packed indexes add exactly).
+        if None in bound and len(bound) > 1:
+            constant = bound.pop(None)[1]
+            next(iter(bound.values()))[1] += constant
+        return [(r, table) for r, table in bound.values()]
+
+    def score_bound(self, bound, client_codes, rows):
+        """Ratio matrix of clients[rows] against the maids bound by bind_maids."""
+        index = None
+        for r, table in bound:
+            part = table[client_codes[r][rows]]
+            if index is None:
+                index = part
+            else:
+                index += part
+        return score_luts()[2][index]
+
+    # -------------------------------
+    # Explanations
+    # -------------------------------
+    def outcome_codes(self, client_codes, maid_codes):
+        """(n_pairs, n_explain_rules) matrix of NO_NOTE/POSITIVE/NEGATIVE/NEUTRAL.
+
+        Rules whose maid column is missing (SKIP) give NO_NOTE.
+        """
+        n = len(client_codes[0])
+        outcomes = np.full((n, len(self.outcome_tables)), NO_NOTE, dtype=np.int8)
+        for r, (table, cc, mc) in enumerate(zip(self.outcome_tables, client_codes, maid_codes)):
+            if mc is None:
+                continue
+            kinds = np.array([kind for kind, _ in self.messages[r]], dtype=np.int8)
+            outcomes[:, r] = kinds[table[cc, mc]]
+        return outcomes
+
+    def explain(self, client_codes, maid_codes, i=0):
+        """explain_row_score-style dict for pair i of the encoded arrays."""
+        explanations = {"positive": [], "negative": [], "neutral": []}
+        for r, (table, cc, mc) in enumerate(zip(self.outcome_tables, client_codes, maid_codes)):
+            kind, text = self.messages[r][table[cc[i], mc[i]]]
+            if kind != NO_NOTE:
+                explanations[KINDS[kind]].append(text)
+        return explanations
@@ -0,0 +1,22 @@
+import pandas as pd
+
+from matching.tables import RuleTables
+
+
+# -------------------------------
+# Vectorized Matching Score (tagged pairs)
+# -------------------------------
+def score_components(df, tables=None):
+    """Return (score, max_score) arrays with the same values as calculate_row_score."""
+    if tables is None:
+        tables = RuleTables(df)
+    score, max_score, _ = tables.score_rows(df)
+    return score, max_score
+
+
+def calculate_frame_scores(df, tables=None):
+    """Vectorized equivalent of df.apply(calculate_row_score, axis=1)."""
+    if tables is None:
+        tables = RuleTables(df)
+    _, _, ratio = tables.score_rows(df)
+    return pd.Series(ratio, index=df.index, dtype=float)
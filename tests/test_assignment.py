@@ -0,0 +1,63 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from matching import assignment
+from matching.assignment import compute_assignment, exact_assignment, greedy_assignment, hungarian
+from matching.matrix import ProfileMatrix
+from matching.synthetic import synthetic_pairs
+
+
+def _best_total(scores, capacity):
+    """Brute-force maximum total score, each maid taking up to capacity clients."""
+    n_clients, n_maids = scores.shape
+    slots = np.repeat(np.arange(n_maids), capacity)
+    placed = min(n_clients, len(slots))
+    best = 0.0
+    for clients in itertools.combinations(range(n_clients), placed):
+        for chosen in itertools.permutations(range(len(slots)), placed):
+            best = max(best, scores[list(clients), slots[list(chosen)]].sum())
+    return best
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_hungarian_finds_the_minimum_cost(seed):
+    cost = np.random.default_rng(seed).integers(0, 20, (5, 5)).astype(float)
+    cols = hungarian(cost)
+    assert sorted(cols) == list(range(5))
+    assert cost[np.arange(5), cols].sum() == min(
+        cost[np.arange(5), list(p)].sum() for p in itertools.permutations(range(5))
+    )
+
+
+@pytest.mark.parametrize("shape, capacity", [((5, 5), 1), ((5, 3), 2), ((6, 2), 2), ((3, 5), 1)])
+def test_exact_assignment_is_optimal(shape, capacity):
+    scores = np.random.default_rng(sum(shape) + capacity).random(shape).round(2)
+    assigned = exact_assignment(scores, capacity)
+    hit = np.flatnonzero(assigned >= 0)
+    assert len(hit) == min(shape[0], shape[1] * capacity)
+    assert np.bincount(assigned[hit], minlength=shape[1]).max() <= capacity
+    assert scores[hit, assigned[hit]].sum() == pytest.approx(_best_total(scores, capacity))
+
+
+@pytest.mark.parametrize("capacity", [1, 2, 3])
+def test_greedy_assignment_respects_capacity(capacity):
+    pm = ProfileMatrix.from_frame(synthetic_pairs(2500, 50, 20, seed=capacity))
+    assigned, ceiling = greedy_assignment(pm, capacity, candidates=5)
+    hit = assigned[assigned >= 0]
+    assert len(hit) == min(pm.n_clients, pm.n_maids * capacity)
+    assert np.bincount(hit, minlength=pm.n_maids).max() <= capacity
+    assert np.allclose(ceiling, pm.score_matrix().max(axis=1))
+
+
+def test_exact_over_the_size_limit_is_solved_greedily(monkeypatch):
+    df = synthetic_pairs(900, 30, 30, seed=7)
+    monkeypatch.setattr(assignment, "EXACT_MAX_CELLS", 30 * 30 * 2 - 1)
+
+    _, stats = compute_assignment(df, capacity=2, method="exact")
+    assert stats["method"] == "greedy" and stats["requested_method"] == "exact"
+    assert "1,800" in stats["note"]
+
+    _, stats = compute_assignment(df, capacity=1, method="exact")
+    assert stats["method"] == "exact" and stats["note"] is None
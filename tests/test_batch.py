@@ -0,0 +1,66 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from matching.__main__ import main
+from matching.batch import run_batch
+from matching.matrix import compute_top_k_matches
+from matching.synthetic import synthetic_pairs
+from matching.vectorized import calculate_frame_scores
+
+OUTPUTS = ("tagged_scores", "driver_summary", "best_matches", "score_summary")
+
+
+def _run(df, tmp_path, name, **options):
+    path = tmp_path / f"{name}.csv"
+    df.to_csv(path, index=False)
+    stats = run_batch(str(path), str(tmp_path / name), workers=1, log=lambda *_: None, **options)
+    return stats, {output: pd.read_parquet(tmp_path / name / f"{output}.parquet") for output in OUTPUTS}
+
+
+def test_batch_run_matches_in_memory_scoring(tmp_path):
+    df = synthetic_pairs(600, seed=3)
+    stats, outputs = _run(df, tmp_path, "run", chunk_rows=250, top_k=3)
+    assert stats["rows"] == len(df)
+    assert np.allclose(outputs["tagged_scores"]["match_score"], calculate_frame_scores(df))
+
+    expected = compute_top_k_matches(df, k=3)
+    best = outputs["best_matches"]
+    assert best["client_name"].tolist() == expected["client_name"].tolist()
+    assert best["best_maid_id"].tolist() == expected["maid_id"].tolist()
+    assert np.allclose(best["match_score_pct"], expected["match_score_pct"])
+
+
+@pytest.mark.parametrize("chunk_rows", [64, 250])
+def test_summaries_do_not_depend_on_the_chunk_size(chunk_rows, tmp_path):
+    df = synthetic_pairs(600, seed=4)
+    _, whole = _run(df, tmp_path, "whole", chunk_rows=len(df))
+    _, chunked = _run(df, tmp_path, "chunked", chunk_rows=chunk_rows)
+    for name in ("driver_summary", "score_summary"):
+        pd.testing.assert_frame_equal(chunked[name], whole[name])
+
+
+@pytest.mark.parametrize("ext", [".csv", ".parquet"])
+def test_input_without_rows_writes_empty_outputs(ext, tmp_path):
+    header = synthetic_pairs(100, seed=1).iloc[:0]
+    path = tmp_path / f"empty{ext}"
+    header.to_csv(path, index=False) if ext == ".csv" else header.to_parquet(path, index=False)
+
+    stats_path = tmp_path / "stats.json"
+    main([str(path), "--out", str(tmp_path / "out"), "--workers", "1", "--stats-json", str(stats_path)])
+
+    for name in OUTPUTS:
+        frame = pd.read_parquet(tmp_path / "out" / f"{name}.parquet")
+        assert frame.empty and len(frame.columns)
+    stats = json.loads(stats_path.read_text())
+    assert stats["rows"] == 0 and stats["pairs"] == 0
+
+
+def test_outputs_keep_their_columns_without_rows(tmp_path):
+    df = synthetic_pairs(400, seed=2)
+    _, full = _run(df, tmp_path, "full", top_k=3)
+    _, empty = _run(df.iloc[:0], tmp_path, "empty", top_k=3)
+    for name in OUTPUTS:
+        assert empty[name].empty and empty[name].columns.tolist() == full[name].columns.tolist()
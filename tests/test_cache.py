@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from matching.cache import ResultCache, fingerprint
+from matching.snapshot import load_snapshot, write_snapshot
+from matching.synthetic import synthetic_profiles
+
+
+def _concurrently(target, args_list):
+    threads = [threading.Thread(target=target, args=args) for args in args_list]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def _frame(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "client_name": [f"client_{i}" for i in rng.integers(0, 50, n)],
+        "maid_id": rng.integers(1000, 1030, n),
+        "clientmts_pet_type": rng.choice(["no_pets", "cat", "dog"], n),
+        "maidmts_pet_type": rng.choice(["unspecified", "refuses_cat"], n),
+        "cooking_group": rng.choice(["not_specified", "indian"], n),
+        "notes": rng.choice(["a", "b"], n),
+    })
+
+
+def test_fingerprint_follows_the_scoring_columns():
+    df = _frame()
+    key = fingerprint(df)
+    assert fingerprint(df.copy()) == key
+    assert fingerprint(df.assign(notes="changed")) == key
+    assert fingerprint(df.astype({"clientmts_pet_type": "category"})) == key
+
+    edited = df.copy()
+    edited.loc[3, "maidmts_pet_type"] = "refuses_dog"
+    assert fingerprint(edited) != key
+    assert fingerprint(df.iloc[:-1]) != key
+
+
+def test_get_or_compute_computes_once(tmp_path):
+    cache, calls = ResultCache(str(tmp_path)), []
+
+    def compute():
+        calls.append(1)
+        return pd.DataFrame({"match_score": np.linspace(0, 1, 50)})
+
+    first = cache.get_or_compute("key", "tagged", compute)
+    again = cache.get_or_compute("key", "tagged", compute)
+    assert len(calls) == 1 and again.equals(first)
+    assert cache.get("key", "other") is None and not cache.has("other", "tagged")
+
+
+def test_eviction_drops_the_least_recently_used_results(tmp_path):
+    frame = pd.DataFrame({"x": np.arange(10_000)})
+    cache = ResultCache(str(tmp_path))
+    cache.put("a", "tagged", frame)
+    size = os.path.getsize(tmp_path / "a.tagged.parquet")
+    cache.max_bytes = 2 * size
+    for key in ("b", "c"):
+        time.sleep(0.02)
+        cache.put(key, "tagged", frame)
+    assert sorted(os.listdir(tmp_path)) == ["b.tagged.parquet", "c.tagged.parquet"]
+
+    time.sleep(0.02)
+    cache.get("b", "tagged")  # reading refreshes b, so c is now the stalest
+    time.sleep(0.02)
+    cache.put("d", "tagged", frame)
+    assert sorted(os.listdir(tmp_path)) == ["b.tagged.parquet", "d.tagged.parquet"]
+
+
+def test_concurrent_puts_of_one_result_leave_a_whole_file(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    frames = [pd.DataFrame({"session": np.full(100_000, i)}) for i in range(8)]
+    _concurrently(cache.put, [("key", "tagged", frame) for frame in frames])
+
+    frame = cache.get("key", "tagged")
+    assert len(frame) == 100_000 and frame["session"].nunique() == 1
+    assert os.listdir(tmp_path) == ["key.tagged.parquet"]
+
+
+def test_concurrent_snapshot_writes_leave_a_readable_snapshot(tmp_path):
+    _, maids = synthetic_profiles(10, 2000, seed=4)
+    path = str(tmp_path / "maids.roster")
+    _concurrently(write_snapshot, [(maids, path)] * 4)
+
+    assert load_snapshot(path).n_maids == 2000
+    assert os.listdir(tmp_path) == ["maids.roster"]
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from matching.equivalence import (
+    check_explanations,
+    check_search,
+    check_tagged,
+    rule_corpus,
+    sampled_corpus,
+    variants,
+)
+
+VARIANTS = [name for name, _ in variants(sampled_corpus(1))]
+
+
+def _tagged_corpus():
+    tagged = pd.concat([rule_corpus(), sampled_corpus(300, seed=0)], ignore_index=True)
+    tagged["client_name"] = [f"client_{i}" for i in range(len(tagged))]
+    tagged["maid_id"] = np.arange(len(tagged)) + 1000
+    return tagged
+
+
+def _variant(df, name):
+    return dict(variants(df))[name]
+
+
+def _arrow_strings(df):
+    # The string dtype pandas gives untyped CSV columns
+    return df.astype({c: "str" for c in df.columns if df[c].dtype == object})
+
+
+@pytest.fixture(scope="module")
+def tagged():
+    return _tagged_corpus()
+
+
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_tagged_scores_match_reference(tagged, variant):
+    assert check_tagged(_variant(tagged, variant), variant) == []
+
+
+def test_tagged_scores_of_arrow_string_columns_match_reference(tagged):
+    assert check_tagged(_arrow_strings(tagged), "arrow strings") == []
+
+
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_explanations_match_reference(tagged, variant):
+    assert check_explanations(_variant(tagged, variant), variant) == []
+
+
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_global_search_matches_reference(variant):
+    search = sampled_corpus(40, seed=1)
+    assert check_search(_variant(search, variant), variant, k=5, workers=2) == []
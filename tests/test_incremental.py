@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from matching.cache import ResultCache, fingerprint, synced_matching_state
+from matching.incremental import MatchingState
+from matching.synthetic import synthetic_profiles
+
+K = 5
+
+
+def _pairs(clients, maids, rng, rows_per_client=3):
+    """Tagged export: one anchor row per maid first (so maids keep their order
+    when clients go), then a few rows of every client with random maids."""
+    anchors = clients.iloc[:len(maids)].assign(client_name=[f"anchor_{m}" for m in maids["maid_id"]])
+    client_rows = np.repeat(np.arange(len(maids), len(clients)), rows_per_client)
+    maid_rows = np.concatenate([np.arange(len(maids)), rng.integers(0, len(maids), len(client_rows))])
+    left = pd.concat([anchors, clients.iloc[client_rows]], ignore_index=True)
+    return pd.concat([left, maids.iloc[maid_rows].reset_index(drop=True)], axis=1)
+
+
+def _edit(df, state, rng):
+    """A small random edit of df (well under the rebuild threshold)."""
+    df = df.copy()
+    client_cols = [c for c in df.columns if c.startswith("clientmts_")]
+    maid_cols = [c for c in df.columns if c.startswith(("maidmts_", "maidpref_", "maid_nationality"))]
+    listed = state.top_k_matches()
+
+    # Remove some client's best maid and another client's K-th maid
+    names = listed["client_name"].unique()
+    best = listed[(listed["client_name"] == names[0]) & (listed["rank"] == 1)]["maid_id"].iloc[0]
+    kth = listed[(listed["client_name"] == names[1]) & (listed["rank"] == K)]["maid_id"].iloc[0]
+    df = df[~df["maid_id"].isin([best, kth])]
+    # Remove a client, change two clients' and two maids' profiles in place
+    clients = [n for n in df["client_name"].unique() if not n.startswith("anchor_")]
+    df = df[df["client_name"] != clients[0]]
+    for name in clients[1:3]:
+        col = rng.choice(client_cols)
+        df.loc[df["client_name"] == name, col] = rng.choice(df[col].unique())
+    for maid_id in rng.choice(df["maid_id"].unique(), 2, replace=False):
+        col = rng.choice(maid_cols)
+        df.loc[df["maid_id"] == maid_id, col] = rng.choice(df[col].unique())
+    # Add a client and a maid at the end
+    new = df.iloc[[-1, -2]].copy()
+    new["client_name"] = ["new_client", "anchor_new"]
+    new.iloc[1, new.columns.get_loc("maid_id")] = 10 ** 6
+    return pd.concat([df, new], ignore_index=True)
+
+
+def _same_results(state, df):
+    fresh = MatchingState(df, k=K)
+    by_client = lambda frame: frame.sort_values(["client_name", "rank"] if "rank" in frame else "client_name",
+                                                kind="stable").reset_index(drop=True)
+    best_cols = ["client_name", "best_maid_id", "match_score_pct"]
+    pd.testing.assert_frame_equal(by_client(state.best_matches()[best_cols]), by_client(fresh.best_matches()[best_cols]))
+    pd.testing.assert_frame_equal(by_client(state.top_k_matches()), by_client(fresh.top_k_matches()))
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_synced_state_matches_a_fresh_search(seed):
+    rng = np.random.default_rng(seed)
+    clients, maids = synthetic_profiles(260, 60, seed=seed)
+    df = _pairs(clients, maids, rng)
+    state = MatchingState(df, k=K)
+    for _ in range(3):
+        df = _edit(df, state, rng)
+        changes = state.sync(df)
+        assert not changes["rebuilt"]
+        _same_results(state, df)
+
+
+def test_sync_rebuilds_a_mostly_different_upload():
+    rng = np.random.default_rng(8)
+    state = MatchingState(_pairs(*synthetic_profiles(120, 30, seed=8), rng), k=K)
+    df = _pairs(*synthetic_profiles(120, 30, seed=9), rng)
+    assert state.sync(df) == {"rebuilt": True}
+    _same_results(state, df)
+
+
+def test_synced_state_is_cached_under_the_new_upload(tmp_path):
+    rng = np.random.default_rng(7)
+    clients, maids = synthetic_profiles(260, 60, seed=7)
+    df = _pairs(clients, maids, rng)
+    cache = ResultCache(str(tmp_path))
+    state, mode = synced_matching_state(df, cache, fingerprint(df), K)
+    assert mode == "full"
+
+    edited = _edit(df, state, rng)
+    key = fingerprint(edited)
+    synced, mode = synced_matching_state(edited, cache, key, K, previous=state)
+    assert mode == "incremental" and cache.has(key, f"top{K}")
+
+    restored, mode = synced_matching_state(edited, cache, key, K)
+    assert mode == "cached"
+    sort = lambda frame: frame.sort_values(["client_name", "rank"]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(sort(restored.top_k_matches()), sort(synced.top_k_matches()))
+    pd.testing.assert_frame_equal(sort(restored.top_k_matches()), sort(MatchingState(edited, k=K).top_k_matches()))
@@ -0,0 +1,77 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from matching import ingest
+from matching.ingest import is_category_column, is_flag_column, iter_chunks, read_upload
+
+
+class Upload(io.BytesIO):
+    name = "export.csv"
+
+
+def _export(n=300, seed=6):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "client_name": [f"client_{i}" for i in rng.integers(0, 60, n)],
+        "maid_id": rng.integers(1000, 1040, n),
+        "clientmts_pet_type": rng.choice(["no_pets", "cat", "dog"], n),
+        "maidmts_pet_type": rng.choice(["unspecified", "refuses_cat"], n),
+        "maidpref_smoking": rng.choice(["unspecified", "non_smoker"], n),
+        "maid_nationality": rng.choice(["filipina", "ethiopian", None], n),
+        "cooking_group": rng.choice(["not_specified", "indian"], n),
+        "maidspeaks_english": rng.integers(0, 2, n),
+        "maidspeaks_arabic": rng.integers(0, 2, n),
+    }).to_csv(index=False).encode()
+
+
+def _kinds(df):
+    return {
+        col: "category" if isinstance(dtype, pd.CategoricalDtype) else str(dtype)
+        for col, dtype in df.dtypes.items() if is_category_column(col) or is_flag_column(col)
+    }
+
+
+def test_upload_loads_with_the_declared_schema(tmp_path):
+    df = read_upload(Upload(_export()), cache_dir=str(tmp_path))
+    kinds = _kinds(df)
+    assert kinds and all(
+        kind == ("category" if is_category_column(col) else "uint8") for col, kind in kinds.items()
+    )
+
+
+def test_cached_upload_reads_back_equal(tmp_path):
+    data = _export()
+    first = read_upload(Upload(data), cache_dir=str(tmp_path))
+    again = read_upload(Upload(data), cache_dir=str(tmp_path))
+    assert again.equals(first)
+    assert (again.dtypes == first.dtypes).all()
+    assert len(os.listdir(tmp_path / "ingest")) == 1
+
+
+def test_ingest_cache_is_keyed_by_schema_version(tmp_path, monkeypatch):
+    data = _export()
+    read_upload(Upload(data), cache_dir=str(tmp_path))
+    monkeypatch.setattr(ingest, "SCHEMA_VERSION", ingest.SCHEMA_VERSION + 1)
+    read_upload(Upload(data), cache_dir=str(tmp_path))
+    assert len(os.listdir(tmp_path / "ingest")) == 2
+
+
+@pytest.mark.parametrize("ext", [".csv", ".parquet"])
+def test_chunks_have_the_upload_dtypes(ext, tmp_path):
+    data = _export()
+    path = tmp_path / f"export{ext}"
+    if ext == ".csv":
+        path.write_bytes(data)
+    else:
+        pd.read_csv(io.BytesIO(data)).to_parquet(path, index=False)
+
+    upload = read_upload(Upload(data), cache_dir=str(tmp_path))
+    chunks = list(iter_chunks(str(path), chunk_rows=100))
+    assert len(chunks) == 3
+    for chunk in chunks:
+        assert _kinds(chunk) == _kinds(upload)
+    assert np.array_equal(pd.concat(chunks)["maidspeaks_english"].to_numpy(), upload["maidspeaks_english"].to_numpy())
@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+import matching.jobs
+from matching.cache import ResultCache
+from matching.incremental import MatchingState
+from matching.jobs import Cancelled, SearchJobs
+from matching.synthetic import synthetic_pairs
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    """Holds every search at its first progress call until set."""
+    gate = threading.Event()
+
+    def gated_state(df, k, progress):
+        def gated_progress(fraction, state):
+            gate.wait(10)
+            progress(fraction, state)
+        return MatchingState(df, k=k, progress=gated_progress)
+
+    monkeypatch.setattr(matching.jobs, "MatchingState", gated_state)
+    return gate
+
+
+class Waiter(threading.Thread):
+    """A session waiting on SearchJobs.search until its stop event is set."""
+
+    def __init__(self, jobs, df, cache):
+        super().__init__(daemon=True)
+        self.jobs, self.df, self.cache = jobs, df, cache
+        self.stop = threading.Event()
+        self.result = self.error = None
+        self.start()
+
+    def run(self):
+        try:
+            self.result = self.jobs.search(self.df, self.cache, "key", 5, stop=self.stop)
+        except Exception as e:
+            self.error = e
+
+
+def _until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def _two_waiters(tmp_path):
+    jobs, cache = SearchJobs(), ResultCache(str(tmp_path))
+    df = synthetic_pairs(400, n_clients=120, n_maids=60, seed=1)
+    first = Waiter(jobs, df, cache)
+    _until(lambda: jobs.get("key") is not None)
+    job = jobs.get("key")
+    second = Waiter(jobs, df, cache)
+    _until(lambda: jobs._waiting.get("key") == 2)
+    return jobs, cache, df, job, first, second
+
+
+def test_finished_search_is_cached_and_released(tmp_path):
+    jobs, cache = SearchJobs(), ResultCache(str(tmp_path))
+    df = synthetic_pairs(400, n_clients=120, n_maids=60, seed=1)
+    top_k = jobs.search(df, cache, "key", 5)
+
+    expected = MatchingState(df, k=5).export_top_k()
+    assert top_k.equals(expected) and cache.get("key", "top5").equals(expected)
+    assert jobs.get("key") is None
+
+
+def test_job_keeps_running_while_one_waiter_is_left(tmp_path, gate):
+    jobs, cache, df, job, first, second = _two_waiters(tmp_path)
+    first.stop.set()
+    first.join(5)
+    assert isinstance(first.error, Cancelled)
+    assert jobs.get("key") is job and not job.cancelled and not job.done.is_set()
+
+    gate.set()
+    second.join(10)
+    expected = MatchingState(df, k=5).export_top_k()
+    assert second.error is None and second.result.equals(expected)
+    assert cache.get("key", "top5").equals(expected)
+    assert jobs.get("key") is None
+
+
+def test_job_is_cancelled_once_every_waiter_stopped(tmp_path, gate):
+    jobs, cache, _, job, first, second = _two_waiters(tmp_path)
+    first.stop.set()
+    first.join(5)
+    assert not job.cancelled
+    second.stop.set()
+    second.join(5)
+    assert isinstance(second.error, Cancelled)
+    assert job.cancelled and jobs.get("key") is None
+
+    # The search stops at its next progress call, without caching a top-K
+    gate.set()
+    assert job.done.wait(10)
+    assert isinstance(job.error, Cancelled) and "cancelled" in str(job.error)
+    assert job.fraction < 1.0 and cache.get("key", "top5") is None
@@ -0,0 +1,107 @@
+import threading
+
+import pytest
+
+from matching.lazy import LazyResults
+
+
+class Counting:
+    """A compute returning a fresh object per call and counting its calls."""
+
+    def __init__(self, wait=None):
+        self.calls = 0
+        self.wait = wait
+
+    def __call__(self):
+        if self.wait is not None:
+            self.wait.wait(5)
+        self.calls += 1
+        return object()
+
+
+def test_get_computes_a_defined_result_once():
+    lazy, compute = LazyResults("key"), Counting()
+    lazy.define({"a": compute})
+    assert lazy.status("a") == "missing"
+    first = lazy.get("a")
+    assert lazy.get("a") is first and compute.calls == 1
+    assert lazy.status("a") == "done" and lazy.timing("a")["background"] is False
+    lazy.close()
+
+
+def test_results_may_get_other_results():
+    lazy = LazyResults("key")
+    lazy.define({"a": lambda: 2, "b": lambda: lazy.get("a") * 10})
+    lazy.prefetch("b")
+    assert lazy.get("b") == 20 and lazy.status("a") == "done"
+    lazy.close()
+
+
+def test_prefetched_result_is_the_one_get_returns():
+    release = threading.Event()
+    lazy, compute = LazyResults("key"), Counting(wait=release)
+    lazy.define({"a": compute})
+    lazy.prefetch("a")
+    assert lazy.status("a") in ("queued", "running")
+    lazy.prefetch("a")  # already queued: not submitted twice
+    release.set()
+    first = lazy.get("a")
+    assert lazy.get("a") is first and compute.calls == 1
+    assert lazy.timing("a")["background"] is True
+    lazy.close()
+
+
+def test_failures_raise_until_forgotten():
+    lazy, attempts = LazyResults("key"), []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ValueError("first attempt")
+        return "ok"
+
+    lazy.define({"a": flaky})
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            lazy.get("a")
+    assert lazy.status("a") == "failed" and len(attempts) == 1
+    lazy.forget("a")
+    assert lazy.get("a") == "ok"
+    lazy.close()
+
+
+def test_forget_forces_a_recompute_with_the_current_definition():
+    lazy, compute = LazyResults("key"), Counting()
+    lazy.define({"a": compute})
+    first = lazy.get("a")
+    lazy.forget("a")
+    assert lazy.status("a") == "missing"
+    second = lazy.get("a")
+    assert second is not first and compute.calls == 2
+
+    lazy.define({"a": lambda: "redefined"})
+    assert lazy.get("a") is second  # definitions only apply to results not computed yet
+    lazy.forget("a")
+    lazy.prefetch("a")
+    assert lazy.get("a") == "redefined"
+    lazy.close()
+
+
+def test_close_keeps_finished_results_and_rejects_new_work():
+    release = threading.Event()
+    lazy = LazyResults("key")
+    lazy.define({"done": lambda: "kept", "running": Counting(wait=release), "queued": Counting(), "new": Counting()})
+    lazy.get("done")
+    lazy.prefetch("running", "queued")
+    lazy.close()
+    release.set()
+
+    assert lazy.closed.is_set()
+    assert lazy.get("done") == "kept"
+    assert lazy.status("queued") == "missing"  # dropped before it ran
+    with pytest.raises(RuntimeError):
+        lazy.get("new")
+    with pytest.raises(RuntimeError):
+        lazy.get("queued")
+    with pytest.raises(RuntimeError):
+        lazy.prefetch("new")
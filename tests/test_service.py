@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+
+from matching.matrix import compute_top_k_matches
+from matching.service import CLIENT_COLUMNS, MatchEngine, MatchServer
+from matching.snapshot import load_snapshot, write_snapshot
+from matching.synthetic import synthetic_profiles
+
+
+def _roster(n=40, string_ids=False):
+    clients, maids = synthetic_profiles(n, n, seed=3)
+    if string_ids:
+        maids["maid_id"] = [f"M-{i:04d}" for i in range(n)]
+    return clients, maids
+
+
+def _serve(engine, clients, k):
+    async def run():
+        server = MatchServer(engine)
+        batcher = asyncio.create_task(server.batcher.run())
+        try:
+            return await asyncio.gather(*(
+                server.handle("POST", "/match", json.dumps({"client": client, "k": k}))
+                for client in clients[["client_name"] + CLIENT_COLUMNS].to_dict("records")
+            ))
+        finally:
+            batcher.cancel()
+    return asyncio.run(run())
+
+
+def _matches(responses):
+    assert all(status == 200 for status, _ in responses)
+    return pd.DataFrame([
+        {"client_name": payload["client_name"], **match} for _, payload in responses for match in payload["matches"]
+    ])
+
+
+def test_matches_equal_global_search():
+    clients, maids = _roster()
+    got = _matches(_serve(MatchEngine(maids), clients, k=5))
+    expected = compute_top_k_matches(pd.concat([clients, maids], axis=1), k=5)
+    for col in ("maid_id", "rank", "match_score_pct"):
+        assert got[col].tolist() == expected[col].tolist()
+
+
+@pytest.mark.parametrize("source", ["frame", "snapshot"])
+def test_string_maid_ids_match_global_search(source, tmp_path):
+    clients, maids = _roster(string_ids=True)
+    if source == "snapshot":
+        path = str(tmp_path / "maids.roster")
+        write_snapshot(maids, path)
+        engine = MatchEngine.from_snapshot(load_snapshot(path))
+    else:
+        engine = MatchEngine(maids)
+
+    got = _matches(_serve(engine, clients, k=5))
+    expected = compute_top_k_matches(pd.concat([clients, maids], axis=1), k=5)
+    for col in ("maid_id", "rank", "match_score_pct"):
+        assert got[col].tolist() == expected[col].tolist()
+    assert all(isinstance(maid_id, str) for maid_id in got["maid_id"])
+
+
+def test_bad_requests_are_rejected():
+    clients, maids = _roster(5)
+    client = clients[["client_name"] + CLIENT_COLUMNS].iloc[0].to_dict()
+
+    async def run():
+        server = MatchServer(MatchEngine(maids))
+        return [
+            await server.handle("POST", "/match", "{not json"),
+            await server.handle("POST", "/match", json.dumps({"client": {"client_name": "x"}})),
+            await server.handle("POST", "/match", json.dumps({"client": client, "k": 0})),
+            await server.handle("GET", "/match", ""),
+            await server.handle("POST", "/nowhere", ""),
+        ]
+
+    assert [status for status, _ in asyncio.run(run())] == [400, 400, 400, 405, 404]